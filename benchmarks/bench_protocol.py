@@ -0,0 +1,50 @@
+import argparse
+import timeit
+from fastmodbuslibrary import protocol
+
+SERIAL_NUMBER = 4265607340
+EVENT_FRAME = (b'\xC9\x46\x11\x00\x05\x1B\x01\x02\x00\x00\x01\x02\x04\x01\xD0\x0C\x00\x02\x04\x01\xE0\x03\x00'
+               b'\x02\x04\x01\xF0\x0B\x00\x00\x0F\x00\x00\x5C\xD2')
+
+
+def read_response(count: int) -> bytes:
+    """
+    Build the response to a read of registers holding their own addresses.
+
+    Args:
+        count (int): The number of registers.
+
+    Returns:
+        bytes: The response frame with CRC.
+    """
+    frame = protocol.PDU_RESPONSE.pack(protocol.BROADCAST_ADDRESS, protocol.EXT_FUNC_CODE, protocol.RESPONSE,
+                                       SERIAL_NUMBER, 0x03, 2 * count)
+    frame += b''.join(address.to_bytes(2, 'big') for address in range(count))
+    return frame + protocol.CRC.pack(protocol.crc16(frame))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Encoding and decoding time of the protocol frames')
+    parser.add_argument('-c', '--count', type=int, default=10, help='Number of registers per read')
+    parser.add_argument('-n', '--number', type=int, default=100000, help='Number of repetitions per case')
+    args = parser.parse_args()
+
+    response = read_response(args.count)
+    buffer = bytearray(256)
+    payload = bytes(2 * args.count)
+    cases = (
+        ("encode read request", lambda: protocol.encode_read_request(SERIAL_NUMBER, 0x03, 0, args.count)),
+        ("encode write request in place",
+         lambda: protocol.encode_write_request_into(buffer, SERIAL_NUMBER, 0x10, 0, args.count, payload)),
+        ("check CRC of read response", lambda: protocol.check_crc(response)),
+        ("decode read response", lambda: protocol.decode_read_response(response, 0x03, args.count)),
+        ("decode event response (5 events)",
+         lambda: (protocol.decode_event_header(EVENT_FRAME), list(protocol.iter_events(EVENT_FRAME, 5)))),
+    )
+    for name, case in cases:
+        elapsed = min(timeit.repeat(case, number=args.number, repeat=3))
+        print(f"{name}: {elapsed / args.number * 1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import time
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice, PtyBus
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+
+SERIAL_NUMBER = 4265607340
+
+
+PROFILES = (
+    ("pyserial", "", False),
+    ("pyserial, low latency", "", True),
+    ("termios", "termios://", True),
+)
+
+
+def measure(device: str, baudrate: int, serial_number: int, transactions: int, low_latency: bool) -> dict:
+    """
+    Measure read transactions against a device.
+
+    Args:
+        device (str): The device path, optionally with a transport prefix.
+        baudrate (int): The baud rate for the serial connection.
+        serial_number (int): The serial number of the device.
+        transactions (int): The number of reads.
+        low_latency (bool): True to enable the low-latency transport profile.
+
+    Returns:
+        dict: The mean wall-clock ("transaction") and CPU ("cpu") time per transaction of the
+        calling thread, and the turnaround reported by the retry policy.
+    """
+    with ModbusClient(device, baudrate) as client:
+        client.serial_port.set_low_latency(low_latency)
+        client.read_registers(serial_number, 0x03, 0, 10)
+        start_time = time.perf_counter()
+        start_cpu = time.thread_time()
+        for _ in range(transactions):
+            client.read_registers(serial_number, 0x03, 0, 10)
+        cpu = time.thread_time() - start_cpu
+        elapsed = time.perf_counter() - start_time
+        return {"transaction": elapsed / transactions, "cpu": cpu / transactions, **client.retry_policy.turnaround()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-transaction latency of the serial transport profiles')
+    parser.add_argument('-d', '--device', help='Serial device, an emulated bus on a pseudo-terminal if omitted')
+    parser.add_argument('-s', '--serial', type=int, default=SERIAL_NUMBER, help='Serial number of a device with holding registers 0-9')
+    parser.add_argument('-b', '--baudrate', type=int, default=115200, help='Baud rate')
+    parser.add_argument('-n', '--transactions', type=int, default=500, help='Number of reads per run')
+    args = parser.parse_args()
+
+    pty = None
+    if args.device is None:
+        pty = PtyBus(EmulatedBus([EmulatedDevice(args.serial, 1, "WBMCM8", holding=dict.fromkeys(range(10), 0))]))
+    try:
+        for name, prefix, low_latency in PROFILES:
+            device = prefix + (args.device or pty.device)
+            result = measure(device, args.baudrate, args.serial, args.transactions, low_latency)
+            print(f"{name}: {result['transaction'] * 1e6:.0f} us per transaction ({result['cpu'] * 1e6:.0f} us CPU), "
+                  f"turnaround {result['srtt'] * 1e6:.0f} us (min {result['min'] * 1e6:.0f} us)")
+    finally:
+        if pty is not None:
+            pty.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import argparse
+import sys
+from fastmodbuslibrary.logging_config import setup_logging
+from fastmodbuslibrary.soak import SoakBus, SoakHarness
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Soak test of the acquisition roles against an emulated bus')
+    parser.add_argument('-n', '--transactions', type=int, default=1000000, help='Number of transactions per latency run')
+    parser.add_argument('-m', '--memory-transactions', type=int, default=100000,
+                        help='Number of transactions per memory run (traced, several times slower)')
+    parser.add_argument('-r', '--roles', nargs='+', choices=sorted(SoakHarness.DEFAULT_BUDGETS),
+                        default=sorted(SoakHarness.DEFAULT_BUDGETS), help='Roles to soak')
+    parser.add_argument('--devices', type=int, default=8, help='Number of emulated devices')
+    parser.add_argument('--p99', type=float, help='p99 latency budget in microseconds, overriding the defaults')
+    args = parser.parse_args()
+    setup_logging(False)
+
+    harness = SoakHarness(args.transactions, args.memory_transactions)
+    failed = False
+    with SoakBus(args.devices) as bus:
+        transactions = bus.transactions()
+        for role in args.roles:
+            budgets = dict(SoakHarness.DEFAULT_BUDGETS[role])
+            if args.p99 is not None:
+                budgets["p99"] = args.p99 / 1e6
+            report = harness.run(role, transactions[role], budgets)
+            print(f"{role}: p50 {report['p50'] * 1e6:.0f} us, p99 {report['p99'] * 1e6:.0f} us, "
+                  f"max {report['max'] * 1e6:.0f} us, drift {report['drift']:.2f}, "
+                  f"{report['bytes_per_transaction']:.3f} bytes retained and {report['peak_bytes']:.0f} bytes "
+                  f"peak per transaction{' FAILED' if report['violations'] else ''}")
+            failed = failed or bool(report["violations"])
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import serial
+from fastmodbuslibrary.capture import CaptureDecoder, CaptureWriter
+from fastmodbuslibrary.logging_config import setup_logging
+
+def parse_args():
+    """
+    Parse command-line arguments for the Modbus Capture Tool.
+
+    Returns:
+        argparse.Namespace: Parsed command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Modbus Capture Tool")
+    subparsers = parser.add_subparsers(dest='action', required=True)
+    record = subparsers.add_parser('record', help="Record the frames seen on a bus")
+    record.add_argument('-d', '--device', required=True, help="TTY serial device (e.g., /dev/ttyACM0)")
+    record.add_argument('-b', '--baud', type=int, default=9600, help="Baudrate, default 9600")
+    record.add_argument('capture', help="Capture file to append to")
+    decode = subparsers.add_parser('decode', help="Decode a capture into a .npz file")
+    decode.add_argument('capture', help="Capture file")
+    decode.add_argument('-o', '--output', required=True, help="Output .npz file")
+    decode.add_argument('-j', '--workers', type=int, help="Worker processes, default one per CPU")
+    decode.add_argument('--chunk-size', type=int, default=64, help="Chunk size in MiB, default 64")
+    decode.add_argument('--compress', action='store_true', help="Compress the output")
+    parser.add_argument('-D', '--debug', action='store_true', help="Enable debug output")
+    return parser.parse_args()
+
+def record(args):
+    """
+    Record frames until interrupted, splitting them at the 3.5 character silence of Modbus RTU.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+    """
+    silence = max(3.5 * 11 / args.baud, 0.00175)
+    with serial.Serial(args.device, args.baud, timeout=1.0, inter_byte_timeout=silence) as port, \
+            CaptureWriter(args.capture) as writer:
+        frames = 0
+        try:
+            while True:
+                frame = port.read(256)
+                if frame:
+                    writer.write_frame(frame)
+                    frames += 1
+        except KeyboardInterrupt:
+            print(f"{frames} frames recorded")
+
+def main():
+    """
+    Main function to execute the Modbus Capture Tool.
+
+    Records bus traffic into a capture file, or decodes a capture into columns.
+    """
+    args = parse_args()
+    setup_logging(args.debug)
+    if args.action == 'record':
+        record(args)
+        return
+    decoder = CaptureDecoder(args.workers, args.chunk_size << 20)
+    decoder.decode(args.capture, args.output, args.compress)
+    print(", ".join(f"{name}: {value:.2f}" if isinstance(value, float) else f"{name}: {value}"
+                    for name, value in decoder.stats.items()))
+
+if __name__ == "__main__":
+    main()
@@ -46,7 +46,7 @@ def main():
         else:
             print("Failed to read registers.")
 
-    client.serial_port.close()
+    client.close()
 
 if __name__ == "__main__":
     main()
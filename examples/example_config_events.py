@@ -66,7 +66,7 @@ def main():
         else:
             print("[error] No valid response received")
 
-    config_events.serial_port.close()
+    config_events.close()
 
 if __name__ == '__main__':
     main()
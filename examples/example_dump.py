@@ -0,0 +1,67 @@
+import argparse
+import json
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.logging_config import setup_logging
+from fastmodbuslibrary.register_dump import RegisterDumper
+
+def parse_range(value):
+    """
+    Parse an address range given as start-end (end excluded).
+
+    Args:
+        value (str): The range string.
+
+    Returns:
+        tuple: The start and end addresses.
+    """
+    start, end = value.split('-')
+    return int(start, 0), int(end, 0)
+
+def parse_args():
+    """
+    Parse command-line arguments for the Modbus Register Dump Tool.
+
+    Returns:
+        argparse.Namespace: Parsed command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Modbus Register Dump Tool")
+    parser.add_argument('-d', '--device', required=True, help="TTY serial device (e.g., /dev/ttyACM0)")
+    parser.add_argument('-b', '--baud', type=int, default=9600, help="Baudrate, default 9600")
+    parser.add_argument('-s', '--serial', type=int, required=True, help="Device serial number")
+    parser.add_argument('--spaces', default="coil,discrete,holding,input", help="Register spaces to survey")
+    parser.add_argument('--range', type=parse_range, action='append', help="Address range start-end, repeatable (default 0-65536)")
+    parser.add_argument('--min-block', type=int, default=1, help="Smallest block split when rejected, default 1")
+    parser.add_argument('--profile', help="Also write a device profile for this model")
+    parser.add_argument('-o', '--output', help="Write the dump as JSON to this file")
+    parser.add_argument('-D', '--debug', action='store_true', help="Enable debug output")
+    return parser.parse_args()
+
+def main():
+    """
+    Main function to execute the Modbus Register Dump Tool.
+
+    Surveys the register spaces of one device and prints or saves the valid ranges.
+    """
+    args = parse_args()
+    setup_logging(args.debug)
+    with ModbusClient(args.device, args.baud) as client:
+        dumper = RegisterDumper(client, args.min_block)
+        result = dumper.dump(args.serial, args.spaces.split(','), args.range or [(0, 0x10000)])
+
+    for space, ranges in result["spaces"].items():
+        for valid_range in ranges:
+            print(f"{space:<9} {valid_range['start']:>5}-{valid_range['start'] + valid_range['count'] - 1:<5} {valid_range['values']}")
+    for space, blocks in result["unanswered"].items():
+        for start, count in blocks:
+            print(f"{space:<9} {start:>5}-{start + count - 1:<5} no answer")
+    print(f"{result['requests']} requests")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(result, file)
+    if args.profile:
+        with open(f"{args.profile}.json", 'w') as file:
+            json.dump(RegisterDumper.to_profile(result, args.profile), file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -71,32 +71,18 @@ def main():
     logger = logging.getLogger(__name__)
     event_reader = ModbusEventReader(args.device, args.baud)
 
-    min_slave_id = 1
-    max_data_length = 100
-    slave_id = 0
-    flag = 0
-
     # Print the header once
     max_widths = print_header()
 
     while True:
         try:
-            response = event_reader.request_events(min_slave_id, max_data_length, slave_id, flag)
+            # Confirms the previous packet and sizes max_data_length to the event backlog
+            response = event_reader.poll_events(min_slave_id=1)
 
             if isinstance(response, dict):  # Check if the response is a dictionary
                 events = response.get('events', [])  # Extract the list of events from the dictionary
                 packet_info = response.get('packet_info', {})
-                device_id = packet_info.get('device_id', 0)  # Extract device_id or default to 0
-                flag = packet_info.get('flag', 0)              # Extract flag or default to 0
-
-                # Logic for updating slave_id and flag
-                if events:
-                    slave_id = device_id  # If there are events, take device_id from packet_info
-                else:
-                    slave_id = 0          # If there are no events, set slave_id to 0
-                    flag = 0              # If packet_info is empty, set flag to 0
-
-                print_events(events, slave_id, flag, max_widths)  # Pass slave_id and flag to the function
+                print_events(events, packet_info.get('device_id', 0), packet_info.get('flag', 0), max_widths)
             else:
                 logger.error(f"Unexpected response: {response}")  # Log an error if it's not a dictionary
 
@@ -104,9 +90,11 @@ def main():
             logger.error(f"Error: {e}")
             traceback.print_exc()
             print("An error occurred. Retrying...")
-            event_reader = ModbusEventReader(args.device, args.baud)
+            response = None
 
-        time.sleep(0.5)
+        # Keep requesting while devices report events, pause once they have none left
+        if not response:
+            time.sleep(0.5)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,61 @@
+import argparse
+import asyncio
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.fast_modbus_gateway import ModbusTcpGateway
+from fastmodbuslibrary.fast_modbus_scanner import ModbusScanner
+from fastmodbuslibrary.logging_config import setup_logging
+
+def parse_args():
+    """
+    Parse command-line arguments for the Modbus TCP Gateway.
+
+    Returns:
+        argparse.Namespace: Parsed command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Modbus TCP gateway for a fast Modbus bus")
+    parser.add_argument('-d', '--device', required=True, help="TTY serial device (e.g., /dev/ttyACM0)")
+    parser.add_argument('-b', '--baud', type=int, default=9600, help="Baudrate, default 9600")
+    parser.add_argument('-H', '--host', default='0.0.0.0', help="Address to listen on, default 0.0.0.0")
+    parser.add_argument('-p', '--port', type=int, default=502, help="TCP port to listen on, default 502")
+    parser.add_argument('-m', '--map', help="Unit ID to serial number table (e.g., '1:4265607340,2:113245'), scan the bus if omitted")
+    parser.add_argument('--max-age', type=float, default=0.0, help="Answer reads from values up to this old (in seconds), default 0")
+    parser.add_argument('--debug', action='store_true', help="Enable debug output")
+    return parser.parse_args()
+
+async def serve(gateway: ModbusTcpGateway, host: str, port: int):
+    """
+    Run the gateway until interrupted.
+    """
+    server = await gateway.start(host, port)
+    async with server:
+        await server.serve_forever()
+
+def main():
+    """
+    Main function to execute the Modbus TCP Gateway.
+
+    Builds the unit ID table from the command line or a bus scan and serves Modbus TCP clients.
+    """
+    args = parse_args()
+    setup_logging(args.debug)
+    client = ModbusClient(args.device, args.baud)
+
+    if args.map:
+        unit_map = {int(unit, 0): int(serial, 0) for unit, serial in (item.split(':') for item in args.map.split(','))}
+        gateway = ModbusTcpGateway(client, unit_map, args.max_age)
+    else:
+        scanner = ModbusScanner(args.device, args.baud)
+        gateway = ModbusTcpGateway.from_devices(client, scanner.scan_devices(), args.max_age)
+        scanner.close()
+
+    for unit_id, serial_number in sorted(gateway.unit_map.items()):
+        print(f"Unit {unit_id} -> device {serial_number}")
+
+    try:
+        asyncio.run(serve(gateway, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    client.close()
+
+if __name__ == "__main__":
+    main()
@@ -54,7 +54,7 @@ def main():
     setup_logging(args.debug)
     scanner = ModbusScanner(args.device, args.baud, args.command)
     devices = scanner.scan_devices()
-    scanner.serial_port.close()
+    scanner.close()
     print_devices(devices)
 
 if __name__ == "__main__":
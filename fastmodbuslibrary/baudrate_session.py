@@ -0,0 +1,184 @@
+import time
+import logging
+from .fast_modbus_client import ModbusClient
+
+
+class BaudrateSession:
+    """
+    Raises the baud rate of a bus for a bulk job and restores it afterwards.
+
+    On entering, the session reads the baud rate register of every target device,
+    writes the higher rate to each (devices answer the write at the old rate, then
+    switch), reopens the port of the client and of the other roles at the new rate and
+    checks that every device answers there. On leaving, also after an exception, the
+    original rates are written back and the port returns to its rate.
+
+    If a device does not take the new rate or stops answering during the session, the
+    whole bus is rolled back: the original rate is written to every device that may have
+    switched, at the high rate, and the port returns to the original rate. A failed start
+    raises ConnectionError after the rollback; during the job, check() does the same,
+    so a long job can call it between steps to stop early.
+
+    Attributes:
+        BAUDRATE_REGISTER (int): The holding register of the device baud rate in units of 100 baud.
+        BAUDRATES (tuple): The baud rates devices support.
+        stats (dict): The "started" and "restored" times (time.monotonic()) and the devices
+            that did not return to the original rate ("stranded").
+    """
+
+    BAUDRATE_REGISTER = 110
+    BAUDRATES = (1200, 2400, 4800, 9600, 19200, 38400, 57600, 115200)
+
+    def __init__(self, client: ModbusClient, serial_numbers: list, baudrate: int = 115200, roles: list = (),
+                 settle: float = 0.05):
+        """
+        Initialize the BaudrateSession instance.
+
+        Args:
+            client (ModbusClient): The client used to change and verify the device settings.
+            serial_numbers (list): The serial numbers of every device on the bus.
+            baudrate (int): The baud rate of the session.
+            roles (list): Other roles (e.g., ModbusScanner, ModbusConfigEvents) used during the job.
+            settle (float): The silence after changing rates before the next request (in seconds).
+
+        Raises:
+            ValueError: If the baud rate is not supported by the devices.
+        """
+        if baudrate not in self.BAUDRATES:
+            raise ValueError(f"Unsupported baud rate: {baudrate}")
+        self.client = client
+        self.serial_numbers = list(serial_numbers)
+        self.baudrate = baudrate
+        self.roles = [client] + [role for role in roles if role is not client]
+        self.settle = settle
+        self.original_baudrate = client.baudrate
+        self.switched = []
+        self.active = False
+        self.stats = {"started": None, "restored": None, "stranded": []}
+        self.logger = logging.getLogger(__name__)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.active:
+            self.rollback()
+
+    def set_port_baudrate(self, baudrate: int):
+        """
+        Switch the port of every role to a baud rate.
+
+        The timeouts of the devices left at another rate say nothing about their health,
+        so their health records are dropped and no device stays quarantined for them.
+
+        Args:
+            baudrate (int): The baud rate.
+        """
+        transports = []
+        for role in self.roles:
+            role.baudrate = baudrate
+            if not any(role.serial_port is transport for transport in transports):
+                transports.append(role.serial_port)
+        for transport in transports:
+            transport.set_baudrate(baudrate)
+        for serial_number in self.serial_numbers:
+            self.client.retry_policy.health.forget(serial_number)
+        time.sleep(self.settle)
+
+    def read_baudrate(self, serial_number: int) -> int:
+        """
+        Read the baud rate register of a device at the current port rate.
+
+        Args:
+            serial_number (int): The serial number of the device.
+
+        Returns:
+            int: The baud rate the device is set to, or None if it did not answer.
+        """
+        data = self.client.read_registers(serial_number, 0x03, self.BAUDRATE_REGISTER, 1)
+        if data is None:
+            return None
+        return int.from_bytes(data, 'big') * 100
+
+    def write_baudrate(self, serial_number: int, baudrate: int) -> bool:
+        """
+        Write the baud rate register of a device.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            baudrate (int): The baud rate.
+
+        Returns:
+            bool: True if the device confirmed the write.
+        """
+        return self.client.write_registers(serial_number, 0x10, self.BAUDRATE_REGISTER, [baudrate // 100])
+
+    def start(self):
+        """
+        Switch every device and the port to the session baud rate.
+
+        Raises:
+            ConnectionError: If a device is not at the original rate or does not answer at
+                the new one; the bus has been rolled back.
+        """
+        self.active = True
+        self.stats["started"] = time.monotonic()
+        for serial_number in self.serial_numbers:
+            current = self.read_baudrate(serial_number)
+            if current != self.original_baudrate:
+                self.rollback()
+                raise ConnectionError(f"Device {serial_number} is not at {self.original_baudrate} baud "
+                                      f"({'no answer' if current is None else current})")
+
+        for serial_number in self.serial_numbers:
+            # A device may switch even if its confirmation was lost, so it is rolled back either way
+            self.switched.append(serial_number)
+            if not self.write_baudrate(serial_number, self.baudrate):
+                self.rollback()
+                raise ConnectionError(f"Device {serial_number} did not accept {self.baudrate} baud")
+
+        self.set_port_baudrate(self.baudrate)
+        self.check()
+        self.logger.info(f"{len(self.serial_numbers)} devices switched to {self.baudrate} baud")
+
+    def check(self):
+        """
+        Check that every device still answers at the session baud rate.
+
+        Raises:
+            ConnectionError: If a device does not answer; the bus has been rolled back.
+        """
+        for serial_number in self.serial_numbers:
+            if self.read_baudrate(serial_number) != self.baudrate:
+                self.logger.warning(f"Device {serial_number} does not answer at {self.baudrate} baud, rolling back")
+                self.rollback()
+                raise ConnectionError(f"Device {serial_number} does not answer at {self.baudrate} baud")
+
+    def rollback(self) -> list:
+        """
+        Return every switched device and the port to the original baud rate.
+
+        Returns:
+            list: The serial numbers of devices not answering at the original rate afterwards.
+        """
+        if self.switched:
+            if self.client.baudrate != self.baudrate:
+                self.set_port_baudrate(self.baudrate)
+            for serial_number in self.switched:
+                if not self.write_baudrate(serial_number, self.original_baudrate):
+                    self.logger.debug(f"Device {serial_number} did not confirm {self.original_baudrate} baud")
+        if self.client.baudrate != self.original_baudrate:
+            self.set_port_baudrate(self.original_baudrate)
+
+        stranded = [serial_number for serial_number in self.switched
+                    if self.read_baudrate(serial_number) != self.original_baudrate]
+        if stranded:
+            self.logger.error(f"Devices {stranded} did not return to {self.original_baudrate} baud")
+        else:
+            self.logger.info(f"Bus restored to {self.original_baudrate} baud")
+        self.switched = []
+        self.active = False
+        self.stats["restored"] = time.monotonic()
+        self.stats["stranded"] = stranded
+        return stranded
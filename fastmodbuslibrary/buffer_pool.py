@@ -0,0 +1,104 @@
+import threading
+import logging
+
+
+class BufferPool:
+    """
+    A pool of preallocated receive buffers, handed out as memoryviews.
+
+    Responses are read straight into pooled buffers, so steady-state polling does not
+    allocate a new buffer per transaction. When every buffer is in use a new one is
+    created and kept in the pool afterwards.
+    """
+
+    def __init__(self, buffer_size: int = 512, count: int = 4):
+        """
+        Initialize the BufferPool instance.
+
+        Args:
+            buffer_size (int): The size of each buffer in bytes, at least one frame with preamble.
+            count (int): The number of buffers allocated up front.
+        """
+        self.buffer_size = buffer_size
+        self.free = [memoryview(bytearray(buffer_size)) for _ in range(count)]
+        self.allocated = count
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def acquire(self) -> memoryview:
+        """
+        Take a buffer from the pool.
+
+        Returns:
+            memoryview: A writable buffer of buffer_size bytes.
+        """
+        with self.lock:
+            if self.free:
+                return self.free.pop()
+            self.allocated += 1
+        self.logger.debug(f"Buffer pool exhausted, {self.allocated} buffers allocated")
+        return memoryview(bytearray(self.buffer_size))
+
+    def release(self, buffer: memoryview):
+        """
+        Return a buffer to the pool.
+
+        Args:
+            buffer (memoryview): A buffer obtained from acquire().
+        """
+        with self.lock:
+            self.free.append(buffer)
+
+
+class PooledResponse:
+    """
+    A response payload held in a pooled buffer without copying.
+
+    The payload stays valid until release() is called, directly or by leaving a `with`
+    block; afterwards `data` is released and the buffer is reused by later transactions,
+    so keep a copy (tobytes()) of anything needed longer. Slices taken from `data` share
+    the buffer and must not outlive the response either.
+
+    Attributes:
+        data (memoryview): The payload.
+    """
+
+    def __init__(self, pool: BufferPool, buffer: memoryview, data: memoryview):
+        """
+        Initialize the PooledResponse instance.
+
+        Args:
+            pool (BufferPool): The pool the buffer belongs to.
+            buffer (memoryview): The pooled buffer.
+            data (memoryview): The payload within the buffer.
+        """
+        self.pool = pool
+        self.buffer = buffer
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    def tobytes(self) -> bytes:
+        """
+        Copy the payload out of the pooled buffer.
+
+        Returns:
+            bytes: The payload.
+        """
+        return self.data.tobytes()
+
+    def release(self):
+        """
+        Return the buffer to the pool; the payload must not be used afterwards.
+        """
+        if self.buffer is not None:
+            self.data.release()
+            self.pool.release(self.buffer)
+            self.buffer = None
@@ -0,0 +1,486 @@
+import os
+import mmap
+import time
+import struct
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from . import protocol
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# magic, frame length, timestamp (time.time())
+RECORD_HEADER = struct.Struct('<2sHd')
+MAGIC = b'\xA5\x5A'
+MAX_FRAME_LENGTH = 256
+
+# Frame kinds
+KIND_UNKNOWN = 0
+KIND_REQUEST = 1
+KIND_RESPONSE = 2
+KIND_EVENT_REQUEST = 3
+KIND_EVENTS = 4
+KIND_NO_EVENTS = 5
+KIND_SCAN = 6
+KIND_CONFIG_EVENTS = 7
+KIND_RTU = 8
+
+# Transaction statuses
+STATUS_OK = 0
+STATUS_EXCEPTION = 1
+STATUS_TIMEOUT = 2
+STATUS_CRC_ERROR = 3
+
+# The leading frame bytes holding every decoded field
+HEAD_LENGTH = 12
+
+
+class CaptureWriter:
+    """
+    Records bus frames into a capture file.
+
+    A capture is a sequence of records, each a RECORD_HEADER (magic, frame length and
+    timestamp) followed by the frame with its CRC. The magic lets a reader starting
+    anywhere in the file find the next record, which is how CaptureDecoder splits large
+    captures between processes.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open the capture file for appending.
+
+        Args:
+            path (str): The capture file path.
+        """
+        self.path = path
+        self.file = open(path, 'ab')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_frame(self, frame: bytes, timestamp: float = None):
+        """
+        Append one frame.
+
+        Args:
+            frame (bytes): The frame as seen on the bus, including its CRC.
+            timestamp (float): The time the frame was seen (time.time()), the current time if None.
+
+        Raises:
+            ValueError: If the frame is empty or longer than an RTU frame.
+        """
+        if not 0 < len(frame) <= MAX_FRAME_LENGTH:
+            raise ValueError(f"Invalid frame length: {len(frame)}")
+        self.file.write(RECORD_HEADER.pack(MAGIC, len(frame), time.time() if timestamp is None else timestamp))
+        self.file.write(frame)
+
+    def close(self):
+        """
+        Close the capture file.
+        """
+        self.file.close()
+
+
+def record_at(buffer, position: int) -> int:
+    """
+    Check whether a record starts at a position, and find where it ends.
+
+    The record must have the magic and a valid length, and be followed by the end of the
+    capture or by the magic of another record.
+
+    Args:
+        buffer: The capture contents.
+        position (int): The position to check.
+
+    Returns:
+        int: The position after the record, or -1 if no record starts there.
+    """
+    size = len(buffer)
+    if position + RECORD_HEADER.size > size or buffer[position:position + 2] != MAGIC:
+        return -1
+    length = int.from_bytes(buffer[position + 2:position + 4], 'little')
+    end = position + RECORD_HEADER.size + length
+    if not 0 < length <= MAX_FRAME_LENGTH or end > size or (end < size and buffer[end:end + 2] != MAGIC):
+        return -1
+    return end
+
+
+def frame_rows(contents, length: int, writeable: bool = False) -> "np.ndarray":
+    """
+    View a byte array as the rows of `length` bytes starting at each of its positions.
+
+    Indexing the view with frame positions gathers frames of one length without building
+    an index for every byte.
+
+    Args:
+        contents (numpy.ndarray): The bytes (uint8).
+        length (int): The row length.
+        writeable (bool): True to allow assigning to the rows.
+
+    Returns:
+        numpy.ndarray: The view, one row per start position.
+    """
+    return np.lib.stride_tricks.sliding_window_view(contents, int(length), writeable=writeable)
+
+
+def copy_frames(contents, positions, lengths, data, offsets):
+    """
+    Copy frames from a byte array to their offsets in another, one frame length at a time.
+
+    Args:
+        contents (numpy.ndarray): The source bytes (uint8).
+        positions (numpy.ndarray): The position of every frame in contents.
+        lengths (numpy.ndarray): The frame lengths.
+        data (numpy.ndarray): The target bytes (uint8).
+        offsets (numpy.ndarray): The position of every frame in data.
+    """
+    for length in np.unique(lengths):
+        selected = np.flatnonzero(lengths == length)
+        frame_rows(data, length, writeable=True)[offsets[selected]] = frame_rows(contents, length)[positions[selected]]
+
+
+def crc_ok_vectorized(frames) -> "np.ndarray":
+    """
+    Check the CRCs of many frames of one length at once.
+
+    The CRC is computed for all frames together, one byte position at a time, with the
+    table lookup applied to whole columns.
+
+    Args:
+        frames (numpy.ndarray): The frames, one per row (uint8).
+
+    Returns:
+        numpy.ndarray: True for every frame whose CRC is valid.
+    """
+    table = np.array(protocol.CRC_TABLE, dtype=np.uint16)
+    count, length = frames.shape
+    if length < 3:
+        return np.zeros(count, dtype=bool)
+    crc = np.full(count, 0xFFFF, dtype=np.uint16)
+    for column in range(length - 2):
+        crc = (crc >> 8) ^ table[(crc ^ frames[:, column]) & 0xFF]
+    return crc == (frames[:, -2].astype(np.uint16) | frames[:, -1].astype(np.uint16) << 8)
+
+
+def decode_chunk(path: str, start: int, end: int, ext_func_code: int = protocol.EXT_FUNC_CODE) -> dict:
+    """
+    Decode the records of a capture starting in a byte range.
+
+    Runs in the worker processes. The range start need not be a record boundary: decoding
+    begins at the first record at or after it, and every record starting before the range
+    end is decoded, so adjacent ranges decode every record exactly once.
+
+    Args:
+        path (str): The capture file path.
+        start (int): The first byte of the range.
+        end (int): The byte after the range.
+        ext_func_code (int): The extension function code.
+
+    Returns:
+        dict: The frame and event columns of the range (see CaptureDecoder.decode), the
+        position of every frame in the file (frame_position) and the number of "resyncs"
+        after corrupt records. The frame bytes stay in the file, so only the columns are
+        sent back to the parent process.
+    """
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        positions = []
+        lengths = []
+        timestamps = []
+        resyncs = 0
+        position = start
+        unpack_from = RECORD_HEADER.unpack_from
+        header_size = RECORD_HEADER.size
+        while position < end:
+            record_end = record_at(buffer, position)
+            if record_end < 0:
+                if positions:
+                    resyncs += 1
+                position = buffer.find(MAGIC, position + 1, end + 1)
+                if position < 0:
+                    break
+                continue
+            _, length, timestamp = unpack_from(buffer, position)
+            positions.append(position + header_size)
+            lengths.append(length)
+            timestamps.append(timestamp)
+            # Follow the chain of records without validating each one again
+            position = record_end
+            while position < end and buffer[position:position + 2] == MAGIC:
+                _, length, timestamp = unpack_from(buffer, position)
+                if not 0 < length <= MAX_FRAME_LENGTH or position + header_size + length > len(buffer):
+                    break
+                positions.append(position + header_size)
+                lengths.append(length)
+                timestamps.append(timestamp)
+                position += header_size + length
+
+        contents = np.frombuffer(buffer, dtype=np.uint8)
+        positions = np.array(positions, dtype=np.int64)
+        lengths = np.array(lengths, dtype=np.int64)
+        count = len(positions)
+
+        crc_ok = np.zeros(count, dtype=bool)
+        head = np.zeros((count, HEAD_LENGTH), dtype=np.uint8)
+        for length in np.unique(lengths):
+            selected = np.flatnonzero(lengths == length)
+            frames = frame_rows(contents, length)[positions[selected]]
+            crc_ok[selected] = crc_ok_vectorized(frames)
+            head[selected, :min(length, HEAD_LENGTH)] = frames[:, :HEAD_LENGTH]
+        columns = classify(head, lengths, ext_func_code)
+        columns.update(decode_events(contents, positions, lengths, columns, crc_ok))
+        del contents
+
+    columns.update(frame_timestamp=np.array(timestamps, dtype=np.float64), frame_length=lengths.astype(np.uint16),
+                   frame_crc_ok=crc_ok, frame_position=positions)
+    columns["resyncs"] = resyncs
+    return columns
+
+
+def classify(head, lengths, ext_func_code: int) -> dict:
+    """
+    Classify frames and extract their addressing fields from their leading bytes.
+
+    Args:
+        head (numpy.ndarray): The first HEAD_LENGTH bytes of every frame, zero padded.
+        lengths (numpy.ndarray): The frame lengths.
+        ext_func_code (int): The extension function code.
+
+    Returns:
+        dict: The frame_kind, frame_slave, frame_serial, frame_function, frame_register,
+        frame_count and frame_exception columns (0 where a field does not apply).
+    """
+    head = head.astype(np.uint32)
+    broadcast = head[:, 0] == protocol.BROADCAST_ADDRESS
+    extension = (head[:, 1] == ext_func_code) & (lengths >= 5)
+    sub_command = head[:, 2]
+
+    kind = np.full(len(head), KIND_RTU, dtype=np.uint8)
+    kind[lengths < 4] = KIND_UNKNOWN
+    kind[extension & broadcast & (sub_command >= protocol.SCAN_START) & (sub_command <= protocol.SCAN_END)] = KIND_SCAN
+    kind[extension & broadcast & (sub_command == protocol.REQUEST) & (lengths >= 14)] = KIND_REQUEST
+    kind[extension & broadcast & (sub_command == protocol.RESPONSE) & (lengths >= 11)] = KIND_RESPONSE
+    kind[extension & broadcast & (sub_command == protocol.REQUEST_EVENTS)] = KIND_EVENT_REQUEST
+    kind[extension & (sub_command == protocol.EVENTS) & (lengths >= protocol.EVENT_RESPONSE_OVERHEAD)] = KIND_EVENTS
+    kind[extension & broadcast & (sub_command == protocol.NO_EVENTS)] = KIND_NO_EVENTS
+    kind[extension & (sub_command == protocol.CONFIG_EVENTS)] = KIND_CONFIG_EVENTS
+
+    addressed = (kind == KIND_REQUEST) | (kind == KIND_RESPONSE)
+    request = kind == KIND_REQUEST
+    serial = (head[:, 3] << 24) | (head[:, 4] << 16) | (head[:, 5] << 8) | head[:, 6]
+    function = head[:, 7]
+    exception = (kind == KIND_RESPONSE) & (function & protocol.EXCEPTION_FLAG > 0)
+    return {
+        "frame_kind": kind,
+        "frame_slave": head[:, 0].astype(np.uint8),
+        "frame_serial": np.where(addressed, serial, 0).astype(np.uint32),
+        "frame_function": np.where(addressed, function, 0).astype(np.uint8),
+        "frame_register": np.where(request, (head[:, 8] << 8) | head[:, 9], 0).astype(np.uint16),
+        "frame_count": np.where(request, (head[:, 10] << 8) | head[:, 11], 0).astype(np.uint16),
+        "frame_exception": np.where(exception, head[:, 8], 0).astype(np.uint8),
+    }
+
+
+def decode_events(contents, positions, lengths, columns: dict, crc_ok) -> dict:
+    """
+    Decode the events of the valid event response frames.
+
+    Args:
+        contents (numpy.ndarray): The bytes holding the frames (uint8).
+        positions (numpy.ndarray): The position of every frame in contents.
+        lengths (numpy.ndarray): The frame lengths.
+        columns (dict): The frame columns of classify().
+        crc_ok (numpy.ndarray): The CRC check result of every frame.
+
+    Returns:
+        dict: The event_frame (index of the frame within the chunk), event_device_id,
+        event_type, event_id and event_value columns.
+    """
+    events = []
+    for index in np.flatnonzero((columns["frame_kind"] == KIND_EVENTS) & crc_ok):
+        frame = contents[positions[index]:positions[index] + lengths[index]].tobytes()
+        header = protocol.decode_event_header(frame)
+        if header is None:
+            continue
+        for event_type, event_id, _, value in protocol.iter_events(frame[:-protocol.CRC.size], header[2]):
+            events.append((index, header[0], event_type, event_id, value))
+    table = np.array(events, dtype=np.int64).reshape(-1, 5)
+    return {
+        "event_frame": table[:, 0],
+        "event_device_id": table[:, 1].astype(np.uint8),
+        "event_type": table[:, 2].astype(np.uint8),
+        "event_id": table[:, 3].astype(np.uint16),
+        "event_value": table[:, 4],
+    }
+
+
+class CaptureDecoder:
+    """
+    Decodes capture files into columnar frame, transaction and event datasets.
+
+    The file is cut into byte ranges of `chunk_size`, which worker processes decode
+    independently: each finds the first record in its range by the record magic, checks
+    the CRCs of all its frames with vectorized NumPy operations, and classifies them
+    from their leading bytes. Only event frames are parsed one by one. The chunks are
+    joined in file order, requests are paired with the responses following them, and
+    the columns can be saved to one .npz file:
+
+    - frame_*: timestamp, length, crc_ok, kind (KIND_*), slave, serial, function,
+      register, count and exception of every frame; frame_data holds the frame bytes
+      back to back and frame_offsets where each frame starts in it.
+    - transaction_*: timestamp, serial, function, register, count, status (STATUS_*),
+      latency (NaN if unanswered) and exception of every extended read or write request.
+    - event_*: frame (index), timestamp, device_id, type, id and value of every event.
+    """
+
+    def __init__(self, workers: int = None, chunk_size: int = 64 << 20, ext_func_code: int = protocol.EXT_FUNC_CODE):
+        """
+        Initialize the CaptureDecoder instance.
+
+        Args:
+            workers (int): The number of worker processes, one per CPU if None, 1 to decode in this process.
+            chunk_size (int): The size of the byte ranges decoded by one worker task.
+            ext_func_code (int): The extension function code.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if np is None:
+            raise ImportError("CaptureDecoder requires NumPy (pip install fastmodbuslibrary[numpy])")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.ext_func_code = ext_func_code
+        self.stats = {}
+        self.logger = logging.getLogger(__name__)
+
+    def decode(self, path: str, output: str = None, compress: bool = False) -> dict:
+        """
+        Decode a capture file.
+
+        Args:
+            path (str): The capture file path.
+            output (str): The .npz file to save the columns to, none if None.
+            compress (bool): True to compress the .npz file.
+
+        Returns:
+            dict: The frame_*, transaction_* and event_* columns as NumPy arrays.
+        """
+        started = time.monotonic()
+        size = os.path.getsize(path)
+        ranges = [(start, min(start + self.chunk_size, size)) for start in range(0, size, self.chunk_size)]
+        arguments = ([path] * len(ranges), [start for start, _ in ranges], [end for _, end in ranges],
+                     [self.ext_func_code] * len(ranges))
+        if self.workers == 1 or len(ranges) <= 1:
+            chunks = list(map(decode_chunk, *arguments))
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(ranges))) as executor:
+                chunks = list(executor.map(decode_chunk, *arguments))
+
+        columns = self.merge(chunks, path)
+        columns.update(self.pair_transactions(columns))
+        elapsed = time.monotonic() - started
+        self.stats = {"bytes": size, "chunks": len(ranges), "frames": len(columns["frame_kind"]),
+                      "crc_errors": int(np.count_nonzero(~columns["frame_crc_ok"])),
+                      "events": len(columns["event_type"]), "resyncs": sum(chunk["resyncs"] for chunk in chunks),
+                      "seconds": elapsed}
+        self.logger.info(f"Decoded {self.stats['frames']} frames from {size} bytes in {elapsed:.2f}s "
+                         f"({len(ranges)} chunks, {self.stats['crc_errors']} CRC errors)")
+        if output:
+            (np.savez_compressed if compress else np.savez)(output, **columns)
+        return columns
+
+    def merge(self, chunks: list, path: str) -> dict:
+        """
+        Join the columns of the chunks in file order.
+
+        The frame bytes are copied from the capture file straight into frame_data, so the
+        frames are held in memory once.
+
+        Args:
+            chunks (list): The results of decode_chunk.
+            path (str): The capture file path.
+
+        Returns:
+            dict: The frame and event columns, with frame_data, frame_offsets and event_timestamp added.
+        """
+        frame_counts = np.array([len(chunk["frame_kind"]) for chunk in chunks], dtype=np.int64)
+        frame_bases = np.cumsum(frame_counts) - frame_counts
+        columns = {}
+        for name in chunks[0] if chunks else ():
+            if name == "resyncs":
+                continue
+            if name == "event_frame":
+                parts = [chunk[name] + base for chunk, base in zip(chunks, frame_bases)]
+            else:
+                parts = [chunk[name] for chunk in chunks]
+            columns[name] = np.concatenate(parts)
+        if not chunks:
+            columns = decode_empty()
+        positions = columns.pop("frame_position")
+        lengths = columns["frame_length"].astype(np.int64)
+        offsets = np.cumsum(lengths) - lengths
+        data = np.empty(int(lengths.sum()), dtype=np.uint8)
+        if len(data):
+            with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                contents = np.frombuffer(buffer, dtype=np.uint8)
+                copy_frames(contents, positions, lengths, data, offsets)
+                del contents
+        columns["frame_data"] = data
+        columns["frame_offsets"] = offsets
+        columns["event_timestamp"] = columns["frame_timestamp"][columns["event_frame"]]
+        return columns
+
+    def pair_transactions(self, columns: dict) -> dict:
+        """
+        Pair every extended request with the response that follows it.
+
+        Args:
+            columns (dict): The frame columns.
+
+        Returns:
+            dict: The transaction_* columns.
+        """
+        kind = columns["frame_kind"]
+        serial = columns["frame_serial"]
+        requests = np.flatnonzero(kind == KIND_REQUEST)
+        following = np.minimum(requests + 1, len(kind) - 1)
+        answered = ((requests + 1 < len(kind)) & (kind[following] == KIND_RESPONSE)
+                    & (serial[following] == serial[requests]))
+        response_ok = columns["frame_crc_ok"][following]
+        exception = columns["frame_exception"][following]
+
+        status = np.full(len(requests), STATUS_TIMEOUT, dtype=np.uint8)
+        status[answered & ~response_ok] = STATUS_CRC_ERROR
+        status[answered & response_ok] = STATUS_OK
+        status[answered & response_ok & (columns["frame_function"][following] & protocol.EXCEPTION_FLAG > 0)] = STATUS_EXCEPTION
+        timestamps = columns["frame_timestamp"]
+        return {
+            "transaction_timestamp": timestamps[requests],
+            "transaction_serial": serial[requests],
+            "transaction_function": columns["frame_function"][requests],
+            "transaction_register": columns["frame_register"][requests],
+            "transaction_count": columns["frame_count"][requests],
+            "transaction_status": status,
+            "transaction_latency": np.where(answered, timestamps[following] - timestamps[requests], np.nan),
+            "transaction_exception": np.where(status == STATUS_EXCEPTION, exception, 0).astype(np.uint8),
+        }
+
+
+def decode_empty() -> dict:
+    """
+    Build the columns of a capture without frames.
+
+    Returns:
+        dict: Empty frame and event columns.
+    """
+    empty = classify(np.zeros((0, HEAD_LENGTH), dtype=np.uint8), np.zeros(0, dtype=np.int64), protocol.EXT_FUNC_CODE)
+    empty.update(frame_timestamp=np.zeros(0), frame_length=np.zeros(0, dtype=np.uint16),
+                 frame_crc_ok=np.zeros(0, dtype=bool), frame_position=np.zeros(0, dtype=np.int64))
+    empty.update(decode_events(np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=np.int64),
+                               np.zeros(0, dtype=np.int64), empty, empty["frame_crc_ok"]))
+    return empty
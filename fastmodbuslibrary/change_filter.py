@@ -0,0 +1,292 @@
+import time
+import logging
+from . import protocol
+from .register_codec import RegisterCodec, decode_bits
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Delta:
+    """
+    The values of one block that changed, or are due for a heartbeat.
+
+    Attributes:
+        addresses (list): The address of each value, ascending.
+        values: The new values, a NumPy array when NumPy is installed and a list otherwise.
+    """
+
+    def __init__(self, serial_number: int, function: int, addresses, values):
+        """
+        Initialize the Delta instance.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            function (int): The read function code.
+            addresses: The address of each value.
+            values: The new values.
+        """
+        self.serial_number = serial_number
+        self.function = function
+        self.addresses = addresses
+        self.values = values
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def __repr__(self):
+        return f"Delta({self.serial_number}, {self.function:#04x}, {dict(zip(self.addresses, self.values))})"
+
+
+class ChangeFilter:
+    """
+    Passes on only the polled values that changed beyond their deadband.
+
+    Every block is decoded with the codec and compared as a whole with the values last
+    passed on for it. A value is passed on if it differs from the last one passed on by
+    more than its deadband: the larger of an absolute band and a percentage of the last
+    value. Comparing with the last value passed on, not the last one read, keeps slow
+    drifts from going unreported. Blocks without a deadband are compared exactly in the
+    codec's type, so 64-bit counters are not rounded to floats. With a heartbeat, values
+    not passed on for that long are passed on again, so consumers can tell a stable value
+    from a lost device. The first read of a block passes on all of its values.
+
+    Coils and discrete inputs (0x01 and 0x02) arrive as packed bits; they are unpacked
+    with decode_bits instead of the codec and compared exactly, one address per bit.
+
+    handle_poll() is a PollScheduler callback, and update() takes the same arguments as
+    the HybridAcquisition callback, so the filter can sit directly on either. The
+    HybridAcquisition callback does not say how many bits a bit block holds, so there the
+    padding bits of its last byte are passed on as addresses past the block (off, once).
+
+    Attributes:
+        stats (dict): Counters of "blocks" and "values" compared, "changed" values passed
+            on for a change and "heartbeats" passed on for the heartbeat.
+    """
+
+    def __init__(self, callback, codec: RegisterCodec = None, absolute: float = 0.0, percent: float = 0.0,
+                 heartbeat: float = None, clock=time.monotonic):
+        """
+        Initialize the ChangeFilter instance.
+
+        Args:
+            callback (callable): Called as callback(delta) with each non-empty Delta.
+            codec (RegisterCodec): The codec decoding the blocks, uint16 if None.
+            absolute (float): The default absolute deadband.
+            percent (float): The default deadband as a percentage of the last value.
+            heartbeat (float): The longest interval without passing on a value (in seconds), None for no heartbeat.
+            clock (callable): The time source (in seconds).
+        """
+        self.callback = callback
+        self.codec = codec or RegisterCodec()
+        self.default_band = (absolute, percent)
+        self.heartbeat = heartbeat
+        self.clock = clock
+        self.deadbands = {}
+        self.blocks = {}
+        self.stats = {"blocks": 0, "values": 0, "changed": 0, "heartbeats": 0}
+        self.logger = logging.getLogger(__name__)
+
+    def set_deadband(self, serial_number: int, function: int, register: int, count: int = 1,
+                     absolute: float = 0.0, percent: float = 0.0):
+        """
+        Set the deadband of values.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            function (int): The read function code.
+            register (int): The address of the first value.
+            count (int): The number of values.
+            absolute (float): The absolute deadband.
+            percent (float): The deadband as a percentage of the last value passed on.
+        """
+        step = self.step(function)
+        for address in range(register, register + count * step, step):
+            self.deadbands[(serial_number, function, address)] = (absolute, percent)
+        for key, block in self.blocks.items():
+            if key[:2] == (serial_number, function):
+                block["bands"] = None
+
+    def reset(self, serial_number: int = None):
+        """
+        Forget the values passed on, so the next read of each block passes on all of its values.
+
+        Args:
+            serial_number (int): The serial number of the device, None for all devices.
+        """
+        for key in [key for key in self.blocks if serial_number is None or key[0] == serial_number]:
+            del self.blocks[key]
+
+    def step(self, function: int) -> int:
+        """
+        Get the address step between the values of a function.
+
+        Args:
+            function (int): The read function code.
+
+        Returns:
+            int: 1 for coils and discrete inputs, the registers per value of the codec otherwise.
+        """
+        return 1 if function in protocol.BIT_FUNCTIONS else self.codec.registers
+
+    def compile_bands(self, serial_number: int, function: int, addresses: list):
+        """
+        Collect the deadbands of a block into one absolute and one relative band per value.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            function (int): The read function code.
+            addresses (list): The address of each value.
+
+        Returns:
+            tuple: The absolute bands and the relative bands (as fractions), NumPy arrays when NumPy is installed.
+        """
+        bands = [self.deadbands.get((serial_number, function, address), self.default_band) for address in addresses]
+        absolute = [band[0] for band in bands]
+        relative = [band[1] / 100.0 for band in bands]
+        if np is not None:
+            return np.array(absolute, dtype=float), np.array(relative, dtype=float)
+        return absolute, relative
+
+    def update(self, serial_number: int, function: int, register: int, data: bytes, count: int = None) -> Delta:
+        """
+        Compare a block read with the values last passed on and pass on the changes.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            function (int): The read function code.
+            register (int): The starting register address.
+            data (bytes): The register data (packed bits for coils and discrete inputs), or None if the read failed.
+            count (int): The number of coils or discrete inputs of a bit block, every bit of the data if None.
+
+        Returns:
+            Delta: The values passed on, None if there were none.
+        """
+        if data is None:
+            return None
+        bits = function in protocol.BIT_FUNCTIONS
+        if bits:
+            values = decode_bits(data, 8 * len(data) if count is None else count)
+        else:
+            values = self.codec.decode(data)
+        now = self.clock()
+        key = (serial_number, function, register)
+        block = self.blocks.get(key)
+        if block is None or len(block["last"]) != len(values):
+            step = self.step(function)
+            addresses = list(range(register, register + len(values) * step, step))
+            block = {"addresses": addresses, "last": None, "emitted": None, "bands": None, "exact": True}
+            self.blocks[key] = block
+        if block["bands"] is None:
+            block["bands"] = self.compile_bands(serial_number, function, block["addresses"])
+            absolute, relative = block["bands"]
+            block["exact"] = bits or not (any(absolute) or any(relative))
+        self.stats["blocks"] += 1
+        self.stats["values"] += len(values)
+
+        if np is not None:
+            values = np.asarray(values)
+            indices, heartbeats = self.compare_arrays(block, values, now)
+            if not len(indices):
+                return None
+            delta = Delta(serial_number, function, [block["addresses"][i] for i in indices], values[indices])
+        else:
+            if not isinstance(values, list):
+                values = values.tolist()
+            indices, heartbeats = self.compare_lists(block, values, now)
+            if not indices:
+                return None
+            delta = Delta(serial_number, function, [block["addresses"][i] for i in indices],
+                          [values[i] for i in indices])
+
+        self.stats["changed"] += len(indices) - heartbeats
+        self.stats["heartbeats"] += heartbeats
+        self.callback(delta)
+        return delta
+
+    def compare_arrays(self, block: dict, values, now: float):
+        """
+        Find the values to pass on with vectorized comparisons, and record them as passed on.
+
+        Args:
+            block (dict): The state of the block.
+            values (numpy.ndarray): The decoded values.
+            now (float): The current time (in seconds).
+
+        Returns:
+            tuple: The indices of the values to pass on, and how many of them are passed on only for the heartbeat.
+        """
+        if block["last"] is None:
+            block["last"] = values.copy()
+            block["emitted"] = np.full(len(values), now)
+            return np.arange(len(values)), 0
+
+        last = block["last"]
+        if block["exact"]:
+            changed = values != last
+            if values.dtype.kind == "f":
+                # NaN staying NaN is not a change
+                changed &= ~(np.isnan(values) & np.isnan(last))
+        else:
+            current = values.astype(float)
+            previous = last.astype(float)
+            absolute, relative = block["bands"]
+            changed = np.abs(current - previous) > np.maximum(absolute, relative * np.abs(previous))
+            # A value turning into or out of NaN is a change, NaN staying NaN is not
+            changed |= np.isnan(current) != np.isnan(previous)
+        selected = changed
+        if self.heartbeat is not None:
+            selected = changed | (now - block["emitted"] >= self.heartbeat)
+        indices = np.flatnonzero(selected)
+        last[indices] = values[indices]
+        block["emitted"][indices] = now
+        return indices, len(indices) - int(np.count_nonzero(changed))
+
+    def compare_lists(self, block: dict, values: list, now: float):
+        """
+        Find the values to pass on without NumPy, and record them as passed on.
+
+        Args:
+            block (dict): The state of the block.
+            values (list): The decoded values.
+            now (float): The current time (in seconds).
+
+        Returns:
+            tuple: The indices of the values to pass on, and how many of them are passed on only for the heartbeat.
+        """
+        if block["last"] is None:
+            block["last"] = list(values)
+            block["emitted"] = [now] * len(values)
+            return list(range(len(values))), 0
+
+        last, emitted = block["last"], block["emitted"]
+        absolute, relative = block["bands"]
+        indices = []
+        heartbeats = 0
+        for i, value in enumerate(values):
+            previous = last[i]
+            if value != value or previous != previous:
+                changed = (value != value) != (previous != previous)
+            elif block["exact"]:
+                changed = value != previous
+            else:
+                changed = abs(value - previous) > max(absolute[i], relative[i] * abs(previous))
+            due = self.heartbeat is not None and now - emitted[i] >= self.heartbeat
+            if changed or due:
+                indices.append(i)
+                heartbeats += not changed
+                last[i] = value
+                emitted[i] = now
+        return indices, heartbeats
+
+    def handle_poll(self, task, data: bytes):
+        """
+        Filter the result of a scheduled poll.
+
+        Args:
+            task (PollTask): The finished poll.
+            data (bytes): The register data, or None if the read failed.
+        """
+        self.update(task.serial_number, task.command, task.register, data, task.count)
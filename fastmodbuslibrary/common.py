@@ -1,8 +1,12 @@
 import serial
-import struct
 import time
+import weakref
 import logging
 from .logging_config import setup_logging
+from .buffer_pool import BufferPool
+from .protocol import CRC, crc16
+from .retry_policy import RetryPolicy
+from .transport import SerialTransport, registry
 
 class ModbusCommon:
     """
@@ -10,63 +14,78 @@ class ModbusCommon:
 
     Attributes:
         BROADCAST_ADDRESS (int): The broadcast address for Modbus communication.
+        BITS_PER_CHAR (int): The number of bits on the wire per byte (start, 8 data, stop).
+        POLL_INTERVAL (float): The interval between checks for incoming data (in seconds).
     """
 
     BROADCAST_ADDRESS = 0xFD
+    BITS_PER_CHAR = 10
+    POLL_INTERVAL = 0.001
 
-    def __init__(self, device: str, baudrate: int, ext_func_code: int):
+    def __init__(self, device: str, baudrate: int, ext_func_code: int, retry_policy: RetryPolicy = None):
         """
         Initialize the ModbusCommon instance.
 
         Args:
             device (str): The serial device path (e.g., /dev/ttyUSB0).
             baudrate (int): The baud rate for the serial connection.
+            retry_policy (RetryPolicy): The timeout and retry policy, a default one sharing the
+                device health of the transport is created if None.
         """
         self.device = device
         self.baudrate = baudrate
         self.ext_func_code = ext_func_code
+        self.buffer_pool = BufferPool()
         self.logger = logging.getLogger(__name__)
         self.serial_port = self.init_serial()
+        self.retry_policy = retry_policy or RetryPolicy(health=self.serial_port.health)
+        # Event requests are answered by whichever device has events, so they say nothing about one device
+        self.retry_policy.health.exempt.add(self.BROADCAST_ADDRESS)
 
-    def init_serial(self) -> serial.Serial:
+    def init_serial(self) -> SerialTransport:
         """
         Initialize the serial connection.
 
-        Returns:
-            serial.Serial: The initialized serial connection.
+        The transport is shared with every other role using the same device and the
+        port itself is opened on first use. The reference is released by close(), on
+        leaving a `with` block, or when the role is garbage collected.
 
         Raises:
-            serial.SerialException: If there is an error initializing the serial port.
+            ValueError: If the device is in use at a different baud rate.
+
+        Returns:
+            SerialTransport: The shared serial transport.
         """
-        try:
-            return serial.Serial(
-                port=self.device,
-                baudrate=self.baudrate,
-                bytesize=serial.EIGHTBITS,
-                parity=serial.PARITY_NONE,
-                stopbits=serial.STOPBITS_ONE,
-                timeout=0
-            )
-        except serial.SerialException as e:
-            self.logger.error(f"Error initializing serial port: {e}")
-            raise
-
-    def calculate_crc(self, data: bytes) -> int:
+        transport = registry.acquire(self.device, self.baudrate)
+        transport.holders.add(self)
+        self.release_transport = weakref.finalize(self, registry.release, transport)
+        return transport
+
+    def close(self):
+        """
+        Release the serial connection, closing the port when no other role uses it.
+        """
+        self.release_transport()
+        self.serial_port = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def calculate_crc(self, data: bytes, length: int = None) -> int:
         """
         Calculate the CRC16 checksum for the given data.
 
         Args:
             data (bytes): The data for which to calculate the checksum.
+            length (int): The number of leading bytes to include, all if None.
 
         Returns:
             int: The calculated CRC16 checksum.
         """
-        crc = 0xFFFF
-        for byte in data:
-            crc ^= byte
-            for _ in range(8):
-                crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
-        return crc
+        return crc16(data, length)
 
     def check_crc(self, response: bytes) -> bool:
         """
@@ -78,7 +97,8 @@ class ModbusCommon:
         Returns:
             bool: True if the CRC is valid, False otherwise.
         """
-        return len(response) >= 3 and struct.unpack('<H', response[-2:])[0] == self.calculate_crc(response[:-2])
+        length = len(response)
+        return length >= 3 and response[-2] | response[-1] << 8 == self.calculate_crc(response, length - 2)
 
     def format_bytes(self, data: bytes) -> str:
         """
@@ -99,27 +119,224 @@ class ModbusCommon:
         Args:
             command (bytes): The command bytes to send.
         """
-        full_command = command + struct.pack('<H', self.calculate_crc(command))
-        self.logger.debug(f"SND: {self.format_bytes(full_command)}")
+        full_command = command + CRC.pack(self.calculate_crc(command))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"SND: {self.format_bytes(full_command)}")
         self.serial_port.write(full_command)
 
-    def wait_for_response(self, timeout: int = 2) -> bool:
+    def frame_airtime(self, length: int) -> float:
+        """
+        Calculate the time a frame occupies the bus at the current baud rate.
+
+        The result includes the 3.5 character silent interval that delimits RTU frames.
+
+        Args:
+            length (int): The frame length in bytes.
+
+        Returns:
+            float: The frame airtime (in seconds).
+        """
+        return (length + 3.5) * self.BITS_PER_CHAR / self.baudrate
+
+    def wait_for_response(self, timeout: float = 2) -> bool:
         """
         Wait for a response from the Modbus device.
 
+        A transport in low-latency mode blocks until data arrives, otherwise the receive
+        buffer is polled every POLL_INTERVAL.
+
         Args:
-            timeout (int): The maximum time to wait for a response (in seconds).
+            timeout (float): The maximum time to wait for a response (in seconds).
 
         Returns:
             bool: True if a response is received within the timeout, False otherwise.
         """
-        start_time = time.time()
-        while time.time() - start_time < timeout:
+        if getattr(self.serial_port, 'low_latency', False) is True:
+            try:
+                return self.serial_port.wait_readable(timeout)
+            except serial.SerialException as e:
+                self.logger.error(f"Error waiting for response: {e}")
+                return False
+
+        start_time = time.monotonic()
+        while time.monotonic() - start_time < timeout:
             try:
                 if self.serial_port.in_waiting > 0:
                     return True
             except serial.SerialException as e:
                 self.logger.error(f"Error waiting for response: {e}")
                 return False
-            time.sleep(0.1)
+            time.sleep(self.POLL_INTERVAL)
         return False
+
+    def receive_into(self, buffer: memoryview) -> int:
+        """
+        Read available data into a buffer without blocking.
+
+        Transports providing readinto fill the buffer directly; for others the data
+        read is copied in.
+
+        Args:
+            buffer (memoryview): The buffer to fill.
+
+        Returns:
+            int: The number of bytes received.
+        """
+        if hasattr(type(self.serial_port), 'readinto'):
+            return self.serial_port.readinto(buffer)
+        data = self.serial_port.read(len(buffer))[:len(buffer)]
+        buffer[:len(data)] = data
+        return len(data)
+
+    @staticmethod
+    def frame_start(buffer: memoryview, length: int) -> int:
+        """
+        Find the first byte after the 0xFF arbitration preamble.
+
+        Args:
+            buffer (memoryview): The received data.
+            length (int): The number of bytes received.
+
+        Returns:
+            int: The offset of the frame in the buffer.
+        """
+        start = 0
+        while start < length and buffer[start] == 0xFF:
+            start += 1
+        return start
+
+    def read_response_into(self, buffer: memoryview, deadline: float, expected_length: int = 256) -> int:
+        """
+        Read a response frame into a buffer until it is complete or the deadline passes.
+
+        The frame is complete once `expected_length` bytes have arrived or the bytes
+        received so far (without the 0xFF arbitration preamble) carry a valid CRC,
+        which covers shorter frames such as Modbus exception responses.
+
+        Args:
+            buffer (memoryview): The buffer receiving the frame.
+            deadline (float): The time.monotonic() value after which reading stops.
+            expected_length (int): The expected frame length in bytes.
+
+        Returns:
+            int: The number of bytes received, including any preamble.
+        """
+        low_latency = getattr(self.serial_port, 'low_latency', False) is True
+        length = self.receive_into(buffer)
+        while (length < expected_length and length < len(buffer)
+               and not self.check_crc(buffer[self.frame_start(buffer, length):length])
+               and time.monotonic() < deadline):
+            if low_latency:
+                self.serial_port.wait_readable(deadline - time.monotonic())
+            else:
+                time.sleep(self.POLL_INTERVAL)
+            length += self.receive_into(buffer[length:])
+        return length
+
+    def read_response(self, deadline: float, expected_length: int = 256) -> bytes:
+        """
+        Read a response frame until it is complete or the deadline passes.
+
+        Args:
+            deadline (float): The time.monotonic() value after which reading stops.
+            expected_length (int): The expected frame length in bytes.
+
+        Returns:
+            bytes: The received data, including any preamble.
+        """
+        buffer = self.buffer_pool.acquire()
+        try:
+            return buffer[:self.read_response_into(buffer, deadline, expected_length)].tobytes()
+        finally:
+            self.buffer_pool.release(buffer)
+
+    def transact(self, key, command: bytes, expected_length: int):
+        """
+        Send a command and receive its response according to the retry policy.
+
+        Args:
+            key: The device key for the retry policy (e.g., serial number).
+            command (bytes): The command bytes to send, without CRC.
+            expected_length (int): The expected response length in bytes, including CRC.
+
+        Returns:
+            bytes: The last response received without the 0xFF arbitration preamble (its
+            CRC may still be invalid once the retry budget is exhausted), or None if the
+            device did not answer.
+        """
+        buffer = self.buffer_pool.acquire()
+        try:
+            frame = self.transact_into(key, command, expected_length, buffer)
+            return None if frame is None else frame.tobytes()
+        finally:
+            self.buffer_pool.release(buffer)
+
+    def transact_into(self, key, command: bytes, expected_length: int, buffer: memoryview, deadline: float = None):
+        """
+        Send a command and receive its response into a buffer according to the retry policy.
+
+        The timeout is derived from the smoothed round-trip time of the device plus the
+        airtime of both frames. A response with an invalid CRC is retransmitted
+        immediately, an unanswered request after the timeout. With a deadline, the
+        timeout is cut short at the deadline and no retransmission starts after it.
+        Requests to a device quarantined by the policy's health tracker are refused
+        without a transaction, except for probes; a quarantined device gets no
+        retransmission after a timeout.
+
+        Args:
+            key: The device key for the retry policy (e.g., serial number).
+            command (bytes): The command bytes to send, without CRC.
+            expected_length (int): The expected response length in bytes, including CRC.
+            buffer (memoryview): The buffer receiving the response.
+            deadline (float): The time.monotonic() value by which the transaction must end, None for no limit.
+
+        Returns:
+            memoryview: The last response received without the 0xFF arbitration preamble,
+            within the buffer (its CRC may still be invalid once the retry budget is
+            exhausted), or None if the device did not answer or is quarantined.
+        """
+        policy = self.retry_policy
+        if not policy.health.admit(key):
+            self.logger.debug(f"Device {key} is quarantined, request refused")
+            return None
+        request_airtime = self.frame_airtime(len(command) + 2)
+        airtime = request_airtime + self.frame_airtime(expected_length)
+        timeout_retries = policy.max_retries
+        crc_retries = policy.crc_retries
+        response = None
+
+        with self.serial_port.lock:
+            while True:
+                timeout = policy.timeout(key, airtime)
+                start_time = time.monotonic()
+                cut_short = deadline is not None and deadline - start_time < timeout
+                if cut_short:
+                    timeout = max(deadline - start_time, 0.0)
+                self.send_command(command)
+
+                if self.wait_for_response(timeout):
+                    length = self.read_response_into(buffer, start_time + timeout, expected_length)
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug(f"RCV: {self.format_bytes(buffer[:length])}")
+                    response = buffer[self.frame_start(buffer, length):length]
+                    if self.check_crc(response):
+                        rtt = time.monotonic() - start_time - request_airtime - self.frame_airtime(len(response))
+                        policy.record_success(key, rtt)
+                        return response
+                    policy.record_crc_error(key)
+                    if crc_retries <= 0:
+                        return response
+                    crc_retries -= 1
+                else:
+                    # A wait cut short by the deadline says nothing about the device
+                    if not cut_short:
+                        policy.record_timeout(key)
+                    if timeout_retries <= 0 or policy.health.probing(key):
+                        return None
+                    timeout_retries -= 1
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    return response
+
+                self.logger.debug(f"Retransmitting request to {key}")
+                self.serial_port.reset_input_buffer()
@@ -0,0 +1,166 @@
+import time
+import logging
+
+
+class DeviceHealth:
+    """
+    Per-device health scores with quarantine of failing devices.
+
+    Every transaction outcome updates an exponentially weighted score per device: a
+    response counts 1, a response with a bad CRC 0.5 and an unanswered request 0. A device
+    is quarantined after `max_failures` timeouts in a row, or when its score falls below
+    `min_score`. Requests to a quarantined device are refused locally, except one probe
+    every probe interval; the interval starts at `probe_interval` and doubles with each
+    unanswered probe up to `max_probe_interval`. A device answering a probe is readmitted.
+
+    A quarantined device thus costs at most one timeout per probe interval, however often
+    it is polled.
+
+    Keys in `exempt` are never tracked or refused. They stand for traffic that is not one
+    device's, such as event requests to the broadcast address, which any device answers
+    and which go unanswered whenever no device has events.
+
+    Attributes:
+        HEALTHY (str): The state of a device whose requests are sent.
+        QUARANTINED (str): The state of a device whose requests are refused between probes.
+        ALPHA (float): The weight of a new outcome in the score.
+        CRC_ERROR_SCORE (float): The score of a response with an invalid CRC.
+    """
+
+    HEALTHY = "healthy"
+    QUARANTINED = "quarantined"
+    ALPHA = 0.2
+    CRC_ERROR_SCORE = 0.5
+
+    def __init__(self, max_failures: int = 3, min_score: float = 0.2, probe_interval: float = 5.0,
+                 max_probe_interval: float = 60.0, clock=time.monotonic, exempt: set = None):
+        """
+        Initialize the DeviceHealth instance.
+
+        Args:
+            max_failures (int): The number of timeouts in a row that quarantines a device, 0 disables quarantine.
+            min_score (float): The score below which a device is quarantined.
+            probe_interval (float): The first interval between probes of a quarantined device (in seconds).
+            max_probe_interval (float): The upper bound of the probe interval (in seconds).
+            clock (callable): The time source (in seconds).
+            exempt (set): The keys that are never tracked or refused.
+        """
+        self.max_failures = max_failures
+        self.min_score = min_score
+        self.probe_interval = probe_interval
+        self.max_probe_interval = max_probe_interval
+        self.clock = clock
+        self.devices = {}
+        self.exempt = set(exempt or ())
+        self.logger = logging.getLogger(__name__)
+
+    def device(self, key) -> dict:
+        """
+        Get the health record of a device, creating it on first use.
+
+        Args:
+            key: The device key (e.g., serial number).
+
+        Returns:
+            dict: The state, score, counters of successes, timeouts, CRC errors and refused
+            requests, the timeouts in a row, and the probe interval and time of the next probe.
+        """
+        record = self.devices.get(key)
+        if record is None:
+            record = {"state": self.HEALTHY, "score": 1.0, "success": 0, "timeout": 0, "crc_error": 0,
+                      "refused": 0, "failures": 0, "probe_interval": self.probe_interval, "next_probe": 0.0}
+            self.devices[key] = record
+        return record
+
+    def admit(self, key) -> bool:
+        """
+        Decide whether a request to the device is sent.
+
+        Args:
+            key: The device key (e.g., serial number).
+
+        Returns:
+            bool: True if the device is healthy or due for a probe, False if the request is refused.
+        """
+        record = self.devices.get(key)
+        if record is None or record["state"] == self.HEALTHY or self.clock() >= record["next_probe"] or key in self.exempt:
+            return True
+        record["refused"] += 1
+        return False
+
+    def probing(self, key) -> bool:
+        """
+        Check whether a request to the device is a probe of a quarantined device.
+
+        Args:
+            key: The device key (e.g., serial number).
+
+        Returns:
+            bool: True if the device is quarantined.
+        """
+        record = self.devices.get(key)
+        return record is not None and record["state"] == self.QUARANTINED
+
+    def record(self, key, outcome: str):
+        """
+        Update the health of a device with the outcome of a transaction.
+
+        Args:
+            key: The device key (e.g., serial number).
+            outcome (str): "success", "timeout" or "crc_error".
+        """
+        if key in self.exempt:
+            return
+        record = self.device(key)
+        record[outcome] += 1
+        value = {"success": 1.0, "crc_error": self.CRC_ERROR_SCORE}.get(outcome, 0.0)
+        record["score"] += self.ALPHA * (value - record["score"])
+        record["failures"] = record["failures"] + 1 if outcome == "timeout" else 0
+
+        if record["state"] == self.QUARANTINED:
+            if outcome == "success":
+                record["state"] = self.HEALTHY
+                record["score"] = max(record["score"], 2 * self.min_score)
+                record["probe_interval"] = self.probe_interval
+                self.logger.info(f"Device {key} answered again, readmitted")
+            else:
+                if outcome == "timeout":
+                    record["probe_interval"] = min(2 * record["probe_interval"], self.max_probe_interval)
+                record["next_probe"] = self.clock() + record["probe_interval"]
+        elif self.max_failures and (record["failures"] >= self.max_failures or record["score"] < self.min_score):
+            record["state"] = self.QUARANTINED
+            record["next_probe"] = self.clock() + record["probe_interval"]
+            self.logger.warning(f"Device {key} quarantined after {record['failures']} timeouts in a row "
+                                f"(score {record['score']:.2f}), probing every {record['probe_interval']}s")
+
+    def report(self, key=None) -> dict:
+        """
+        Report the health of one device or of all devices.
+
+        Args:
+            key: The device key (e.g., serial number), or None for all devices.
+
+        Returns:
+            dict: A copy of the health record of the device, or the records of all devices by key.
+        """
+        if key is not None:
+            return dict(self.device(key))
+        return {device_key: dict(record) for device_key, record in self.devices.items()}
+
+    def quarantined(self) -> list:
+        """
+        List the quarantined devices.
+
+        Returns:
+            list: The keys of the quarantined devices.
+        """
+        return [key for key, record in self.devices.items() if record["state"] == self.QUARANTINED]
+
+    def forget(self, key):
+        """
+        Drop the health record of a device, e.g., after timeouts caused by a baud rate change.
+
+        Args:
+            key: The device key (e.g., serial number).
+        """
+        self.devices.pop(key, None)
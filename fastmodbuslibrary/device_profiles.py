@@ -0,0 +1,300 @@
+import json
+import os
+import logging
+from .register_codec import RegisterCodec
+
+
+class ReadBlock:
+    """
+    One merged register range of a read plan together with its prepared decoders.
+
+    Attributes:
+        function (int): The read function code.
+        register (int): The starting register address.
+        count (int): The number of registers read.
+        period (float): The poll interval of the range (in seconds).
+        fields (list): Tuples of (name, start byte, end byte, codec) for every value in the range.
+    """
+
+    def __init__(self, function: int, register: int, count: int, period: float, fields: list):
+        """
+        Initialize the ReadBlock instance.
+
+        Args:
+            function (int): The read function code.
+            register (int): The starting register address.
+            count (int): The number of registers read.
+            period (float): The poll interval of the range (in seconds).
+            fields (list): Tuples of (name, start byte, end byte, codec).
+        """
+        self.function = function
+        self.register = register
+        self.count = count
+        self.period = period
+        self.fields = fields
+
+    def __repr__(self):
+        return f"ReadBlock({self.function:#04x}, {self.register}, {self.count}, period={self.period})"
+
+    def decode(self, data: bytes) -> dict:
+        """
+        Decode the values of a block read.
+
+        Args:
+            data (bytes): The register data of the whole range.
+
+        Returns:
+            dict: The value of every field by name.
+        """
+        return {name: codec.decode(data[start:end])[0] for name, start, end, codec in self.fields}
+
+
+class ReadPlan:
+    """
+    The compiled, device independent polling plan of a device model.
+
+    Attributes:
+        model (str): The device model the plan was compiled for.
+        blocks (list): The merged register ranges, as ReadBlock instances.
+    """
+
+    def __init__(self, model: str, blocks: list):
+        """
+        Initialize the ReadPlan instance.
+
+        Args:
+            model (str): The device model.
+            blocks (list): The merged register ranges.
+        """
+        self.model = model
+        self.blocks = blocks
+
+    def __repr__(self):
+        return f"ReadPlan({self.model!r}, {len(self.blocks)} blocks)"
+
+    def read(self, client, serial_number: int) -> dict:
+        """
+        Read and decode every register range of the plan once.
+
+        Args:
+            client (ModbusClient): The client used to read registers.
+            serial_number (int): The serial number of the device.
+
+        Returns:
+            dict: The values read by name; ranges that failed are left out.
+        """
+        values = {}
+        for block in self.blocks:
+            data = client.read_registers(serial_number, block.function, block.register, block.count)
+            if data is not None:
+                values.update(block.decode(data))
+        return values
+
+    def schedule(self, scheduler, serial_number: int, callback) -> list:
+        """
+        Add a periodic poll of every register range of the plan to a scheduler.
+
+        Args:
+            scheduler (PollScheduler): The scheduler of the bus.
+            serial_number (int): The serial number of the device.
+            callback (callable): Called as callback(serial_number, values) with the decoded values of each successful read.
+
+        Returns:
+            list: The scheduled PollTask instances.
+
+        Raises:
+            ValueError: If the plan does not fit the scheduler's bus budget.
+        """
+        tasks = []
+        for block in self.blocks:
+            def on_read(task, data, block=block):
+                if data is not None:
+                    callback(serial_number, block.decode(data))
+            tasks.append(scheduler.add_poll(serial_number, block.function, block.register, block.count,
+                                            block.period, callback=on_read))
+        return tasks
+
+
+class ProfileDatabase:
+    """
+    Device profiles keyed by model string, compiled into cached read plans.
+
+    A profile is a JSON file named after the model (as reported by
+    ModbusScanner.request_device_model) in one of the profile directories:
+
+        {
+            "model": "WBMAP3E",
+            "period": 1.0,
+            "registers": [
+                {"name": "voltage_l1", "function": 4, "address": 4313, "type": "uint16", "scale": 0.01},
+                {"name": "energy", "function": 4, "address": 4608, "type": "uint64", "word_order": "little",
+                 "period": 10.0}
+            ]
+        }
+
+    Profiles are only read when a device of that model is seen, and each one is compiled
+    once: registers with the same function and poll period are sorted and merged into
+    ranges of at most MAX_READ_REGISTERS registers, bridging gaps of up to `max_gap`
+    registers, and every value gets a prepared RegisterCodec. Use a `max_gap` of 0 for
+    devices that reject reads covering unused registers.
+
+    Attributes:
+        MAX_READ_REGISTERS (int): The largest number of registers read in one request.
+        DEFAULT_PERIOD (float): The poll interval of registers whose profile does not give one (in seconds).
+    """
+
+    MAX_READ_REGISTERS = 125
+    DEFAULT_PERIOD = 1.0
+
+    def __init__(self, directories: list = (), max_gap: int = 8):
+        """
+        Initialize the ProfileDatabase instance.
+
+        Args:
+            directories (list): The directories searched for profile files, in order.
+            max_gap (int): The largest number of unused registers read to merge two ranges.
+        """
+        self.directories = list(directories)
+        self.max_gap = max_gap
+        self.profiles = {}
+        self.plans = {}
+        self.logger = logging.getLogger(__name__)
+
+    def add_profile(self, profile: dict):
+        """
+        Add a profile without a file, replacing any profile of the same model.
+
+        Args:
+            profile (dict): The profile, in the same layout as a profile file.
+        """
+        self.profiles[profile["model"]] = profile
+        self.plans.pop(profile["model"], None)
+
+    def profile(self, model: str) -> dict:
+        """
+        Get the profile of a model, loading it on first use.
+
+        Args:
+            model (str): The device model.
+
+        Returns:
+            dict: The profile, or None if there is no profile for the model.
+        """
+        if model in self.profiles:
+            return self.profiles[model]
+
+        profile = None
+        for directory in self.directories:
+            path = os.path.join(directory, f"{model}.json")
+            if os.path.isfile(path):
+                with open(path) as file:
+                    profile = json.load(file)
+                self.logger.debug(f"Loaded profile for {model} from {path}")
+                break
+        self.profiles[model] = profile
+        return profile
+
+    def plan(self, model: str) -> ReadPlan:
+        """
+        Get the compiled read plan of a model.
+
+        Args:
+            model (str): The device model.
+
+        Returns:
+            ReadPlan: The cached plan, or None if there is no profile for the model.
+
+        Raises:
+            ValueError: If the profile uses an unknown register type or word order.
+        """
+        if model not in self.plans:
+            profile = self.profile(model)
+            self.plans[model] = None if profile is None else self.compile(profile)
+        return self.plans[model]
+
+    def compile(self, profile: dict) -> ReadPlan:
+        """
+        Compile a profile into merged register ranges with prepared decoders.
+
+        Args:
+            profile (dict): The profile.
+
+        Returns:
+            ReadPlan: The compiled plan.
+
+        Raises:
+            ValueError: If the profile uses an unknown register type or word order.
+        """
+        default_period = profile.get("period", self.DEFAULT_PERIOD)
+        codecs = {}
+        groups = {}
+        for entry in profile["registers"]:
+            key = (entry.get("type", "uint16"), entry.get("word_order", "big"),
+                   entry.get("scale", 1.0), entry.get("offset", 0.0))
+            if key not in codecs:
+                codecs[key] = RegisterCodec(*key)
+            group = (entry.get("function", 0x03), entry.get("period", default_period))
+            groups.setdefault(group, []).append((entry["address"], entry["name"], codecs[key]))
+
+        blocks = []
+        for (function, period), entries in sorted(groups.items()):
+            entries.sort(key=lambda entry: entry[0])
+            current = [entries[0]]
+            start, end = entries[0][0], entries[0][0] + entries[0][2].registers
+            for entry in entries[1:]:
+                address, _, codec = entry
+                if address - end <= self.max_gap and address + codec.registers - start <= self.MAX_READ_REGISTERS:
+                    current.append(entry)
+                    end = max(end, address + codec.registers)
+                    continue
+                blocks.append(self.make_block(function, period, current))
+                current = [entry]
+                start, end = address, address + codec.registers
+            blocks.append(self.make_block(function, period, current))
+
+        self.logger.debug(f"Compiled {len(profile['registers'])} registers of {profile['model']} into {len(blocks)} reads")
+        return ReadPlan(profile["model"], blocks)
+
+    @staticmethod
+    def make_block(function: int, period: float, entries: list) -> ReadBlock:
+        """
+        Build a read block covering a list of profile entries.
+
+        Args:
+            function (int): The read function code.
+            period (float): The poll interval (in seconds).
+            entries (list): Tuples of (address, name, codec), sorted by address.
+
+        Returns:
+            ReadBlock: The block.
+        """
+        start = entries[0][0]
+        end = max(address + codec.registers for address, _, codec in entries)
+        fields = [(name, 2 * (address - start), 2 * (address - start + codec.registers), codec)
+                  for address, name, codec in entries]
+        return ReadBlock(function, start, end - start, period, fields)
+
+    def schedule_devices(self, scheduler, devices: list, callback) -> list:
+        """
+        Poll every scanned device whose model has a profile.
+
+        Args:
+            scheduler (PollScheduler): The scheduler of the bus.
+            devices (list): Devices as returned by ModbusScanner.scan_devices.
+            callback (callable): Called as callback(serial_number, values) with the decoded values of each read.
+
+        Returns:
+            list: The devices without a profile, which are not polled.
+
+        Raises:
+            ValueError: If the plans do not fit the scheduler's bus budget.
+        """
+        unknown = []
+        for device in devices:
+            plan = self.plan(device["model"])
+            if plan is None:
+                self.logger.warning(f"No profile for model {device['model']} of device {device['serial_number']}")
+                unknown.append(device)
+                continue
+            plan.schedule(scheduler, device["serial_number"], callback)
+        return unknown
@@ -0,0 +1,603 @@
+import os
+import select
+import socket
+import threading
+import time
+import logging
+from collections import deque
+from . import protocol
+
+
+class EmulatedDevice:
+    """
+    An emulated Modbus device answering standard Modbus PDUs from an in-memory register map.
+
+    Devices report changes of the registers listed in `events` once events are enabled for
+    them, starting with a reboot event, and keep the events of the last packet sent until
+    the packet is confirmed. A device without coils or discrete inputs rejects their
+    functions as Illegal Function. A device with a baud rate switches to the rate written
+    to its baud rate register after answering the write.
+
+    Attributes:
+        BAUDRATE_REGISTER (int): The holding register of the baud rate in units of 100 baud.
+        MODEL_REGISTER (int): The first holding register of the model string.
+        MODEL_REGISTER_COUNT (int): The number of holding registers reserved for the model string.
+        SYSTEM_EVENT (int): The event type of system events (the reboot event has ID 0).
+    """
+
+    BAUDRATE_REGISTER = 110
+    MODEL_REGISTER = 200
+    MODEL_REGISTER_COUNT = 20
+    SYSTEM_EVENT = 0x0F
+
+    def __init__(self, serial_number: int, modbus_id: int, model: str = "", holding: dict = None, input: dict = None,
+                 events: set = None, coils: dict = None, discrete: dict = None, baudrate: int = None):
+        """
+        Initialize the EmulatedDevice instance.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            modbus_id (int): The Modbus slave ID of the device.
+            model (str): The model string, stored in holding registers 200-219.
+            holding (dict): Holding register values by address.
+            input (dict): Input register values by address.
+            events (set): The (function, address) pairs of registers that support events.
+            coils (dict): Coil values (0 or 1) by address.
+            discrete (dict): Discrete input values (0 or 1) by address.
+            baudrate (int): The baud rate of the device, held in holding register 110 as baud/100;
+                None for a device that hears any baud rate and has no such register.
+        """
+        self.serial_number = serial_number
+        self.modbus_id = modbus_id
+        self.model = model
+        self.registers = {0x01: dict(coils or {}), 0x02: dict(discrete or {}), 0x03: dict(holding or {}),
+                          0x04: dict(input or {})}
+        self.event_capable = set(events or ())
+        self.event_enabled = set()
+        self.pending_events = [bytes([0, self.SYSTEM_EVENT, 0, 0])]
+        self.unconfirmed = []
+        self.event_flag = 0
+        self.baudrate = baudrate
+        if baudrate is not None:
+            self.registers[0x03][self.BAUDRATE_REGISTER] = baudrate // 100
+
+        model_bytes = model.encode('ascii').ljust(2 * self.MODEL_REGISTER_COUNT, b'\x00')
+        for i in range(self.MODEL_REGISTER_COUNT):
+            self.registers[0x03].setdefault(self.MODEL_REGISTER + i, (model_bytes[2 * i] << 8) | model_bytes[2 * i + 1])
+
+    def exception(self, function: int, code: int) -> bytes:
+        """
+        Build an exception response PDU.
+
+        Args:
+            function (int): The function code of the request.
+            code (int): The Modbus exception code.
+
+        Returns:
+            bytes: The exception response PDU.
+        """
+        return bytes([function | 0x80, code])
+
+    def handle_pdu(self, pdu: bytes) -> bytes:
+        """
+        Execute a request PDU against the register map.
+
+        Args:
+            pdu (bytes): The request PDU (function code and data).
+
+        Returns:
+            bytes: The response PDU.
+        """
+        function = pdu[0]
+        if function in (0x01, 0x02) and len(pdu) >= 5 and self.registers[function]:
+            address, count = protocol.PDU_READ_RANGE.unpack_from(pdu, 1)
+            table = self.registers[function]
+            if not all(bit in table for bit in range(address, address + count)):
+                return self.exception(function, 0x02)
+            packed = bytearray((count + 7) // 8)
+            for offset in range(count):
+                if table[address + offset]:
+                    packed[offset // 8] |= 1 << (offset % 8)
+            return bytes([function, len(packed)]) + bytes(packed)
+        if function == 0x0F and len(pdu) >= 6 and self.registers[0x01]:
+            address, count, byte_count = protocol.PDU_WRITE_RANGE.unpack_from(pdu, 1)
+            if byte_count != (count + 7) // 8 or len(pdu) < 6 + byte_count:
+                return self.exception(function, 0x03)
+            if not all(bit in self.registers[0x01] for bit in range(address, address + count)):
+                return self.exception(function, 0x02)
+            for offset in range(count):
+                self.registers[0x01][address + offset] = pdu[6 + offset // 8] >> (offset % 8) & 1
+            return pdu[:5]
+        if function in (0x03, 0x04) and len(pdu) >= 5:
+            register, count = protocol.PDU_READ_RANGE.unpack_from(pdu, 1)
+            table = self.registers[function]
+            if not all(address in table for address in range(register, register + count)):
+                return self.exception(function, 0x02)
+            values = [table[address] for address in range(register, register + count)]
+            return protocol.PDU_READ_RESPONSE.pack(function, 2 * count) + protocol.register_block(count).pack(*values)
+        if function == 0x06 and len(pdu) >= 5:
+            register, value = protocol.PDU_READ_RANGE.unpack_from(pdu, 1)
+            if register not in self.registers[0x03]:
+                return self.exception(function, 0x02)
+            self.registers[0x03][register] = value
+            self.apply_settings()
+            return pdu[:5]
+        if function == 0x10 and len(pdu) >= 6:
+            register, count, byte_count = protocol.PDU_WRITE_RANGE.unpack_from(pdu, 1)
+            if byte_count != 2 * count or len(pdu) < 6 + byte_count:
+                return self.exception(function, 0x03)
+            if not all(address in self.registers[0x03] for address in range(register, register + count)):
+                return self.exception(function, 0x02)
+            for i, value in enumerate(protocol.register_block(count).unpack_from(pdu, 6)):
+                self.registers[0x03][register + i] = value
+            self.apply_settings()
+            return pdu[:5]
+        return self.exception(function, 0x01)
+
+    def apply_settings(self):
+        """
+        Take over the baud rate written to the baud rate register, once the write has been answered.
+        """
+        if self.baudrate is not None:
+            self.baudrate = self.registers[0x03][self.BAUDRATE_REGISTER] * 100
+
+    def set_value(self, function: int, address: int, value: int):
+        """
+        Change a register as the device itself would, queueing an event if one is enabled.
+
+        Args:
+            function (int): The read function code of the register (0x01 to 0x04).
+            address (int): The register address.
+            value (int): The new value.
+        """
+        self.registers[function][address] = value
+        if (function, address) in self.event_enabled:
+            # Coils and discrete inputs report a one byte value
+            payload = bytes([value]) if function in protocol.BIT_FUNCTIONS else protocol.EVENT_REGISTER_VALUE.pack(value)
+            self.pending_events.append(protocol.EVENT.pack(len(payload), function, address) + payload)
+
+    def configure_events(self, data: bytes) -> bytes:
+        """
+        Enable or disable events for the register ranges of a 0x18 request.
+
+        Args:
+            data (bytes): The ranges, each a register type, address, count and a priority per register.
+
+        Returns:
+            bytes: The mask of registers with events enabled, one bit per configured register.
+        """
+        bits = []
+        index = 0
+        while index + 4 <= len(data):
+            function, address, count = protocol.CONFIG_RANGE.unpack_from(data, index)
+            for offset, priority in enumerate(data[index + 4:index + 4 + count]):
+                key = (function, address + offset)
+                if priority and key in self.event_capable:
+                    self.event_enabled.add(key)
+                    bits.append(1)
+                else:
+                    self.event_enabled.discard(key)
+                    bits.append(0)
+            index += 4 + count
+        mask = bytearray((len(bits) + 7) // 8)
+        for position, bit in enumerate(bits):
+            mask[position // 8] |= bit << (position % 8)
+        return bytes(mask)
+
+    def confirm_events(self, flag: int):
+        """
+        Drop the events of the packet sent last if the master confirms it.
+
+        Args:
+            flag (int): The flag of the confirmed packet.
+        """
+        if self.unconfirmed and flag & ~protocol.MORE_EVENTS_FLAG == self.event_flag:
+            self.unconfirmed = []
+            self.event_flag ^= 1
+
+    def event_packet(self, max_data_length: int):
+        """
+        Take the events to send in response to an event request.
+
+        Unconfirmed events are sent again; otherwise pending events are taken up to
+        `max_data_length` bytes.
+
+        Args:
+            max_data_length (int): The maximum length of the event data in bytes.
+
+        Returns:
+            list: The encoded events, empty if there are none.
+        """
+        if not self.unconfirmed:
+            length = 0
+            while self.pending_events and length + len(self.pending_events[0]) <= max_data_length:
+                length += len(self.pending_events[0])
+                self.unconfirmed.append(self.pending_events.pop(0))
+        return self.unconfirmed
+
+    def reboot(self):
+        """
+        Restart the device: event settings are lost and a reboot event is queued.
+        """
+        self.event_enabled.clear()
+        self.unconfirmed = []
+        self.pending_events = [bytes([0, self.SYSTEM_EVENT, 0, 0])]
+
+
+class EmulatedBus:
+    """
+    An in-memory stand-in for a serial port with emulated devices attached.
+
+    It implements the subset of the transport interface used by the roles, so it can be
+    assigned to `serial_port` of any role. Requests written to it are answered by the
+    addressed device after `turnaround` seconds. A scan reports the listening devices in
+    order of serial number.
+
+    Attributes:
+        BROADCAST_ADDRESS (int): The address of fast Modbus extended frames.
+        RTU_BROADCAST_ID (int): The standard Modbus slave ID addressing every device without a response.
+    """
+
+    BROADCAST_ADDRESS = 0xFD
+    RTU_BROADCAST_ID = 0x00
+
+    def __init__(self, devices: list = None, ext_func_code: int = 0x46, turnaround: float = 0.0,
+                 baudrate: int = None, max_requests: int = None):
+        """
+        Initialize the EmulatedBus instance.
+
+        Args:
+            devices (list): The EmulatedDevice instances on the bus.
+            ext_func_code (int): The fast Modbus extension function code.
+            turnaround (float): The delay before a response becomes readable (in seconds).
+            baudrate (int): The baud rate of the master, None if every device hears it whatever its own.
+            max_requests (int): The number of recent requests kept in `requests`, None to keep all.
+        """
+        self.devices = list(devices or [])
+        self.ext_func_code = ext_func_code
+        self.turnaround = turnaround
+        self.baudrate = baudrate
+        self.lock = threading.RLock()
+        self.rx_buffer = bytearray()
+        self.ready_at = 0.0
+        self.requests = [] if max_requests is None else deque(maxlen=max_requests)
+        self.scan_queue = []
+        self.logger = logging.getLogger(__name__)
+
+    def listening(self) -> list:
+        """
+        List the devices that can hear the master at its baud rate.
+
+        Returns:
+            list: The devices without a baud rate of their own or at the bus baud rate.
+        """
+        if self.baudrate is None:
+            return self.devices
+        return [device for device in self.devices if device.baudrate is None or device.baudrate == self.baudrate]
+
+    def set_baudrate(self, baudrate: int):
+        """
+        Change the baud rate of the master, as SerialTransport.set_baudrate does.
+
+        Args:
+            baudrate (int): The new baud rate.
+        """
+        self.baudrate = baudrate
+        self.rx_buffer.clear()
+
+    def device_by_serial(self, serial_number: int):
+        """
+        Find a device by its serial number.
+
+        Args:
+            serial_number (int): The serial number of the device.
+
+        Returns:
+            EmulatedDevice: The device, or None if no such device is attached.
+        """
+        for device in self.listening():
+            if device.serial_number == serial_number:
+                return device
+        return None
+
+    def device_by_id(self, modbus_id: int):
+        """
+        Find a device by its Modbus slave ID.
+
+        Args:
+            modbus_id (int): The Modbus slave ID of the device.
+
+        Returns:
+            EmulatedDevice: The device, or None if no such device is attached.
+        """
+        for device in self.listening():
+            if device.modbus_id == modbus_id:
+                return device
+        return None
+
+    def respond(self, frame: bytes) -> bytes:
+        """
+        Build the response to a request frame.
+
+        Args:
+            frame (bytes): The request frame without CRC.
+
+        Returns:
+            bytes: The response frame without CRC, or None if nobody answers.
+        """
+        if frame[0] == self.BROADCAST_ADDRESS and len(frame) > 8 and frame[1] == self.ext_func_code and frame[2] == 0x08:
+            serial_number = protocol.SERIAL_NUMBER.unpack_from(frame, 3)[0]
+            device = self.device_by_serial(serial_number)
+            if device is None:
+                return None
+            return frame[:2] + b'\x09' + frame[3:7] + device.handle_pdu(frame[7:])
+
+        if frame[0] == self.BROADCAST_ADDRESS and len(frame) == 7 and frame[1] == self.ext_func_code and frame[2] == 0x10:
+            return self.respond_events(*frame[3:7])
+
+        if frame[0] == self.BROADCAST_ADDRESS and len(frame) == 3 and frame[1] == self.ext_func_code and frame[2] in (0x01, 0x02):
+            if frame[2] == 0x01:
+                self.scan_queue = sorted(self.listening(), key=lambda device: device.serial_number, reverse=True)
+            if not self.scan_queue:
+                return frame[:2] + b'\x04'
+            device = self.scan_queue.pop()
+            return protocol.SCAN_DEVICE.pack(frame[0], frame[1], protocol.SCAN_RESPONSE, device.serial_number,
+                                             device.modbus_id)
+
+        if frame[0] == self.RTU_BROADCAST_ID and len(frame) > 1:
+            for device in self.listening():
+                device.handle_pdu(frame[1:])
+            return None
+
+        device = self.device_by_id(frame[0])
+        if device is None or len(frame) < 2:
+            return None
+        if len(frame) > 4 and frame[1] == self.ext_func_code and frame[2] == 0x18:
+            mask = device.configure_events(frame[4:4 + frame[3]])
+            return frame[:3] + bytes([len(mask)]) + mask
+        return frame[:1] + device.handle_pdu(frame[1:])
+
+    def respond_events(self, min_slave_id: int, max_data_length: int, slave_id: int, flag: int) -> bytes:
+        """
+        Answer an event request with the events of the lowest device ID that has any.
+
+        Args:
+            min_slave_id (int): The lowest device ID allowed to answer.
+            max_data_length (int): The maximum length of the event data in bytes.
+            slave_id (int): The device ID of the packet confirmed by this request.
+            flag (int): The flag of the confirmed packet.
+
+        Returns:
+            bytes: The event packet, or the "no events" frame.
+        """
+        confirmed = self.device_by_id(slave_id)
+        if confirmed is not None:
+            confirmed.confirm_events(flag)
+        for device in sorted(self.listening(), key=lambda device: device.modbus_id):
+            if device.modbus_id < min_slave_id:
+                continue
+            events = device.event_packet(max_data_length)
+            if events:
+                data = b''.join(events)
+                flag = device.event_flag | (protocol.MORE_EVENTS_FLAG if device.pending_events else 0)
+                return bytes([device.modbus_id, self.ext_func_code, 0x11, flag, len(events), len(data)]) + data
+        return bytes([self.BROADCAST_ADDRESS, self.ext_func_code, 0x12])
+
+    def write(self, data: bytes) -> int:
+        """
+        Receive a request frame and queue the response of the addressed device.
+
+        Args:
+            data (bytes): The request frame including CRC.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        data = bytes(data)
+        self.requests.append(data)
+        if len(data) < 4 or not protocol.check_crc(data):
+            self.logger.debug("Emulated bus dropped a frame with invalid CRC")
+            return len(data)
+
+        response = self.respond(data[:-2])
+        if response is not None:
+            self.rx_buffer += response + protocol.CRC.pack(protocol.crc16(response))
+            self.ready_at = time.monotonic() + self.turnaround
+        return len(data)
+
+    @property
+    def in_waiting(self) -> int:
+        """
+        int: The number of bytes ready to be read.
+        """
+        if time.monotonic() < self.ready_at:
+            return 0
+        return len(self.rx_buffer)
+
+    def read(self, size: int = 1) -> bytes:
+        """
+        Read up to size bytes of response data without blocking.
+
+        Args:
+            size (int): The maximum number of bytes to read.
+
+        Returns:
+            bytes: The data read.
+        """
+        size = min(size, self.in_waiting)
+        data = bytes(self.rx_buffer[:size])
+        del self.rx_buffer[:size]
+        return data
+
+    def readinto(self, buffer: memoryview) -> int:
+        """
+        Read available response data into a buffer without blocking.
+
+        Args:
+            buffer (memoryview): The buffer to fill.
+
+        Returns:
+            int: The number of bytes read.
+        """
+        size = min(len(buffer), self.in_waiting)
+        buffer[:size] = self.rx_buffer[:size]
+        del self.rx_buffer[:size]
+        return size
+
+    def reset_input_buffer(self):
+        """
+        Discard pending response data.
+        """
+        self.rx_buffer.clear()
+
+    def flush(self):
+        """
+        Do nothing, written data is processed immediately.
+        """
+
+    def close(self):
+        """
+        Do nothing, the emulated bus has no resources to release.
+        """
+
+
+class PtyBus:
+    """
+    Serves an EmulatedBus on a pseudo-terminal, so roles can talk to emulated devices
+    through a real serial port (pyserial, termios and select) without hardware.
+
+    A request is passed to the bus as soon as the bytes received so far carry a valid
+    CRC, and the response is written back after the bus turnaround. POSIX only.
+
+    Attributes:
+        device (str): The path of the pseudo-terminal to open as the serial device.
+    """
+
+    def __init__(self, bus: EmulatedBus):
+        """
+        Open the pseudo-terminal and start serving requests.
+
+        Args:
+            bus (EmulatedBus): The emulated bus answering the requests.
+        """
+        self.bus = bus
+        self.master, self.slave = os.openpty()
+        self.device = os.ttyname(self.slave)
+        self.running = True
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        """
+        Answer requests until the bus is closed.
+        """
+        request = bytearray()
+        while self.running:
+            readable, _, _ = select.select([self.master], [], [], 0.05)
+            if not readable:
+                continue
+            try:
+                request += os.read(self.master, 4096)
+            except OSError:
+                break
+            if len(request) < 4 or not protocol.check_crc(request):
+                continue
+            self.bus.write(bytes(request))
+            request.clear()
+            if self.bus.turnaround:
+                time.sleep(self.bus.turnaround)
+            response = self.bus.read(len(self.bus.rx_buffer))
+            if response:
+                os.write(self.master, response)
+
+    def close(self):
+        """
+        Stop serving and close the pseudo-terminal.
+        """
+        self.running = False
+        self.thread.join()
+        os.close(self.master)
+        os.close(self.slave)
+
+
+class TcpBus:
+    """
+    Serves an EmulatedBus like a serial device server in transparent mode: raw RTU
+    frames over TCP, one thread per connection.
+
+    Attributes:
+        device (str): The tcp://host:port path to connect to.
+    """
+
+    def __init__(self, bus: EmulatedBus, host: str = "127.0.0.1", port: int = 0):
+        """
+        Start listening and serving requests.
+
+        Args:
+            bus (EmulatedBus): The emulated bus answering the requests.
+            host (str): The address to listen on.
+            port (int): The TCP port to listen on, a free one if 0.
+        """
+        self.bus = bus
+        self.server = socket.create_server((host, port))
+        self.server.settimeout(0.05)
+        self.device = f"tcp://{host}:{self.server.getsockname()[1]}"
+        self.connections = []
+        self.running = True
+        self.thread = threading.Thread(target=self.accept, daemon=True)
+        self.thread.start()
+
+    def accept(self):
+        """
+        Accept connections until the server is closed.
+        """
+        while self.running:
+            try:
+                connection, _ = self.server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.connections.append(connection)
+            threading.Thread(target=self.serve, args=(connection,), daemon=True).start()
+
+    def serve(self, connection: socket.socket):
+        """
+        Answer the requests of one connection until either side closes it.
+
+        Args:
+            connection (socket.socket): The client connection.
+        """
+        request = bytearray()
+        with connection:
+            while self.running:
+                try:
+                    data = connection.recv(4096)
+                except OSError:
+                    break
+                if not data:
+                    break
+                request += data
+                if len(request) < 4 or not protocol.check_crc(request):
+                    continue
+                with self.bus.lock:
+                    self.bus.write(bytes(request))
+                    request.clear()
+                    if self.bus.turnaround:
+                        time.sleep(self.bus.turnaround)
+                    response = self.bus.read(len(self.bus.rx_buffer))
+                if response:
+                    connection.sendall(response)
+
+    def close(self):
+        """
+        Stop serving and close the server and all connections.
+        """
+        self.running = False
+        self.thread.join()
+        self.server.close()
+        for connection in self.connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
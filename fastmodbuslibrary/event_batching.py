@@ -0,0 +1,84 @@
+import logging
+from . import protocol
+
+
+class EventBatchSizer:
+    """
+    Tunes the max_data_length of event requests to the event backlog.
+
+    A device answers an event request with as many queued events as fit in
+    max_data_length. A response whose flag says the device holds more events, or one
+    filled so that its next event would not have fit, shows a backlog, and the length is
+    doubled for the next request; a response with little or no event data shrinks it by
+    a quarter. The length never exceeds what the bus carries within `latency_target` at
+    the current baud rate, so an event round never holds the bus longer than that:
+    bursts are drained in few large rounds, quiet periods keep short timeouts and frames.
+
+    Attributes:
+        MAX_DATA_LENGTH (int): The largest event data length fitting in a 256 byte RTU frame.
+        MAX_EVENT_LENGTH (int): The length of the largest event in bytes (a register event).
+        stats (dict): Counters of "rounds", "events", "full" (backlogged) responses and the largest length used.
+    """
+
+    MAX_DATA_LENGTH = 248
+    MAX_EVENT_LENGTH = 6
+
+    def __init__(self, airtime, latency_target: float = 0.1, min_length: int = 16, initial_length: int = None):
+        """
+        Initialize the EventBatchSizer instance.
+
+        Args:
+            airtime (callable): The bus time of a frame by its length, the frame_airtime
+                method of a role on the bus, so the cap follows its baud rate.
+            latency_target (float): The longest bus time of one event round (in seconds).
+            min_length (int): The smallest max_data_length requested.
+            initial_length (int): The first max_data_length requested, min_length if None.
+        """
+        self.airtime = airtime
+        self.latency_target = latency_target
+        self.min_length = max(min_length, self.MAX_EVENT_LENGTH)
+        self.length = min(max(initial_length or self.min_length, self.min_length), self.cap)
+        self.stats = {"rounds": 0, "events": 0, "full": 0, "max_length": self.length}
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def cap(self) -> int:
+        """
+        int: The largest max_data_length whose event round fits in the latency target.
+        """
+        overhead = self.airtime(protocol.EVENT_REQUEST_LENGTH) + self.airtime(protocol.EVENT_RESPONSE_OVERHEAD)
+        per_byte = self.airtime(1) - self.airtime(0)
+        # The tolerance keeps a round that fits exactly from losing a byte to rounding
+        fitting = int((self.latency_target - overhead) / per_byte + 1e-9)
+        return max(self.min_length, min(self.MAX_DATA_LENGTH, fitting))
+
+    def update(self, response: dict) -> int:
+        """
+        Adapt the length to an event response.
+
+        Args:
+            response (dict): The parsed event response, empty if there were no events.
+
+        Returns:
+            int: The max_data_length for the next request.
+        """
+        self.stats["rounds"] += 1
+        events = response.get('events') if response else None
+        data_length = response['packet_info']['events_data_length'] if events else 0
+        more = bool(events) and response['packet_info']['flag'] & protocol.MORE_EVENTS_FLAG
+        if events:
+            self.stats["events"] += len(events)
+
+        if more or data_length > self.length - self.MAX_EVENT_LENGTH:
+            self.stats["full"] += 1
+            length = min(2 * self.length, self.cap)
+        elif data_length < self.length // 4:
+            length = max(self.length * 3 // 4, self.min_length)
+        else:
+            length = self.length
+
+        if length != self.length:
+            self.logger.debug(f"Event max_data_length {self.length} -> {length} after {data_length} bytes of events")
+            self.length = length
+            self.stats["max_length"] = max(self.stats["max_length"], length)
+        return self.length
@@ -0,0 +1,226 @@
+import struct
+import time
+import logging
+from multiprocessing import resource_tracker, shared_memory
+
+
+HEADER = struct.Struct('<4sHHI4xQQ')
+HEADER_SIZE = 64
+WRITE_SEQUENCE_OFFSET = 16
+WRITE_START_OFFSET = 24
+MAGIC = b'FMER'
+VERSION = 2
+
+# seq, timestamp, device_id, event_type, event_id, event_payload_value (signed, so payloads
+# decoded as negative values fit as well as unsigned 32-bit ones)
+RECORD = struct.Struct('<QdBBHq')
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing shared memory block without taking ownership of it.
+
+    Before Python 3.13 every attaching process registers the block with its resource
+    tracker, which would unlink it when that process exits, so the registration is
+    dropped again right after attaching.
+
+    Args:
+        name (str): The name of the shared memory block.
+
+    Returns:
+        shared_memory.SharedMemory: The attached block.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class EventRingWriter:
+    """
+    Publishes events into a fixed-size shared-memory ring buffer of binary records.
+
+    The buffer starts with a 64 byte header holding the magic, version, record size,
+    capacity, the sequence number of the next record to be published and the sequence
+    number past the record being written, followed by `capacity` records in the RECORD
+    layout. There is a single writer; it never waits for readers and overwrites the oldest records when the ring is full.
+    """
+
+    def __init__(self, name: str = None, capacity: int = 65536):
+        """
+        Create the shared memory block.
+
+        Args:
+            name (str): The name of the shared memory block, a random one is chosen if None.
+            capacity (int): The number of records the ring holds.
+        """
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER_SIZE + capacity * RECORD.size)
+        self.name = self.shm.name
+        self.buffer = self.shm.buf
+        self.sequence = 0
+        HEADER.pack_into(self.buffer, 0, MAGIC, VERSION, RECORD.size, capacity, 0, 0)
+        self.logger = logging.getLogger(__name__)
+
+    def publish_event(self, device_id: int, event_type: int, event_id: int, payload: int, timestamp: float = None):
+        """
+        Append one event record to the ring.
+
+        Args:
+            device_id (int): The Modbus ID of the device that sent the event.
+            event_type (int): The event type.
+            event_id (int): The event ID.
+            payload (int): The event payload value, signed or unsigned.
+            timestamp (float): The event time (time.time()), the current time if None.
+        """
+        sequence = self.sequence
+        offset = HEADER_SIZE + (sequence % self.capacity) * RECORD.size
+        struct.pack_into('<Q', self.buffer, WRITE_START_OFFSET, sequence + 1)
+        RECORD.pack_into(self.buffer, offset, sequence, time.time() if timestamp is None else timestamp,
+                         device_id, event_type, event_id, payload)
+        self.sequence = sequence + 1
+        struct.pack_into('<Q', self.buffer, WRITE_SEQUENCE_OFFSET, self.sequence)
+
+    def publish(self, response: dict):
+        """
+        Append all events of a parsed event response to the ring.
+
+        Args:
+            response (dict): A response as returned by ModbusEventReader.request_events.
+        """
+        if not response:
+            return
+        device_id = response['packet_info']['device_id']
+        timestamp = time.time()
+        for event in response['events']:
+            self.publish_event(device_id, event['event_type'], event['event_id'], event['event_payload_value'], timestamp)
+
+    def close(self):
+        """
+        Release and remove the shared memory block.
+        """
+        self.buffer.release()
+        self.shm.close()
+        self.shm.unlink()
+
+
+class EventRingReader:
+    """
+    Reads event records from a ring published by an EventRingWriter, possibly in another process.
+
+    Each reader keeps its own cursor. If the writer laps a reader, the records it missed
+    are counted in `lost` and the reader continues with the oldest record still available.
+
+    Attributes:
+        lost (int): The total number of records overwritten before this reader consumed them.
+    """
+
+    def __init__(self, name: str, from_start: bool = False):
+        """
+        Attach to an existing ring.
+
+        Args:
+            name (str): The name of the shared memory block.
+            from_start (bool): If True, start with the oldest available record instead of only new ones.
+
+        Raises:
+            ValueError: If the shared memory block does not contain an event ring.
+        """
+        self.shm = attach_shared_memory(name)
+        self.buffer = self.shm.buf
+        magic, version, record_size, self.capacity, write_sequence, _ = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"Shared memory block {name} is not an event ring")
+        self.cursor = max(0, write_sequence - self.capacity) if from_start else write_sequence
+        self.view_start = self.cursor
+        self.lost = 0
+        self.logger = logging.getLogger(__name__)
+
+    def write_sequence(self) -> int:
+        """
+        Get the sequence number of the next record the writer will publish.
+
+        Returns:
+            int: The write sequence number.
+        """
+        return struct.unpack_from('<Q', self.buffer, WRITE_SEQUENCE_OFFSET)[0]
+
+    def read_view(self, max_records: int = None) -> memoryview:
+        """
+        Consume available records without copying them.
+
+        The returned view covers consecutive records in the RECORD layout and ends at the
+        end of the ring, so a wrapped backlog takes two calls. The view aliases the shared
+        buffer: records in it are valid until the writer laps them, see `is_valid`.
+
+        Args:
+            max_records (int): The maximum number of records to consume, all available if None.
+
+        Returns:
+            memoryview: The consumed records, empty if none are available.
+        """
+        write_sequence = self.write_sequence()
+        available = write_sequence - self.cursor
+        if available > self.capacity:
+            missed = available - self.capacity
+            self.lost += missed
+            self.cursor += missed
+            available = self.capacity
+            self.logger.warning(f"Event ring overrun, {missed} records lost")
+
+        slot = self.cursor % self.capacity
+        count = min(available, self.capacity - slot)
+        if max_records is not None:
+            count = min(count, max_records)
+
+        self.view_start = self.cursor
+        self.cursor += count
+        start = HEADER_SIZE + slot * RECORD.size
+        return self.buffer[start:start + count * RECORD.size]
+
+    def is_valid(self) -> bool:
+        """
+        Check that the records of the last read_view have not been overwritten since.
+
+        Returns:
+            bool: True if the view still holds the records it was returned with.
+        """
+        write_start = struct.unpack_from('<Q', self.buffer, WRITE_START_OFFSET)[0]
+        return write_start - self.view_start <= self.capacity
+
+    def read(self, max_records: int = None) -> list:
+        """
+        Consume available records and unpack them.
+
+        Args:
+            max_records (int): The maximum number of records to consume, all available if None.
+
+        Returns:
+            list: Tuples of (seq, timestamp, device_id, event_type, event_id, event_payload_value).
+        """
+        records = []
+        while max_records is None or len(records) < max_records:
+            view = self.read_view(None if max_records is None else max_records - len(records))
+            if not view:
+                break
+            batch = list(RECORD.iter_unpack(view))
+            view.release()
+            if not self.is_valid():
+                # The writer lapped us while unpacking, drop the records that were overwritten
+                first_valid = struct.unpack_from('<Q', self.buffer, WRITE_START_OFFSET)[0] - self.capacity
+                valid = [record for i, record in enumerate(batch)
+                         if record[0] == self.view_start + i and record[0] >= first_valid]
+                self.lost += len(batch) - len(valid)
+                batch = valid
+            records.extend(batch)
+        return records
+
+    def close(self):
+        """
+        Detach from the shared memory block.
+        """
+        self.buffer.release()
+        self.shm.close()
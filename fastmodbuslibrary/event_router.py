@@ -0,0 +1,255 @@
+import threading
+import logging
+from collections import OrderedDict, deque
+
+
+class Subscription:
+    """
+    A bounded queue of the events matching one (device, type, ID) pattern.
+
+    What happens to an event arriving at a full queue depends on the overflow policy;
+    only BLOCK ever makes the router wait for the consumer:
+
+    - DROP_OLDEST discards the oldest queued event.
+    - COALESCE keeps one event per (device, type, ID): a newer event replaces the queued
+      one in place, and an event of a new key discards the oldest queued event.
+    - BLOCK waits up to `block_timeout` for the consumer to make room, then discards the
+      new event. After such a timeout the router no longer waits for this subscription
+      until the consumer takes an event, so a stuck consumer costs the acquisition loop
+      at most one timeout.
+
+    Events are dictionaries with device_id, event_type, event_id and event_payload_value,
+    shared between the subscriptions they are delivered to.
+
+    Attributes:
+        DROP_OLDEST (str): The overflow policy discarding the oldest event.
+        COALESCE (str): The overflow policy keeping the newest event per key.
+        BLOCK (str): The overflow policy waiting for the consumer.
+        stats (dict): Counters of events "delivered", "dropped" and "coalesced".
+    """
+
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    BLOCK = "block"
+
+    def __init__(self, pattern: tuple, max_size: int = 1000, overflow: str = DROP_OLDEST, block_timeout: float = 0.1):
+        """
+        Initialize the Subscription instance.
+
+        Args:
+            pattern (tuple): The (device_id, event_type, event_id) pattern, None matching any value.
+            max_size (int): The largest number of queued events.
+            overflow (str): The overflow policy, DROP_OLDEST, COALESCE or BLOCK.
+            block_timeout (float): The longest wait for room with the BLOCK policy (in seconds).
+
+        Raises:
+            ValueError: If the policy is unknown or the size is not positive.
+        """
+        if overflow not in (self.DROP_OLDEST, self.COALESCE, self.BLOCK):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        if max_size < 1:
+            raise ValueError(f"Queue size must be positive: {max_size}")
+        self.pattern = pattern
+        self.max_size = max_size
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.queue = OrderedDict() if overflow == self.COALESCE else deque()
+        self.condition = threading.Condition()
+        self.stalled = False
+        self.stats = {"delivered": 0, "dropped": 0, "coalesced": 0}
+
+    def __len__(self):
+        return len(self.queue)
+
+    def __repr__(self):
+        return f"Subscription({self.pattern}, {self.overflow}, {len(self.queue)}/{self.max_size})"
+
+    def put(self, event: dict):
+        """
+        Queue an event, applying the overflow policy if the queue is full.
+
+        Args:
+            event (dict): The event.
+        """
+        with self.condition:
+            if self.overflow == self.COALESCE:
+                key = (event['device_id'], event['event_type'], event['event_id'])
+                if key in self.queue:
+                    self.queue[key] = event
+                    self.stats["coalesced"] += 1
+                    return
+                if len(self.queue) >= self.max_size:
+                    self.queue.popitem(last=False)
+                    self.stats["dropped"] += 1
+                self.queue[key] = event
+            else:
+                if len(self.queue) >= self.max_size:
+                    if self.overflow == self.DROP_OLDEST:
+                        self.queue.popleft()
+                        self.stats["dropped"] += 1
+                    elif self.stalled or not self.condition.wait_for(lambda: len(self.queue) < self.max_size,
+                                                                     self.block_timeout):
+                        self.stalled = True
+                        self.stats["dropped"] += 1
+                        return
+                self.queue.append(event)
+            self.stats["delivered"] += 1
+            self.condition.notify_all()
+
+    def get(self, timeout: float = None) -> dict:
+        """
+        Take the oldest queued event, waiting for one if the queue is empty.
+
+        Args:
+            timeout (float): The longest wait (in seconds), 0 not to wait, None to wait indefinitely.
+
+        Returns:
+            dict: The event, or None if none arrived in time.
+        """
+        with self.condition:
+            if not self.queue and (timeout == 0 or not self.condition.wait_for(lambda: self.queue, timeout)):
+                return None
+            return self.take(1)[0]
+
+    def drain(self, max_count: int = None) -> list:
+        """
+        Take the queued events without waiting.
+
+        Args:
+            max_count (int): The largest number of events taken, all if None.
+
+        Returns:
+            list: The events, oldest first.
+        """
+        with self.condition:
+            return self.take(len(self.queue) if max_count is None else min(max_count, len(self.queue)))
+
+    def take(self, count: int) -> list:
+        """
+        Remove events from the front of the queue and wake a waiting producer; the caller holds the condition.
+
+        Args:
+            count (int): The number of events, at most the queue length.
+
+        Returns:
+            list: The events, oldest first.
+        """
+        if self.overflow == self.COALESCE:
+            events = [self.queue.popitem(last=False)[1] for _ in range(count)]
+        else:
+            events = [self.queue.popleft() for _ in range(count)]
+        if events:
+            self.stalled = False
+            self.condition.notify_all()
+        return events
+
+
+class EventRouter:
+    """
+    Dispatches received events to subscriptions through hash indexes on their patterns.
+
+    Subscriptions are indexed by their (device_id, event_type, event_id) pattern, in
+    which None is a wildcard. An event is matched by looking up the eight patterns it can
+    match, from exact to fully wild, so dispatch costs a constant number of dictionary
+    lookups however many subscriptions exist, plus one put per subscription it reaches.
+    Puts wait on a consumer only with the BLOCK policy, and then for a bounded time (see
+    Subscription), so a slow consumer loses events instead of stalling acquisition.
+
+    Attributes:
+        stats (dict): Counters of events "published", "deliveries" to subscriptions and "unmatched" events.
+    """
+
+    def __init__(self):
+        """
+        Initialize the EventRouter instance.
+        """
+        self.index = {}
+        self.lock = threading.Lock()
+        self.stats = {"published": 0, "deliveries": 0, "unmatched": 0}
+        self.logger = logging.getLogger(__name__)
+
+    def subscribe(self, device_id: int = None, event_type: int = None, event_id: int = None, max_size: int = 1000,
+                  overflow: str = Subscription.DROP_OLDEST, block_timeout: float = 0.1) -> Subscription:
+        """
+        Subscribe to the events matching a pattern.
+
+        Args:
+            device_id (int): The Modbus ID of the device, None for any device.
+            event_type (int): The event type (e.g., 0x04 for input registers), None for any type.
+            event_id (int): The event ID (e.g., the register address), None for any ID.
+            max_size (int): The largest number of queued events.
+            overflow (str): The overflow policy, Subscription.DROP_OLDEST, COALESCE or BLOCK.
+            block_timeout (float): The longest wait for room with the BLOCK policy (in seconds).
+
+        Returns:
+            Subscription: The subscription to take the events from.
+        """
+        subscription = Subscription((device_id, event_type, event_id), max_size, overflow, block_timeout)
+        with self.lock:
+            # The tuples are replaced, never changed, so publish() can iterate them without the lock
+            self.index[subscription.pattern] = self.index.get(subscription.pattern, ()) + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """
+        Stop delivering events to a subscription.
+
+        Args:
+            subscription (Subscription): The subscription.
+        """
+        with self.lock:
+            remaining = tuple(other for other in self.index.get(subscription.pattern, ()) if other is not subscription)
+            if remaining:
+                self.index[subscription.pattern] = remaining
+            else:
+                self.index.pop(subscription.pattern, None)
+
+    def publish_event(self, event: dict) -> int:
+        """
+        Deliver one event to the subscriptions matching it.
+
+        Args:
+            event (dict): The event with device_id, event_type, event_id and event_payload_value.
+
+        Returns:
+            int: The number of subscriptions the event was delivered to.
+        """
+        index = self.index
+        device_id, event_type, event_id = event['device_id'], event['event_type'], event['event_id']
+        deliveries = 0
+        for pattern in ((device_id, event_type, event_id), (device_id, event_type, None),
+                        (device_id, None, event_id), (device_id, None, None), (None, event_type, event_id),
+                        (None, event_type, None), (None, None, event_id), (None, None, None)):
+            subscriptions = index.get(pattern)
+            if subscriptions:
+                for subscription in subscriptions:
+                    subscription.put(event)
+                deliveries += len(subscriptions)
+        self.stats["published"] += 1
+        self.stats["deliveries"] += deliveries
+        if not deliveries:
+            self.stats["unmatched"] += 1
+        return deliveries
+
+    def publish(self, response: dict):
+        """
+        Deliver all events of a parsed event response.
+
+        Args:
+            response (dict): A response as returned by ModbusEventReader.request_events.
+        """
+        if not response:
+            return
+        device_id = response['packet_info']['device_id']
+        for event in response['events']:
+            self.publish_event({"device_id": device_id, **event})
+
+    def handle_events(self, task, response: dict):
+        """
+        Deliver the events of a scheduled event request.
+
+        Args:
+            task (PollTask): The event slot.
+            response (dict): The parsed event response, empty if there were no events.
+        """
+        self.publish(response)
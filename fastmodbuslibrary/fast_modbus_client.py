@@ -1,21 +1,47 @@
 import struct
+import time
 import logging
+from . import protocol
+from .buffer_pool import PooledResponse
 from .common import ModbusCommon
+from .read_result import NegativeCache, ReadResult
+from .retry_policy import RetryPolicy
+from .register_codec import RegisterCodec, decode_bits, encode_bits
 
 class ModbusClient(ModbusCommon):
     """
     A class for interacting with Modbus devices using read and write commands.
+
+    Attributes:
+        RTU_BROADCAST_ID (int): The standard Modbus slave ID addressing every device, which do not answer.
+        BROADCAST_DELAY (float): The silence after a broadcast write that lets devices apply it (in seconds).
+        READ_REQUEST_LENGTH (int): The length of an extended read request frame in bytes.
+        READ_RESPONSE_OVERHEAD (int): The length of an extended read response frame without data in bytes.
+        MAX_READ_BITS (int): The largest number of coils or discrete inputs read by one request.
+        MAX_WRITE_COILS (int): The largest number of coils written by one request.
     """
 
-    def __init__(self, device: str, baudrate: int, ext_func_code: int = 0x46):
+    RTU_BROADCAST_ID = protocol.RTU_BROADCAST_ID
+    BROADCAST_DELAY = 0.1
+    READ_REQUEST_LENGTH = protocol.READ_REQUEST_LENGTH
+    READ_RESPONSE_OVERHEAD = protocol.READ_RESPONSE_OVERHEAD
+    MAX_READ_BITS = protocol.MAX_READ_BITS
+    MAX_WRITE_COILS = protocol.MAX_WRITE_COILS
+
+    def __init__(self, device: str, baudrate: int, ext_func_code: int = 0x46, retry_policy: RetryPolicy = None,
+                 negative_cache: NegativeCache = None):
         """
         Initialize the ModbusClient instance.
 
         Args:
             device (str): The serial device path (e.g., /dev/ttyUSB0).
             baudrate (int): The baud rate for the serial connection.
+            retry_policy (RetryPolicy): The timeout and retry policy, a default one sharing the
+                device health of the transport is created if None.
+            negative_cache (NegativeCache): The cache of rejected reads, a default one is created if None.
         """
-        super().__init__(device, baudrate, ext_func_code)
+        super().__init__(device, baudrate, ext_func_code, retry_policy)
+        self.negative_cache = negative_cache or NegativeCache()
         self.logger = logging.getLogger(__name__)
 
     def read_registers(self, serial_number: int, command: int, register: int, count: int = 1):
@@ -29,19 +55,167 @@ class ModbusClient(ModbusCommon):
             count (int): The number of registers to read.
 
         Returns:
-            bytes: The data read from the registers, or None if the response is invalid.
+            bytes: The data read from the registers (packed bits for coils and discrete inputs),
+            or None if the read failed (see read_result() for the reason).
         """
-        request_command = struct.pack('>BBBIBHH', self.BROADCAST_ADDRESS, self.ext_func_code, 0x08, serial_number, command, register, count)
-        self.send_command(request_command)
+        response = self.read_registers_view(serial_number, command, register, count)
+        if response is None:
+            return None
+        with response:
+            return response.tobytes()
 
-        if self.wait_for_response():
-            response = self.serial_port.read(256)
-            self.logger.debug(f"RCV: {self.format_bytes(response)}")
-            if not self.check_crc(response) or len(response) < 9 + 2 * count:
-                self.logger.error("Invalid or short response.")
-                return None
-            return response[9:9 + 2 * count]
-        return None
+    def read_result(self, serial_number: int, command: int, register: int, count: int = 1) -> ReadResult:
+        """
+        Read registers from the Modbus device, reporting why a read failed.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            command (int): The command to execute (e.g., 0x03 for Read Holding Registers).
+            register (int): The starting register address.
+            count (int): The number of registers to read.
+
+        Returns:
+            ReadResult: The data (bytes) or the exception code, timeout or response error.
+        """
+        buffer = self.buffer_pool.acquire()
+        try:
+            result = self.read_result_into(serial_number, command, register, count, buffer)
+            if result:
+                result.data = result.data.tobytes()
+            return result
+        finally:
+            self.buffer_pool.release(buffer)
+
+    def read_registers_view(self, serial_number: int, command: int, register: int, count: int = 1) -> PooledResponse:
+        """
+        Read registers from the Modbus device without copying the data out of the receive buffer.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            command (int): The command to execute (e.g., 0x03 for Read Holding Registers).
+            register (int): The starting register address.
+            count (int): The number of registers to read.
+
+        Returns:
+            PooledResponse: The register data, valid until it is released, or None if the read failed.
+        """
+        buffer = self.buffer_pool.acquire()
+        pooled = None
+        try:
+            result = self.read_result_into(serial_number, command, register, count, buffer)
+            if result:
+                pooled = PooledResponse(self.buffer_pool, buffer, result.data)
+            return pooled
+        finally:
+            if pooled is None:
+                self.buffer_pool.release(buffer)
+
+    def read_result_into(self, serial_number: int, command: int, register: int, count: int,
+                         buffer: memoryview, deadline: float = None) -> ReadResult:
+        """
+        Read registers into a receive buffer and decode the response.
+
+        Exception responses that the device would repeat are remembered in the negative
+        cache, and reads they cover are answered from it without a request, as are reads
+        from a device quarantined by the retry policy between its probes.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            command (int): The command to execute (e.g., 0x03 for Read Holding Registers).
+            register (int): The starting register address.
+            count (int): The number of registers to read.
+            buffer (memoryview): The buffer receiving the response.
+            deadline (float): The time.monotonic() value by which the read must end, None for no limit.
+
+        Returns:
+            ReadResult: The result, with the register data as a memoryview within the buffer.
+        """
+        code = self.negative_cache.lookup(serial_number, command, register, count)
+        if code is not None:
+            return ReadResult(ReadResult.EXCEPTION, exception_code=code, cached=True)
+        if not self.retry_policy.health.admit(serial_number):
+            return ReadResult(ReadResult.QUARANTINED)
+
+        request_command = protocol.encode_read_request(serial_number, command, register, count, self.ext_func_code)
+        response = self.transact_into(serial_number, request_command,
+                                      self.READ_RESPONSE_OVERHEAD + protocol.data_length(command, count), buffer, deadline)
+        if response is None:
+            self.logger.warning(f"No response from device {serial_number}")
+            return ReadResult(ReadResult.TIMEOUT)
+        if not self.check_crc(response):
+            self.logger.error("Invalid CRC in response.")
+            return ReadResult(ReadResult.CRC_ERROR)
+        data, exception_code = protocol.decode_read_response(response, command, count)
+        if exception_code is not None:
+            result = ReadResult(ReadResult.EXCEPTION, exception_code=exception_code)
+            self.logger.warning(f"Device {serial_number} rejected function {command:#04x} at {register}-{register + count - 1}: "
+                                f"{result.exception_name}")
+            self.negative_cache.add(serial_number, command, register, count, exception_code)
+            return result
+        if data is None:
+            self.logger.error("Invalid or short response.")
+            return ReadResult(ReadResult.INVALID)
+        self.negative_cache.discard(serial_number, command, register, count)
+        return ReadResult(ReadResult.OK, data)
+
+    def read_many(self, requests: list, deadline: float) -> dict:
+        """
+        Read many register ranges, possibly from many devices, within an overall deadline.
+
+        The reads run back to back while holding the port, so no other role's traffic
+        or polling delay falls between them. A read is sent only if its expected
+        duration (frame airtime plus the device's smoothed turnaround) fits in the time
+        left, and its timeout and retries are cut short at the deadline. Once a device
+        leaves a read unanswered, its remaining reads in the batch are skipped, so a
+        dead device costs at most one timeout.
+
+        Args:
+            requests (list): Tuples of (serial_number, command, register, count).
+            deadline (float): The time available for the whole batch (in seconds).
+
+        Returns:
+            dict: A ReadResult per request tuple, in request order, with `latency` set for
+            the reads that were sent and status SKIPPED for the others.
+        """
+        policy = self.retry_policy
+        started = time.monotonic()
+        end = started + deadline
+        results = {}
+        unanswered = set()
+
+        buffer = self.buffer_pool.acquire()
+        try:
+            with self.serial_port.lock:
+                for request in requests:
+                    if request in results:
+                        continue
+                    serial_number, command, register, count = request
+                    turnaround = policy.turnaround(serial_number)["srtt"]
+                    if turnaround is None:
+                        turnaround = policy.turnaround()["srtt"] or policy.min_timeout
+                    expected = (self.frame_airtime(self.READ_REQUEST_LENGTH)
+                                + self.frame_airtime(self.READ_RESPONSE_OVERHEAD + protocol.data_length(command, count))
+                                + turnaround)
+                    start_time = time.monotonic()
+                    if serial_number in unanswered or start_time + expected > end:
+                        results[request] = ReadResult(ReadResult.SKIPPED)
+                        continue
+
+                    result = self.read_result_into(serial_number, command, register, count, buffer, end)
+                    if result:
+                        result.data = result.data.tobytes()
+                    elif result.status == ReadResult.TIMEOUT:
+                        unanswered.add(serial_number)
+                    if not result.cached and result.status != ReadResult.QUARANTINED:
+                        result.latency = time.monotonic() - start_time
+                    results[request] = result
+        finally:
+            self.buffer_pool.release(buffer)
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            done = sum(1 for result in results.values() if result)
+            self.logger.debug(f"Batch read {done} of {len(results)} ranges in {time.monotonic() - started:.3f}s")
+        return results
 
     def write_registers(self, serial_number: int, command: int, register: int, values: list):
         """
@@ -51,25 +225,194 @@ class ModbusClient(ModbusCommon):
             serial_number (int): The serial number of the device.
             command (int): The command to execute (e.g., 0x10 for Write Multiple Registers).
             register (int): The starting register address.
-            values (list): The list of values to write to the registers.
+            values (list): The list of values to write to the registers, or an encoded
+                big-endian register block (bytes) such as RegisterCodec.encode returns.
+
+        Returns:
+            bool: True if the write operation was successful, False otherwise (see write_result() for the reason).
+        """
+        return bool(self.write_result(serial_number, command, register, values))
+
+    def write_result(self, serial_number: int, command: int, register: int, values: list) -> ReadResult:
+        """
+        Write registers to the Modbus device, reporting why a write failed.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            command (int): The command to execute (e.g., 0x10 for Write Multiple Registers).
+            register (int): The starting register address.
+            values (list): The list of values to write to the registers, or an encoded
+                big-endian register block (bytes) such as RegisterCodec.encode returns.
+
+        Returns:
+            ReadResult: Status OK if the device confirmed the write, otherwise the exception
+            code, timeout or response error.
+        """
+        if isinstance(values, (bytes, bytearray, memoryview)):
+            payload = bytes(values)
+        else:
+            payload = struct.pack(f'>{len(values)}H', *values)
+        register_count = len(payload) // 2
+        write_command = protocol.encode_write_request(serial_number, command, register, payload,
+                                                      ext_func_code=self.ext_func_code)
+        response = self.transact(serial_number, write_command, protocol.WRITE_RESPONSE_LENGTH)
+
+        if response is None:
+            return ReadResult(ReadResult.TIMEOUT)
+        if not self.check_crc(response):
+            self.logger.error("Invalid CRC in response.")
+            return ReadResult(ReadResult.CRC_ERROR)
+        confirmed, exception_code = protocol.decode_write_response(response, serial_number, command, register,
+                                                                   register_count, self.ext_func_code)
+        if exception_code is not None:
+            result = ReadResult(ReadResult.EXCEPTION, exception_code=exception_code)
+            self.logger.warning(f"Device {serial_number} rejected the write at {register}: {result.exception_name}")
+            return result
+        if not confirmed:
+            self.logger.error("Write response does not match expected format.")
+            return ReadResult(ReadResult.INVALID)
+        return ReadResult(ReadResult.OK)
+
+    def read_bits(self, serial_number: int, command: int, address: int, count: int = 1):
+        """
+        Read coils or discrete inputs, in as few requests as the protocol allows.
+
+        Each request reads up to MAX_READ_BITS packed bits, so 2000 digital points
+        take one frame instead of a request per point.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            command (int): The read function code (0x01 for coils, 0x02 for discrete inputs).
+            address (int): The starting address.
+            count (int): The number of coils or discrete inputs to read.
+
+        Returns:
+            numpy.ndarray or list: The bits (a NumPy bool array when NumPy is installed), or None
+            if a read failed.
+
+        Raises:
+            ValueError: If the function code is not a bit read.
+        """
+        if command not in protocol.BIT_FUNCTIONS:
+            raise ValueError(f"Not a bit read function code: {command:#04x}")
+        chunks = []
+        for start in range(address, address + count, self.MAX_READ_BITS):
+            data = self.read_registers(serial_number, command, start, min(self.MAX_READ_BITS, address + count - start))
+            if data is None:
+                return None
+            chunks.append(data)
+        # Every request but the last reads a whole number of bytes, so the chunks join seamlessly
+        return decode_bits(b"".join(chunks), count)
+
+    def write_coils(self, serial_number: int, address: int, values) -> bool:
+        """
+        Write multiple coils (0x0F) with one request.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            address (int): The starting coil address.
+            values: A sequence or NumPy array of truth values.
 
         Returns:
             bool: True if the write operation was successful, False otherwise.
+
+        Raises:
+            ValueError: If more coils are given than fit in one request.
         """
-        register_count = len(values)
-        write_command = struct.pack('>BBBIBHHB', self.BROADCAST_ADDRESS, self.ext_func_code, 0x08, serial_number, command, register, register_count, register_count * 2)
-        write_command += struct.pack(f'>{register_count}H', *values)
-        self.send_command(write_command)
-
-        if self.wait_for_response():
-            response = self.serial_port.read(256)
-            self.logger.debug(f"RCV: {self.format_bytes(response)}")
-            if self.check_crc(response):
-                expected_response = struct.pack('>BBBIBHH', self.BROADCAST_ADDRESS, self.ext_func_code, 0x09, serial_number, command, register, register_count)
-                if response[:-2] == expected_response:
-                    return True
-                else:
-                    self.logger.error("Write response does not match expected format.")
-            else:
-                self.logger.error("Invalid CRC in response.")
-        return False
+        count = len(values)
+        if not 0 < count <= self.MAX_WRITE_COILS:
+            raise ValueError(f"Cannot write {count} coils in one request, at most {self.MAX_WRITE_COILS}")
+        write_command = protocol.encode_write_request(serial_number, 0x0F, address, encode_bits(values), count,
+                                                      self.ext_func_code)
+        response = self.transact(serial_number, write_command, protocol.WRITE_RESPONSE_LENGTH)
+
+        if response is None:
+            return False
+        if not self.check_crc(response):
+            self.logger.error("Invalid CRC in response.")
+            return False
+        confirmed, exception_code = protocol.decode_write_response(response, serial_number, 0x0F, address, count,
+                                                                   self.ext_func_code)
+        if not confirmed:
+            self.logger.error(f"Device {serial_number} did not confirm the coil write"
+                              + (f" (exception {exception_code})" if exception_code is not None else ""))
+        return confirmed
+
+    def read_values(self, serial_number: int, command: int, register: int, count: int, codec: RegisterCodec):
+        """
+        Read registers and decode them into typed values.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            command (int): The command to execute (e.g., 0x04 for Read Input Registers).
+            register (int): The starting register address.
+            count (int): The number of values to read.
+            codec (RegisterCodec): The codec describing the value type, word order and scaling.
+
+        Returns:
+            numpy.ndarray or array.array: The decoded values, or None if the response is invalid.
+        """
+        data = self.read_registers(serial_number, command, register, count * codec.registers)
+        if data is None:
+            return None
+        return codec.decode(data)
+
+    def write_values(self, serial_number: int, command: int, register: int, values, codec: RegisterCodec):
+        """
+        Encode typed values and write them to the registers.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            command (int): The command to execute (e.g., 0x10 for Write Multiple Registers).
+            register (int): The starting register address.
+            values: A sequence, array.array or NumPy array of values.
+            codec (RegisterCodec): The codec describing the value type, word order and scaling.
+
+        Returns:
+            bool: True if the write operation was successful, False otherwise.
+        """
+        return self.write_registers(serial_number, command, register, codec.encode(values))
+
+    def broadcast_write(self, register: int, values, serial_numbers: list = None, retry: bool = True,
+                        delay: float = None) -> list:
+        """
+        Write the same holding registers on every device with a single broadcast frame.
+
+        The write is sent as a standard Modbus broadcast (slave ID 0, Write Multiple
+        Registers), which every device applies without answering. If serial numbers are
+        given, the registers of each device are read back afterwards, and devices that
+        missed the broadcast get a unicast write if `retry` is set.
+
+        Args:
+            register (int): The starting register address.
+            values (list): The values to write, or an encoded big-endian register block (bytes).
+            serial_numbers (list): The serial numbers of the devices to verify, no verification if None.
+            retry (bool): True to repeat the write by unicast on devices that do not hold the values.
+            delay (float): The silence after the broadcast (in seconds), BROADCAST_DELAY if None.
+
+        Returns:
+            list: The serial numbers of the devices that do not hold the values (after retries).
+        """
+        if isinstance(values, (bytes, bytearray, memoryview)):
+            payload = bytes(values)
+        else:
+            payload = struct.pack(f'>{len(values)}H', *values)
+        register_count = len(payload) // 2
+        command = protocol.encode_rtu_write(self.RTU_BROADCAST_ID, register, payload)
+
+        with self.serial_port.lock:
+            self.send_command(command)
+            # Devices need a quiet bus to apply the write, and nobody answers it
+            time.sleep(self.frame_airtime(len(command) + 2) + (self.BROADCAST_DELAY if delay is None else delay))
+            self.serial_port.reset_input_buffer()
+
+        failed = []
+        for serial_number in serial_numbers or []:
+            if self.read_registers(serial_number, 0x03, register, register_count) == payload:
+                continue
+            if retry and self.write_registers(serial_number, 0x10, register, payload):
+                self.logger.info(f"Device {serial_number} missed the broadcast, written by unicast")
+                continue
+            self.logger.warning(f"Device {serial_number} does not hold the broadcast values")
+            failed.append(serial_number)
+        return failed
@@ -1,47 +1,33 @@
-import struct
 import logging
-import time
+from . import protocol
 from .common import ModbusCommon
+from .retry_policy import RetryPolicy
 
 class ModbusConfigEvents(ModbusCommon):
     """
     A class to configure event notifications for multiple register ranges on a Modbus device.
+
+    Attributes:
+        CONFIG_EVENTS_COMMAND (int): The sub-command configuring events.
+        REGISTER_TYPES (dict): The register type codes by name.
     """
 
-    CONFIG_EVENTS_COMMAND = 0x18
+    CONFIG_EVENTS_COMMAND = protocol.CONFIG_EVENTS
+    REGISTER_TYPES = {"coil": 0x01, "discrete": 0x02, "holding": 0x03, "input": 0x04}
 
-    def __init__(self, device: str, baudrate: int, ext_func_code: int = 0x46 ):
+    def __init__(self, device: str, baudrate: int, ext_func_code: int = 0x46, retry_policy: RetryPolicy = None):
         """
         Initialize the ModbusConfigEvents with the given parameters.
 
         Args:
             device (str): The serial device path (e.g., /dev/ttyACM0).
             baudrate (int): The baud rate for the connection.
+            retry_policy (RetryPolicy): The timeout and retry policy, a default one sharing the
+                device health of the transport is created if None.
         """
-        super().__init__(device, baudrate, ext_func_code)
+        super().__init__(device, baudrate, ext_func_code, retry_policy)
         self.logger = logging.getLogger(__name__)
 
-    def calculate_crc(self, data: bytes) -> int:
-        """
-        Calculate the CRC16 checksum for the given data.
-
-        Args:
-            data (bytes): The data for which to calculate the checksum.
-
-        Returns:
-            int: The calculated CRC16 checksum.
-        """
-        crc = 0xFFFF
-        for pos in data:
-            crc ^= pos
-            for _ in range(8):
-                if (crc & 1) != 0:
-                    crc >>= 1
-                    crc ^= 0xA001
-                else:
-                    crc >>= 1
-        return crc
-
     def send_command(self, command: list, debug: bool = False):
         """
         Send a command to the Modbus device, appending a CRC16 checksum.
@@ -52,11 +38,11 @@ class ModbusConfigEvents(ModbusCommon):
         """
         command_bytes = bytes(command)
         crc = self.calculate_crc(command_bytes)
-        command_bytes += struct.pack('<H', crc)
+        command_bytes += protocol.CRC.pack(crc)
         self.logger.debug(f"[debug] Command generated: {' '.join(f'0x{byte:02X}' for byte in command_bytes)}")
         self.serial_port.write(command_bytes)
 
-    def formulate_command(self, slave_id: int, reg_type: str, address: int, count: int, priority: int) -> list:
+    def formulate_command(self, slave_id: int, reg_type: str, address: int, count: int, priority: int) -> bytes:
         """
         Create a command to configure event notifications for a single register range.
 
@@ -68,31 +54,19 @@ class ModbusConfigEvents(ModbusCommon):
             priority (int): The priority of the event notifications (0 or 1).
 
         Returns:
-            list: The generated command bytes.
-        """
-        command = [slave_id, self.ext_func_code, self.CONFIG_EVENTS_COMMAND]
-        data = []
+            bytes: The generated command bytes.
 
-        reg_type_byte = {
-            "coil": 0x01,
-            "discrete": 0x02,
-            "holding": 0x03,
-            "input": 0x04
-        }.get(reg_type.lower())
+        Raises:
+            ValueError: If the register type is unknown.
+        """
+        reg_type_byte = self.REGISTER_TYPES.get(reg_type.lower())
 
         if reg_type_byte is None:
             raise ValueError(f"Unknown register type: {reg_type}")
 
-        data.append(reg_type_byte)
-        data += list(struct.pack('>H', address))
-        data.append(count)
-        data += [priority] * count
-
         self.logger.debug(f"[debug] Range: {reg_type} Address: {address} Count: {count} Priority: {priority}")
 
-        command.append(len(data))
-        command += data
-        return command
+        return protocol.encode_config_events(slave_id, [(reg_type_byte, address, [priority] * count)], self.ext_func_code)
 
     def parse_response(self, response: bytes) -> bytes:
         """
@@ -105,17 +79,13 @@ class ModbusConfigEvents(ModbusCommon):
             bytes: The parsed mask data from the response, or None if invalid.
         """
         response = response.lstrip(b'\xFF')
-        if len(response) < 4:
+        if len(response) < protocol.CONFIG_HEADER.size:
             self.logger.error("[error] Response too short to be valid")
             return None
 
-        slave_id, command, sub_command, length = response[:4]
-        mask_data = response[4:4+length]
-
-        if len(mask_data) != length:
+        mask_data = protocol.decode_config_response(response)
+        if mask_data is None:
             self.logger.error("[error] Response length does not match expected length")
-            return None
-
         return mask_data
 
     def configure_events(self, slave_id: int, reg_type: str, address: int, count: int, priority: int):
@@ -133,13 +103,11 @@ class ModbusConfigEvents(ModbusCommon):
             bytes: The mask data from the device response, or None if no valid response received.
         """
         command = self.formulate_command(slave_id, reg_type, address, count, priority)
-        self.send_command(command)
 
-        # Добавляем задержку для ожидания ответа
-        time.sleep(0.5)
-
-        response = self.serial_port.read(256)
-        self.logger.debug(f"RAW Response: {response}")
+        # The response carries one mask bit per register after a 4 byte header
+        response = self.transact(slave_id, command, protocol.CONFIG_HEADER.size + protocol.CRC.size + (count + 7) // 8)
+        if response is None:
+            return None
 
         mask_data = self.parse_response(response)
         if mask_data:
@@ -1,25 +1,40 @@
-import struct
 import logging
+from . import protocol
 from .common import ModbusCommon  # Import the base class with common functions
+from .retry_policy import RetryPolicy
+from .event_ring import EventRingWriter
+from .event_batching import EventBatchSizer
+from .event_router import EventRouter
 
 class ModbusEventReader(ModbusCommon):
     """
     A class for reading and parsing Modbus event notifications, inheriting common Modbus functions from ModbusCommon.
     """
 
-    REQUEST_EVENTS_COMMAND = 0x10
-    SUBCOMMAND_EVENT_TRANSMISSION = 0x11
-    MIN_PACKET_LENGTH = 6
+    REQUEST_EVENTS_COMMAND = protocol.REQUEST_EVENTS
+    SUBCOMMAND_EVENT_TRANSMISSION = protocol.EVENTS
+    MIN_PACKET_LENGTH = protocol.EVENT_HEADER.size
 
-    def __init__(self, device: str, baudrate: int, ext_func_code: int = 0x46):
+    def __init__(self, device: str, baudrate: int, ext_func_code: int = 0x46, retry_policy: RetryPolicy = None,
+                 event_ring: EventRingWriter = None, batch_sizer: EventBatchSizer = None,
+                 event_router: EventRouter = None):
         """
         Initialize the ModbusEventReader instance with Modbus communication setup.
 
         Args:
             device (str): The serial device path (e.g., /dev/ttyUSB0).
             baudrate (int): The baud rate for the serial connection.
+            retry_policy (RetryPolicy): The timeout and retry policy, a default one sharing the
+                device health of the transport is created if None.
+            event_ring (EventRingWriter): A shared-memory ring to publish received events to, if any.
+            batch_sizer (EventBatchSizer): The tuner of max_data_length for poll_events, a default one is created if None.
+            event_router (EventRouter): A router to deliver received events to subscribers, if any.
         """
-        super().__init__(device, baudrate, ext_func_code)  # Initialize via the parent class ModbusCommon
+        super().__init__(device, baudrate, ext_func_code, retry_policy)  # Initialize via the parent class ModbusCommon
+        self.event_ring = event_ring
+        self.batch_sizer = batch_sizer or EventBatchSizer(self.frame_airtime)
+        self.event_router = event_router
+        self.confirmation = (0, 0)
         self.logger = logging.getLogger(__name__)
 
     def parse_event_response(self, response: bytes):
@@ -36,63 +51,39 @@ class ModbusEventReader(ModbusCommon):
             self.logger.debug("Received packet is too short.")
             return {}
 
-        if response[1] != self.ext_func_code and response[2] != self.SUBCOMMAND_EVENT_TRANSMISSION:
+        header = protocol.decode_event_header(response)
+        if header is None or response[1] != self.ext_func_code:
             self.logger.debug("Received packet is not an event transmission packet.")
             return {}
 
-        packet_info = {}  # Dictionary to store packet information
-
-        # Extract data from the packet
-        packet_info['device_id'] = response[0]  # Device ID
-        packet_info['command'] = response[1]  # Command
-        packet_info['subcommand'] = response[2]  # Subcommand
-        packet_info['flag'] = response[3]  # Flag
-        packet_info['event_count'] = response[4]  # Event Count
-        packet_info['events_data_length'] = response[5]  # Events Data Length
-
-        # Index for processing events
-        index = 6
-        events = []  # List to store event information
-
-        # Process events
-        for event_index in range(response[4]):  # Based on the number of events
-            # Extract event data
-            event_payload_length = response[index]  # Payload length
-            event_type = response[index + 1]  # Event type
-            event_id = (response[index + 2] << 8) | response[index + 3]  # Event ID
-            payload_value = 0
-
-            if event_payload_length > 0:
-                payload_value = response[index + 4]  # Payload (if available)
-
-            # Add event information to the structure
-            events.append({
-                "event_type": event_type,  # Event type
-                "event_id": event_id,  # Event ID
-                "event_payload_value": payload_value  # Payload value
-            })
-
-            index += 4 + event_payload_length  # Move to the next event
-
-        # Prepare the log output
-        log_output = []
-        log_output.append("Packet Structure:")
-        log_output.append(f"| - ({response[0]:02X}) Device ID: {packet_info['device_id']}")
-        log_output.append(f"| - ({response[1]:02X}) Command: {packet_info['command']}")
-        log_output.append(f"| - ({response[2]:02X}) Subcommand: {packet_info['subcommand']}")
-        log_output.append(f"| - ({response[3]:02X}) Flag: {packet_info['flag']}")
-        log_output.append(f"| - ({response[4]:02X}) Event Count: {packet_info['event_count']}")
-        log_output.append(f"| - ({response[5]:02X}) Events Data Length: {packet_info['events_data_length']} bytes")
-
-        for event_index, event in enumerate(events, start=1):
-            log_output.append(f"  |- Event {event_index}:")
-            log_output.append(f"      |- ({event['event_payload_value']}) Event Payload Length: {event_payload_length}")
-            log_output.append(f"      |- ({event['event_type']}) Event Type: {event['event_type']}")
-            log_output.append(f"      |- ({event_id:02X}) Event ID: {event['event_id']}")
-            log_output.append(f"      |- ({event['event_payload_value']}) Event Payload Value: {event['event_payload_value']}")
-
-        # Log all packet information
-        self.logger.debug("\n".join(log_output))
+        device_id, flag, event_count, events_data_length = header
+        packet_info = {
+            'device_id': device_id,
+            'command': response[1],
+            'subcommand': response[2],
+            'flag': flag,
+            'event_count': event_count,
+            'events_data_length': events_data_length,
+        }
+        events = [{"event_type": event_type, "event_id": event_id, "event_payload_value": value}
+                  for event_type, event_id, _, value in protocol.iter_events(response, event_count)]
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            log_output = ["Packet Structure:"]
+            log_output.append(f"| - ({response[0]:02X}) Device ID: {device_id}")
+            log_output.append(f"| - ({response[1]:02X}) Command: {packet_info['command']}")
+            log_output.append(f"| - ({response[2]:02X}) Subcommand: {packet_info['subcommand']}")
+            log_output.append(f"| - ({response[3]:02X}) Flag: {flag}")
+            log_output.append(f"| - ({response[4]:02X}) Event Count: {event_count}")
+            log_output.append(f"| - ({response[5]:02X}) Events Data Length: {events_data_length} bytes")
+            for event_index, (event_type, event_id, payload_length, value) in enumerate(
+                    protocol.iter_events(response, event_count), start=1):
+                log_output.append(f"  |- Event {event_index}:")
+                log_output.append(f"      |- ({payload_length}) Event Payload Length: {payload_length}")
+                log_output.append(f"      |- ({event_type}) Event Type: {event_type}")
+                log_output.append(f"      |- ({event_id:02X}) Event ID: {event_id}")
+                log_output.append(f"      |- ({value}) Event Payload Value: {value}")
+            self.logger.debug("\n".join(log_output))
 
         return {
             "packet_info": packet_info,  # Return packet information
@@ -112,19 +103,45 @@ class ModbusEventReader(ModbusCommon):
         Returns:
             list: A list of dictionaries containing event information, or an empty dictionary if the request failed.
         """
-        request_command = struct.pack('>BBBBBBB', self.BROADCAST_ADDRESS, self.ext_func_code,
-                                      self.REQUEST_EVENTS_COMMAND, min_slave_id, max_data_length, slave_id, flag)
-        self.send_command(request_command)
-
-        if self.wait_for_response():
-            response = self.serial_port.read(256)
-            self.logger.debug(f"RCV (raw): {self.format_bytes(response)}")
+        request_command = protocol.encode_event_request(min_slave_id, max_data_length, slave_id, flag, self.ext_func_code)
+        # The response carries at most max_data_length bytes of events after a 6 byte header
+        response = self.transact(self.BROADCAST_ADDRESS, request_command, protocol.EVENT_RESPONSE_OVERHEAD + max_data_length)
 
+        if response is not None:
             response = response.lstrip(b'\xFF')
-            self.logger.debug(f"RCV (filtered): {self.format_bytes(response)}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"RCV (filtered): {self.format_bytes(response)}")
 
             if not self.check_crc(response):
                 self.logger.error("Invalid CRC in response.")
                 return {}  # Return an empty dictionary if CRC is invalid
-            return self.parse_event_response(response)
+            events = self.parse_event_response(response)
+            if self.event_ring is not None:
+                self.event_ring.publish(events)
+            if self.event_router is not None:
+                self.event_router.publish(events)
+            return events
         return {}
+
+    def poll_events(self, min_slave_id: int = 1):
+        """
+        Request the next event packet, confirming the previous one and sizing the request to the backlog.
+
+        The device ID and flag of the last packet received are sent back to confirm it,
+        and max_data_length is taken from the batch sizer, which adapts it to the
+        response.
+
+        Args:
+            min_slave_id (int): The minimum slave ID to request events from.
+
+        Returns:
+            dict: The parsed event response, or an empty dictionary if there were no events or the request failed.
+        """
+        slave_id, flag = self.confirmation
+        response = self.request_events(min_slave_id, self.batch_sizer.length, slave_id, flag)
+        if response and response.get('events'):
+            self.confirmation = (response['packet_info']['device_id'], response['packet_info']['flag'])
+        else:
+            self.confirmation = (0, 0)
+        self.batch_sizer.update(response)
+        return response
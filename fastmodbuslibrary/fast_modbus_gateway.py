@@ -0,0 +1,322 @@
+import asyncio
+import struct
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from .fast_modbus_client import ModbusClient
+from .read_result import ReadResult
+
+
+class ModbusTcpGateway:
+    """
+    An asyncio Modbus TCP server in front of a fast Modbus bus.
+
+    Requests from any number of TCP clients are mapped from their unit ID to a device
+    serial number and executed one at a time on the bus through a ModbusClient.
+    Identical reads that are in flight at the same time share one bus transaction, and
+    reads may be answered from values fetched less than `max_age` seconds ago. Exception
+    responses of the device are passed through with their own code.
+
+    Attributes:
+        MBAP_HEADER (struct.Struct): The Modbus TCP application header.
+        ILLEGAL_FUNCTION (int): Exception code for unsupported function codes.
+        ILLEGAL_DATA_VALUE (int): Exception code for malformed requests.
+        GATEWAY_PATH_UNAVAILABLE (int): Exception code for unit IDs without a mapped device or a failed bus.
+        GATEWAY_TARGET_FAILED (int): Exception code for devices that did not answer (or answered corrupted frames).
+    """
+
+    MBAP_HEADER = struct.Struct('>HHHB')
+    ILLEGAL_FUNCTION = 0x01
+    ILLEGAL_DATA_VALUE = 0x03
+    GATEWAY_PATH_UNAVAILABLE = 0x0A
+    GATEWAY_TARGET_FAILED = 0x0B
+
+    def __init__(self, client: ModbusClient, unit_map: dict, max_age: float = 0.0):
+        """
+        Initialize the ModbusTcpGateway instance.
+
+        Args:
+            client (ModbusClient): The client used to access the bus.
+            unit_map (dict): Device serial numbers by Modbus TCP unit ID.
+            max_age (float): The maximum age of cached values used to answer reads (in seconds), 0 disables caching.
+        """
+        self.client = client
+        self.unit_map = dict(unit_map)
+        self.max_age = max_age
+        # Cached blocks by (serial_number, function), each a dict of (timestamp, data) by (register, count)
+        self.cache = {}
+        self.pending = {}
+        self.bus_executor = ThreadPoolExecutor(max_workers=1)
+        self.server = None
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_devices(cls, client: ModbusClient, devices: list, max_age: float = 0.0):
+        """
+        Create a gateway mapping each device's Modbus ID to its serial number.
+
+        Args:
+            client (ModbusClient): The client used to access the bus.
+            devices (list): Device dictionaries as returned by ModbusScanner.scan_devices.
+            max_age (float): The maximum age of cached values used to answer reads (in seconds).
+
+        Returns:
+            ModbusTcpGateway: The gateway.
+        """
+        return cls(client, {device['modbus_id']: device['serial_number'] for device in devices}, max_age)
+
+    async def start(self, host: str = '0.0.0.0', port: int = 502):
+        """
+        Start listening for Modbus TCP connections.
+
+        Args:
+            host (str): The address to listen on.
+            port (int): The TCP port to listen on, 0 picks a free port.
+
+        Returns:
+            asyncio.AbstractServer: The running server.
+        """
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        self.logger.info(f"Modbus TCP gateway listening on {self.server.sockets[0].getsockname()}")
+        return self.server
+
+    async def stop(self):
+        """
+        Stop the server and release the bus worker.
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        self.bus_executor.shutdown(wait=False)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serve Modbus TCP requests from one client connection until it closes.
+
+        Requests on one connection are answered concurrently, so a client may pipeline them.
+
+        Args:
+            reader (asyncio.StreamReader): The connection reader.
+            writer (asyncio.StreamWriter): The connection writer.
+        """
+        tasks = set()
+        try:
+            while True:
+                header = await reader.readexactly(self.MBAP_HEADER.size)
+                transaction_id, protocol_id, length, unit_id = self.MBAP_HEADER.unpack(header)
+                pdu = await reader.readexactly(length - 1) if length > 1 else b''
+                if protocol_id != 0 or not pdu:
+                    continue
+                task = asyncio.ensure_future(self.answer(writer, transaction_id, unit_id, pdu))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def answer(self, writer: asyncio.StreamWriter, transaction_id: int, unit_id: int, pdu: bytes):
+        """
+        Execute one request and write its response.
+
+        Args:
+            writer (asyncio.StreamWriter): The connection writer.
+            transaction_id (int): The MBAP transaction ID of the request.
+            unit_id (int): The unit ID of the request.
+            pdu (bytes): The request PDU.
+        """
+        response = await self.handle_request(unit_id, pdu)
+        writer.write(self.MBAP_HEADER.pack(transaction_id, 0, len(response) + 1, unit_id) + response)
+        await writer.drain()
+
+    def exception(self, function: int, code: int) -> bytes:
+        """
+        Build an exception response PDU.
+
+        Args:
+            function (int): The function code of the request.
+            code (int): The Modbus exception code.
+
+        Returns:
+            bytes: The exception response PDU.
+        """
+        return bytes([function | 0x80, code])
+
+    async def handle_request(self, unit_id: int, pdu: bytes) -> bytes:
+        """
+        Execute a request PDU on the device mapped to the unit ID.
+
+        Args:
+            unit_id (int): The Modbus TCP unit ID.
+            pdu (bytes): The request PDU.
+
+        Returns:
+            bytes: The response PDU.
+        """
+        function = pdu[0]
+        serial_number = self.unit_map.get(unit_id)
+        if serial_number is None:
+            return self.exception(function, self.GATEWAY_PATH_UNAVAILABLE)
+
+        if function in (0x03, 0x04):
+            if len(pdu) != 5:
+                return self.exception(function, self.ILLEGAL_DATA_VALUE)
+            register, count = struct.unpack_from('>HH', pdu, 1)
+            if not 1 <= count <= 125:
+                return self.exception(function, self.ILLEGAL_DATA_VALUE)
+            result = await self.read(serial_number, function, register, count)
+            if not result:
+                return self.exception(function, self.failure_code(result))
+            return bytes([function, len(result.data)]) + result.data
+
+        if function in (0x06, 0x10):
+            if function == 0x06 and len(pdu) == 5:
+                register, value = struct.unpack_from('>HH', pdu, 1)
+                values = [value]
+            elif function == 0x10 and len(pdu) >= 6 and len(pdu) == 6 + pdu[5] and pdu[5] == 2 * struct.unpack_from('>H', pdu, 3)[0]:
+                register, count = struct.unpack_from('>HH', pdu, 1)
+                if not 1 <= count <= 123:
+                    return self.exception(function, self.ILLEGAL_DATA_VALUE)
+                values = list(struct.unpack_from(f'>{count}H', pdu, 6))
+            else:
+                return self.exception(function, self.ILLEGAL_DATA_VALUE)
+            result = await self.write(serial_number, register, values)
+            if not result:
+                return self.exception(function, self.failure_code(result))
+            return pdu[:5]
+
+        return self.exception(function, self.ILLEGAL_FUNCTION)
+
+    def failure_code(self, result) -> int:
+        """
+        Get the exception code answering a failed bus transaction.
+
+        Args:
+            result (ReadResult): The result of the transaction, None if the bus failed.
+
+        Returns:
+            int: The exception code of the device, GATEWAY_PATH_UNAVAILABLE for a failed
+            bus, or GATEWAY_TARGET_FAILED if the device did not answer.
+        """
+        if result is None:
+            return self.GATEWAY_PATH_UNAVAILABLE
+        if result.status == ReadResult.EXCEPTION:
+            return result.exception_code
+        return self.GATEWAY_TARGET_FAILED
+
+    def cached(self, serial_number: int, function: int, register: int, count: int):
+        """
+        Look up a fresh cached block covering the requested range.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            function (int): The read function code.
+            register (int): The starting register address.
+            count (int): The number of registers.
+
+        Returns:
+            bytes: The cached register data, or None if no fresh block covers the range.
+        """
+        if self.max_age <= 0:
+            return None
+        blocks = self.cache.get((serial_number, function))
+        if not blocks:
+            return None
+        now = time.monotonic()
+        for (start, cached_count), (timestamp, data) in blocks.items():
+            if now - timestamp <= self.max_age and start <= register and register + count <= start + cached_count:
+                offset = 2 * (register - start)
+                return data[offset:offset + 2 * count]
+        return None
+
+    async def read(self, serial_number: int, function: int, register: int, count: int):
+        """
+        Read registers, sharing in-flight transactions and using fresh cached values.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            function (int): The read function code.
+            register (int): The starting register address.
+            count (int): The number of registers.
+
+        Returns:
+            ReadResult: The result of the read, or None if the bus failed.
+        """
+        data = self.cached(serial_number, function, register, count)
+        if data is not None:
+            return ReadResult(ReadResult.OK, data)
+
+        key = (serial_number, function, register, count)
+        future = self.pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.bus_executor, self.client.read_result,
+                                          serial_number, function, register, count)
+            self.pending[key] = future
+            future.add_done_callback(lambda _: self.pending.pop(key, None))
+            future.add_done_callback(lambda done: self.store(key, done))
+        try:
+            return await asyncio.shield(future)
+        except Exception as e:
+            self.logger.error(f"Error reading from device {serial_number}: {e}")
+            return None
+
+    def store(self, key: tuple, future: asyncio.Future):
+        """
+        Cache the result of a finished read and drop the expired blocks of its device and function.
+
+        Args:
+            key (tuple): The (serial_number, function, register, count) of the read.
+            future (asyncio.Future): The finished read.
+        """
+        if self.max_age <= 0 or future.cancelled() or future.exception() is not None or not future.result():
+            return
+        serial_number, function, register, count = key
+        blocks = self.cache.setdefault((serial_number, function), {})
+        now = time.monotonic()
+        for block in [block for block, (timestamp, _) in blocks.items() if now - timestamp > self.max_age]:
+            del blocks[block]
+        blocks[(register, count)] = (now, bytes(future.result().data))
+
+    def invalidate(self, serial_number: int, register: int, count: int):
+        """
+        Drop cached blocks overlapping a range of holding registers.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            register (int): The starting register address.
+            count (int): The number of registers.
+        """
+        blocks = self.cache.get((serial_number, 0x03))
+        if not blocks:
+            return
+        for start, cached_count in list(blocks):
+            if start < register + count and register < start + cached_count:
+                del blocks[(start, cached_count)]
+
+    async def write(self, serial_number: int, register: int, values: list):
+        """
+        Write holding registers and drop cached blocks overlapping them.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            register (int): The starting register address.
+            values (list): The values to write.
+
+        Returns:
+            ReadResult: The result of the write, or None if the bus failed.
+        """
+        self.invalidate(serial_number, register, len(values))
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.bus_executor, self.client.write_result,
+                                              serial_number, 0x10, register, values)
+        except Exception as e:
+            self.logger.error(f"Error writing to device {serial_number}: {e}")
+            return None
+        finally:
+            # Reads queued before the write may have cached the old values meanwhile
+            self.invalidate(serial_number, register, len(values))
@@ -1,6 +1,8 @@
-import struct
+import time
 import logging
+from . import protocol
 from .common import ModbusCommon
+from .retry_policy import RetryPolicy
 
 class ModbusScanner(ModbusCommon):
     """
@@ -16,23 +18,25 @@ class ModbusScanner(ModbusCommon):
         MODEL_REQUEST_REGISTER_COUNT (int): The number of registers to read for the model request.
     """
 
-    SCAN_START_COMMAND = 0x01
-    SCAN_CONTINUE_COMMAND = 0x02
-    SCAN_RESPONSE_COMMAND = 0x03
-    SCAN_END_COMMAND = 0x04
+    SCAN_START_COMMAND = protocol.SCAN_START
+    SCAN_CONTINUE_COMMAND = protocol.SCAN_CONTINUE
+    SCAN_RESPONSE_COMMAND = protocol.SCAN_RESPONSE
+    SCAN_END_COMMAND = protocol.SCAN_END
     MODEL_REQUEST_FUNCTION_CODE = 0x03
     MODEL_REQUEST_START_REGISTER = 200
     MODEL_REQUEST_REGISTER_COUNT = 20
 
-    def __init__(self, device: str, baudrate: int, ext_func_code: int = 0x46):
+    def __init__(self, device: str, baudrate: int, ext_func_code: int = 0x46, retry_policy: RetryPolicy = None):
         """
         Initialize the ModbusScanner instance.
 
         Args:
             device (str): The serial device path (e.g., /dev/ttyUSB0).
             baudrate (int): The baud rate for the serial connection.
+            retry_policy (RetryPolicy): The timeout and retry policy, a default one sharing the
+                device health of the transport is created if None.
         """
-        super().__init__(device, baudrate, ext_func_code)
+        super().__init__(device, baudrate, ext_func_code, retry_policy)
         self.logger = logging.getLogger(__name__)
 
     def request_device_model(self, serial_number: int) -> str:
@@ -45,21 +49,13 @@ class ModbusScanner(ModbusCommon):
         Returns:
             str: The device model information, or "Invalid CRC" if the CRC check fails, or "Unknown" if no response is received.
         """
-        model_request = struct.pack(
-            '>BBBIBHH',
-            self.BROADCAST_ADDRESS,
-            self.ext_func_code,
-            0x08,
-            serial_number,
-            self.MODEL_REQUEST_FUNCTION_CODE,
-            self.MODEL_REQUEST_START_REGISTER,
-            self.MODEL_REQUEST_REGISTER_COUNT
-        )
-        self.send_command(model_request)
-
-        if self.wait_for_response():
-            response = self.serial_port.read(256)
-            self.logger.debug(f"RCV: {self.format_bytes(response)}")
+        model_request = protocol.encode_read_request(serial_number, self.MODEL_REQUEST_FUNCTION_CODE,
+                                                     self.MODEL_REQUEST_START_REGISTER,
+                                                     self.MODEL_REQUEST_REGISTER_COUNT, self.ext_func_code)
+        response = self.transact(serial_number, model_request,
+                                 protocol.READ_RESPONSE_OVERHEAD + 2 * self.MODEL_REQUEST_REGISTER_COUNT)
+
+        if response is not None:
             if self.check_crc(response) and len(response) >= 40:
                 return response[9:29].decode('ascii').strip()
             return "Invalid CRC"
@@ -69,7 +65,7 @@ class ModbusScanner(ModbusCommon):
         """
         Send a command to continue the scan.
         """
-        self.send_command(struct.pack('BBB', self.BROADCAST_ADDRESS, self.ext_func_code, self.SCAN_CONTINUE_COMMAND))
+        self.send_command(protocol.encode_command(self.SCAN_CONTINUE_COMMAND, self.ext_func_code))
 
     def scan_devices(self):
         """
@@ -81,23 +77,27 @@ class ModbusScanner(ModbusCommon):
         self.logger.info(f"Starting scan on port {self.device} with baudrate {self.baudrate} and scan command {hex(self.ext_func_code)}...")
 
         devices = []
-        self.send_command(struct.pack('BBB', self.BROADCAST_ADDRESS, self.ext_func_code, self.SCAN_START_COMMAND))
-
-        while self.wait_for_response(2):
-            response = self.serial_port.read(256)
-            if not response:
-                break
-
-            self.logger.debug(f"RCV: {self.format_bytes(response)}")
-
-            response = response.lstrip(b'\xFF')
-            if len(response) >= 10 and response[2] == self.SCAN_RESPONSE_COMMAND:
-                serial_number, modbus_id = struct.unpack('>I', response[3:7])[0], response[7]
-                model = self.request_device_model(serial_number)
-                devices.append({"serial_number": serial_number, "modbus_id": modbus_id, "model": model})
-                self.send_continue_scan()
-            elif response[2] == self.SCAN_END_COMMAND:
-                self.logger.info("Scan complete.")
-                break
+        # Keep other roles sharing the transport off the bus until the scan is complete
+        with self.serial_port.lock:
+            self.send_command(protocol.encode_command(self.SCAN_START_COMMAND, self.ext_func_code))
+
+            while self.wait_for_response(2):
+                response = self.read_response(time.monotonic() + self.frame_airtime(256))
+                if not response:
+                    break
+
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(f"RCV: {self.format_bytes(response)}")
+
+                response = response.lstrip(b'\xFF')
+                device = protocol.decode_scan_response(response) if len(response) >= 10 else None
+                if device is not None:
+                    serial_number, modbus_id = device
+                    model = self.request_device_model(serial_number)
+                    devices.append({"serial_number": serial_number, "modbus_id": modbus_id, "model": model})
+                    self.send_continue_scan()
+                elif response[2] == self.SCAN_END_COMMAND:
+                    self.logger.info("Scan complete.")
+                    break
 
         return devices
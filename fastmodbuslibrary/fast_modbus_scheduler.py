@@ -0,0 +1,384 @@
+import heapq
+import time
+import logging
+from . import protocol
+from .fast_modbus_client import ModbusClient
+from .fast_modbus_events import ModbusEventReader
+
+
+class PollTask:
+    """
+    A periodic read of one register range, or an event request slot.
+
+    Attributes:
+        period (float): The interval between releases (in seconds).
+        deadline (float): The time after release by which the read must complete (in seconds).
+        airtime (float): The estimated bus time of one transaction (in seconds).
+        next_release (float): The time of the next release.
+        runs (int): The number of completed transactions.
+        misses (int): The number of releases that completed late or were skipped.
+        max_lateness (float): The largest completion time past a deadline seen so far (in seconds).
+    """
+
+    def __init__(self, serial_number: int, command: int, register: int, count: int,
+                 period: float, deadline: float, airtime: float, callback=None):
+        """
+        Initialize the PollTask instance.
+
+        Args:
+            serial_number (int): The serial number of the device, or None for an event slot.
+            command (int): The read function code.
+            register (int): The starting register address.
+            count (int): The number of registers to read.
+            period (float): The interval between releases (in seconds).
+            deadline (float): The relative deadline (in seconds).
+            airtime (float): The estimated bus time of one transaction (in seconds).
+            callback (callable): Called as callback(task, data) after each transaction.
+        """
+        self.serial_number = serial_number
+        self.command = command
+        self.register = register
+        self.count = count
+        self.period = period
+        self.deadline = deadline
+        self.airtime = airtime
+        self.callback = callback
+        self.next_release = 0.0
+        self.runs = 0
+        self.misses = 0
+        self.max_lateness = 0.0
+
+    def __repr__(self):
+        if self.serial_number is None:
+            return f"PollTask(events, period={self.period})"
+        return f"PollTask({self.serial_number}, {self.command:#04x}, {self.register}, {self.count}, period={self.period})"
+
+
+class PollScheduler:
+    """
+    A deadline-driven poll scheduler for one bus.
+
+    Each register range is released periodically at absolute times, so sampling does not
+    drift, and released work runs earliest-deadline-first. The scheduler budgets the
+    airtime of every transaction from the baud rate and frame sizes and rejects plans
+    that could miss a deadline: besides keeping bus utilization within `max_utilization`,
+    the work due by every deadline, plus the longest transaction with a later deadline
+    that may hold the bus (transactions cannot be preempted), must fit before that
+    deadline, with all tasks released together as add_task() does. Event requests can be
+    interleaved as a periodic slot of their own.
+
+    Attributes:
+        MAX_DEMAND_POINTS (int): The largest number of deadlines checked for a plan; a
+            plan needing more checks is rejected as unverifiable.
+        READ_REQUEST_LENGTH (int): The length of an extended read request frame in bytes.
+        READ_RESPONSE_OVERHEAD (int): The length of an extended read response frame without data in bytes.
+        EVENT_REQUEST_LENGTH (int): The length of an event request frame in bytes.
+        EVENT_RESPONSE_OVERHEAD (int): The length of an event response frame without events in bytes.
+    """
+
+    READ_REQUEST_LENGTH = protocol.READ_REQUEST_LENGTH
+    READ_RESPONSE_OVERHEAD = protocol.READ_RESPONSE_OVERHEAD
+    EVENT_REQUEST_LENGTH = protocol.EVENT_REQUEST_LENGTH
+    EVENT_RESPONSE_OVERHEAD = protocol.EVENT_RESPONSE_OVERHEAD
+    MAX_DEMAND_POINTS = 100000
+
+    def __init__(self, client: ModbusClient, max_utilization: float = 0.9, clock=time.monotonic, sleep=time.sleep):
+        """
+        Initialize the PollScheduler instance.
+
+        Args:
+            client (ModbusClient): The client used to read registers.
+            max_utilization (float): The largest accepted share of bus time used by the plan.
+            clock (callable): The time source (in seconds).
+            sleep (callable): The function used to wait for the next release.
+        """
+        self.client = client
+        self.max_utilization = max_utilization
+        self.clock = clock
+        self.sleep = sleep
+        self.tasks = []
+        self.event_reader = None
+        self.event_state = (0, 0)
+        self.logger = logging.getLogger(__name__)
+
+    def turnaround(self) -> float:
+        """
+        Estimate the device turnaround time from the client's retry policy.
+
+        Returns:
+            float: The smoothed bus round-trip time, or the minimum timeout before any measurement (in seconds).
+        """
+        policy = self.client.retry_policy
+        return policy.bus.srtt if policy.bus.srtt is not None else policy.min_timeout
+
+    def read_airtime(self, count: int, command: int = 0x03) -> float:
+        """
+        Estimate the bus time of one read transaction.
+
+        Args:
+            count (int): The number of registers, coils or discrete inputs read.
+            command (int): The read function code.
+
+        Returns:
+            float: The airtime of the request and response plus the turnaround (in seconds).
+        """
+        return (self.client.frame_airtime(self.READ_REQUEST_LENGTH)
+                + self.client.frame_airtime(self.READ_RESPONSE_OVERHEAD + protocol.data_length(command, count))
+                + self.turnaround())
+
+    def utilization(self, extra: list = ()) -> float:
+        """
+        Compute the share of bus time used by the plan.
+
+        Args:
+            extra (list): Tasks to include in addition to the scheduled ones.
+
+        Returns:
+            float: The sum of airtime / period over all tasks.
+        """
+        return sum(task.airtime / task.period for task in list(self.tasks) + list(extra))
+
+    def infeasible_deadline(self, tasks: list) -> float:
+        """
+        Find a deadline a plan can miss under non-preemptive earliest-deadline-first.
+
+        With all tasks released together, the bus demand by time L is the airtime of
+        every job with a deadline up to L, plus the blocking by the longest transaction
+        of a task with a later relative deadline, which may have started just before.
+        Plans passing a density bound need no further check; otherwise the demand is
+        checked at every deadline up to the point where the utilization left over
+        covers any backlog.
+
+        Args:
+            tasks (list): The tasks of the plan.
+
+        Returns:
+            float: The first deadline at which the demand exceeds the time available, or
+            None if the plan is feasible.
+
+        Raises:
+            ValueError: If the plan needs more than MAX_DEMAND_POINTS checks.
+        """
+        utilization = sum(task.airtime / task.period for task in tasks)
+        longest = max(task.airtime for task in tasks)
+        shortest = min(min(task.deadline, task.period) for task in tasks)
+        if sum(task.airtime / min(task.deadline, task.period) for task in tasks) + longest / shortest <= 1.0:
+            return None
+        if utilization >= 1.0:
+            # The backlog never drains, so the blocking of a non-preemptible transaction is never absorbed
+            return shortest
+
+        horizon = max(max(task.deadline for task in tasks),
+                      (sum((task.period - task.deadline) * task.airtime / task.period for task in tasks)
+                       + longest) / (1.0 - utilization))
+        points = [(task.deadline, index) for index, task in enumerate(tasks)]
+        heapq.heapify(points)
+        demand = 0.0
+        checked = 0
+        while points and points[0][0] <= horizon:
+            point, index = heapq.heappop(points)
+            demand += tasks[index].airtime
+            heapq.heappush(points, (point + tasks[index].period, index))
+            if points[0][0] <= point:
+                continue
+            checked += 1
+            if checked > self.MAX_DEMAND_POINTS:
+                raise ValueError(f"Plan feasibility needs more than {self.MAX_DEMAND_POINTS} checks, "
+                                 f"use fewer or more similar periods")
+            later = [task.airtime for task in tasks if task.deadline > point]
+            if demand + max(later, default=0.0) > point + 1e-12:
+                return point
+        return None
+
+    def add_task(self, task: PollTask) -> PollTask:
+        """
+        Add a task to the plan after checking that the plan stays feasible.
+
+        Args:
+            task (PollTask): The task to add.
+
+        Returns:
+            PollTask: The added task.
+
+        Raises:
+            ValueError: If the task cannot complete within its deadline, the plan would overload
+                the bus, or a deadline of the plan could be missed.
+        """
+        if task.airtime > task.deadline:
+            raise ValueError(f"{task} needs {task.airtime * 1000:.1f} ms of bus time, more than its deadline")
+        utilization = self.utilization([task])
+        if utilization > self.max_utilization:
+            raise ValueError(f"Adding {task} raises bus utilization to {utilization:.0%}, "
+                             f"above the limit of {self.max_utilization:.0%}")
+        missed = self.infeasible_deadline(self.tasks + [task])
+        if missed is not None:
+            raise ValueError(f"Adding {task} makes the plan miss deadlines: the bus time due by "
+                             f"{missed * 1000:.1f} ms after release does not fit")
+        task.next_release = self.clock()
+        self.tasks.append(task)
+        return task
+
+    def remove_task(self, task: PollTask):
+        """
+        Remove a task from the plan.
+
+        Args:
+            task (PollTask): The task to remove.
+        """
+        self.tasks.remove(task)
+
+    def add_poll(self, serial_number: int, command: int, register: int, count: int, period: float,
+                 deadline: float = None, callback=None) -> PollTask:
+        """
+        Poll a register range periodically.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            command (int): The read function code (e.g., 0x03 for Read Holding Registers).
+            register (int): The starting register address.
+            count (int): The number of registers, coils or discrete inputs to read.
+            period (float): The interval between reads (in seconds).
+            deadline (float): The time after release by which the read must complete, the period if None.
+            callback (callable): Called as callback(task, data) with the register data, or None on failure.
+
+        Returns:
+            PollTask: The scheduled task.
+
+        Raises:
+            ValueError: If the plan would become infeasible.
+        """
+        task = PollTask(serial_number, command, register, count, period, deadline or period,
+                        self.read_airtime(count, command), callback)
+        return self.add_task(task)
+
+    def add_event_slot(self, event_reader: ModbusEventReader, period: float, max_data_length: int = None,
+                       callback=None) -> PollTask:
+        """
+        Interleave event requests with the polls.
+
+        Args:
+            event_reader (ModbusEventReader): The reader used to request events.
+            period (float): The interval between event requests (in seconds).
+            max_data_length (int): The maximum event data length per request, or None to let the reader's
+                batch sizer adapt it to the backlog (the slot is budgeted at the sizer's cap).
+            callback (callable): Called as callback(task, response) with each event response.
+
+        Returns:
+            PollTask: The scheduled event slot.
+
+        Raises:
+            ValueError: If the plan would become infeasible.
+        """
+        self.event_reader = event_reader
+        budgeted_length = event_reader.batch_sizer.cap if max_data_length is None else max_data_length
+        airtime = (self.client.frame_airtime(self.EVENT_REQUEST_LENGTH)
+                   + self.client.frame_airtime(self.EVENT_RESPONSE_OVERHEAD + budgeted_length) + self.turnaround())
+        task = PollTask(None, None, None, max_data_length, period, period, airtime, callback)
+        return self.add_task(task)
+
+    def execute(self, task: PollTask):
+        """
+        Run one transaction of a task.
+
+        Args:
+            task (PollTask): The task to run.
+
+        Returns:
+            The register data or event response.
+        """
+        if task.serial_number is not None:
+            return self.client.read_registers(task.serial_number, task.command, task.register, task.count)
+
+        if task.count is None:
+            return self.event_reader.poll_events(1)
+
+        slave_id, flag = self.event_state
+        response = self.event_reader.request_events(1, task.count, slave_id, flag)
+        if response and response.get('events'):
+            self.event_state = (response['packet_info']['device_id'], response['packet_info']['flag'])
+        else:
+            self.event_state = (0, 0)
+        return response
+
+    def run_pending(self) -> int:
+        """
+        Run all released work earliest-deadline-first.
+
+        Releases that were missed entirely (the task is more than a period behind) are
+        skipped and counted as misses rather than run back to back.
+
+        Returns:
+            int: The number of transactions executed.
+        """
+        now = self.clock()
+        ready = []
+        for index, task in enumerate(self.tasks):
+            if task.next_release <= now:
+                skipped = int((now - task.next_release) // task.period)
+                if skipped:
+                    task.misses += skipped
+                    task.next_release += skipped * task.period
+                    self.logger.warning(f"{task} skipped {skipped} releases")
+                heapq.heappush(ready, (task.next_release + task.deadline, index, task))
+
+        executed = 0
+        while ready:
+            deadline, _, task = heapq.heappop(ready)
+            data = self.execute(task)
+            finished = self.clock()
+            task.runs += 1
+            task.next_release += task.period
+            executed += 1
+
+            lateness = finished - deadline
+            if lateness > 0:
+                task.misses += 1
+                task.max_lateness = max(task.max_lateness, lateness)
+                self.logger.warning(f"{task} missed its deadline by {lateness * 1000:.1f} ms")
+            if task.callback is not None:
+                task.callback(task, data)
+        return executed
+
+    def next_release(self) -> float:
+        """
+        Get the time of the earliest upcoming release.
+
+        Returns:
+            float: The release time, or None if nothing is scheduled.
+        """
+        return min((task.next_release for task in self.tasks), default=None)
+
+    def run(self, duration: float = None):
+        """
+        Run the plan, sleeping until each release time.
+
+        Args:
+            duration (float): How long to run (in seconds), forever if None.
+        """
+        end = None if duration is None else self.clock() + duration
+        while self.tasks:
+            self.run_pending()
+            wake = self.next_release()
+            if end is not None and wake >= end:
+                break
+            delay = wake - self.clock()
+            if delay > 0:
+                self.sleep(delay)
+
+    def stats(self) -> list:
+        """
+        Report the runs and deadline misses of every task.
+
+        Returns:
+            list: A dictionary per task with its parameters, runs, misses and max_lateness.
+        """
+        return [{
+            "serial_number": task.serial_number,
+            "command": task.command,
+            "register": task.register,
+            "count": task.count,
+            "period": task.period,
+            "runs": task.runs,
+            "misses": task.misses,
+            "max_lateness": task.max_lateness,
+        } for task in self.tasks]
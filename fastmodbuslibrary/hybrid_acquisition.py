@@ -0,0 +1,213 @@
+import logging
+from .fast_modbus_config_events import ModbusConfigEvents
+from .fast_modbus_events import ModbusEventReader
+from .fast_modbus_scheduler import PollScheduler
+
+
+class WatchedBlock:
+    """
+    A block of registers, coils or discrete inputs of interest on one device.
+
+    Attributes:
+        event_registers (set): The addresses for which the device accepted events.
+        polls (list): The PollTask instances polling the addresses without events.
+    """
+
+    def __init__(self, serial_number: int, modbus_id: int, function: int, register: int, count: int):
+        """
+        Initialize the WatchedBlock instance.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            modbus_id (int): The Modbus slave ID of the device, used for event configuration.
+            function (int): The read function code (0x01 to 0x04).
+            register (int): The starting register address.
+            count (int): The number of registers, coils or discrete inputs.
+        """
+        self.serial_number = serial_number
+        self.modbus_id = modbus_id
+        self.function = function
+        self.register = register
+        self.count = count
+        self.event_registers = set()
+        self.polls = []
+
+    def __repr__(self):
+        return f"WatchedBlock({self.serial_number}, {self.function:#04x}, {self.register}, {self.count})"
+
+
+class HybridAcquisition:
+    """
+    Acquires register blocks through events where devices support them and by polling otherwise.
+
+    start() asks every device to enable events for the registers of interest (0x18) and
+    reads the returned mask to learn which it accepted. Accepted registers are not polled:
+    an event for any of them makes the whole block be read back once per event packet.
+    Registers the device rejected (or all of them, if it does not answer the 0x18
+    request) are polled through the scheduler, in runs of consecutive addresses. A reboot
+    event from a device, which loses its event settings, makes it be configured again.
+
+    The scheduler interleaves the event requests with the polls; call its run_pending()
+    to acquire. Values are delivered as callback(serial_number, function, register, data)
+    with the big-endian register data of a whole block, or of a polled run; blocks of
+    coils and discrete inputs deliver packed bits (see register_codec.decode_bits).
+
+    Attributes:
+        REGISTER_TYPES (dict): The register type names of ModbusConfigEvents by read function code.
+        SYSTEM_EVENT (int): The event type of system events.
+        REBOOT_EVENT_ID (int): The ID of the system event a device sends after starting.
+        stats (dict): Counters of "events" received, "event_reads" of blocks and "polls".
+    """
+
+    REGISTER_TYPES = {0x01: "coil", 0x02: "discrete", 0x03: "holding", 0x04: "input"}
+    SYSTEM_EVENT = 0x0F
+    REBOOT_EVENT_ID = 0
+
+    def __init__(self, scheduler: PollScheduler, config_events: ModbusConfigEvents, event_reader: ModbusEventReader,
+                 callback, poll_period: float = 1.0, event_period: float = 0.05, priority: int = 1):
+        """
+        Initialize the HybridAcquisition instance.
+
+        Args:
+            scheduler (PollScheduler): The scheduler running the polls and event requests, with the client.
+            config_events (ModbusConfigEvents): The role used to enable events.
+            event_reader (ModbusEventReader): The role used to request events.
+            callback (callable): Called as callback(serial_number, function, register, data) with new values.
+            poll_period (float): The interval between polls of registers without events (in seconds).
+            event_period (float): The interval between event requests (in seconds).
+            priority (int): The event priority requested for the registers (1 or 2).
+        """
+        self.scheduler = scheduler
+        self.client = scheduler.client
+        self.config_events = config_events
+        self.event_reader = event_reader
+        self.callback = callback
+        self.poll_period = poll_period
+        self.event_period = event_period
+        self.priority = priority
+        self.blocks = []
+        self.index = {}
+        self.event_task = None
+        self.stats = {"events": 0, "event_reads": 0, "polls": 0}
+        self.logger = logging.getLogger(__name__)
+
+    def add(self, serial_number: int, modbus_id: int, function: int, register: int, count: int) -> WatchedBlock:
+        """
+        Add a block of registers of interest.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            modbus_id (int): The Modbus slave ID of the device.
+            function (int): The read function code (0x01 to 0x04).
+            register (int): The starting register address.
+            count (int): The number of registers, coils or discrete inputs.
+
+        Returns:
+            WatchedBlock: The block.
+
+        Raises:
+            ValueError: If the function code is not a read function code.
+        """
+        if function not in self.REGISTER_TYPES:
+            raise ValueError(f"Unsupported function code for acquisition: {function:#04x}")
+        block = WatchedBlock(serial_number, modbus_id, function, register, count)
+        self.blocks.append(block)
+        for address in range(register, register + count):
+            self.index[(modbus_id, function, address)] = block
+        return block
+
+    def start(self):
+        """
+        Enable events, schedule polls for the rest and the event requests, and read every block once.
+
+        Raises:
+            ValueError: If the scheduler cannot fit the polls or the event requests.
+        """
+        for block in self.blocks:
+            self.configure(block)
+        if self.event_task is None and any(block.event_registers for block in self.blocks):
+            self.event_task = self.scheduler.add_event_slot(self.event_reader, self.event_period,
+                                                            callback=self.handle_events)
+        for block in self.blocks:
+            self.read_block(block)
+
+    def configure(self, block: WatchedBlock):
+        """
+        Enable events for a block and poll the registers the device rejected.
+
+        Args:
+            block (WatchedBlock): The block to configure.
+        """
+        mask = self.config_events.configure_events(block.modbus_id, self.REGISTER_TYPES[block.function],
+                                                   block.register, block.count, self.priority)
+        block.event_registers = set()
+        if mask:
+            block.event_registers = {block.register + offset for offset in range(block.count)
+                                     if offset // 8 < len(mask) and mask[offset // 8] >> (offset % 8) & 1}
+        self.logger.info(f"{block}: events for {len(block.event_registers)} of {block.count} registers")
+
+        for task in block.polls:
+            self.scheduler.remove_task(task)
+        block.polls = []
+        start = None
+        for address in range(block.register, block.register + block.count + 1):
+            polled = address < block.register + block.count and address not in block.event_registers
+            if polled and start is None:
+                start = address
+            elif not polled and start is not None:
+                block.polls.append(self.scheduler.add_poll(block.serial_number, block.function, start,
+                                                           address - start, self.poll_period, callback=self.handle_poll))
+                start = None
+
+    def read_block(self, block: WatchedBlock):
+        """
+        Read a whole block and deliver its values.
+
+        Args:
+            block (WatchedBlock): The block to read.
+        """
+        data = self.client.read_registers(block.serial_number, block.function, block.register, block.count)
+        if data is not None:
+            self.callback(block.serial_number, block.function, block.register, data)
+
+    def handle_poll(self, task, data: bytes):
+        """
+        Deliver the values of a polled run.
+
+        Args:
+            task (PollTask): The finished poll.
+            data (bytes): The register data, or None if the read failed.
+        """
+        self.stats["polls"] += 1
+        if data is not None:
+            self.callback(task.serial_number, task.command, task.register, data)
+
+    def handle_events(self, task, response: dict):
+        """
+        Read back the blocks that events were received for.
+
+        Args:
+            task (PollTask): The event slot.
+            response (dict): The parsed event response, empty if there were no events.
+        """
+        events = response.get('events') if response else None
+        if not events:
+            return
+        modbus_id = response['packet_info']['device_id']
+        changed = []
+        for event in events:
+            self.stats["events"] += 1
+            if event['event_type'] == self.SYSTEM_EVENT and event['event_id'] == self.REBOOT_EVENT_ID:
+                for block in self.blocks:
+                    if block.modbus_id == modbus_id and block.event_registers:
+                        self.logger.warning(f"Device {block.serial_number} restarted, configuring events again")
+                        self.configure(block)
+                        changed.append(block)
+                continue
+            block = self.index.get((modbus_id, event['event_type'], event['event_id']))
+            if block is not None:
+                changed.append(block)
+
+        for block in dict.fromkeys(changed):
+            self.stats["event_reads"] += 1
+            self.read_block(block)
@@ -0,0 +1,415 @@
+import struct
+from functools import lru_cache
+
+
+BROADCAST_ADDRESS = 0xFD
+EXT_FUNC_CODE = 0x46
+
+# Sub-commands of the extension function code
+SCAN_START = 0x01
+SCAN_CONTINUE = 0x02
+SCAN_RESPONSE = 0x03
+SCAN_END = 0x04
+REQUEST = 0x08
+RESPONSE = 0x09
+REQUEST_EVENTS = 0x10
+EVENTS = 0x11
+NO_EVENTS = 0x12
+CONFIG_EVENTS = 0x18
+
+RTU_BROADCAST_ID = 0x00
+EXCEPTION_FLAG = 0x80
+
+# Address, function code, sub-command
+COMMAND = struct.Struct('>BBB')
+# Address, function code, sub-command, serial number, function, register, count
+READ_REQUEST = struct.Struct('>BBBIBHH')
+# As READ_REQUEST, followed by the byte count of the register data
+WRITE_REQUEST = struct.Struct('>BBBIBHHB')
+# Address, function code, sub-command, serial number, function, byte count or exception code
+PDU_RESPONSE = struct.Struct('>BBBIBB')
+# Address, function code, sub-command, serial number, Modbus ID
+SCAN_DEVICE = struct.Struct('>BBBIB')
+# Address, function code, sub-command, minimum slave ID, max data length, confirmed slave ID and flag
+EVENT_REQUEST = struct.Struct('>BBBBBBB')
+# Slave ID, function code, sub-command, flag, event count, event data length
+EVENT_HEADER = struct.Struct('>BBBBBB')
+# Payload length, event type, event ID
+EVENT = struct.Struct('>BBH')
+# Slave ID, function code, sub-command, data length
+CONFIG_HEADER = struct.Struct('>BBBB')
+# Register type, address, count
+CONFIG_RANGE = struct.Struct('>BHB')
+# Slave ID, function, register, count, byte count (standard RTU Write Multiple Registers)
+RTU_WRITE_MULTIPLE = struct.Struct('>BBHHB')
+CRC = struct.Struct('<H')
+
+# Standard PDU fields after the function code: address and count of a read (or address
+# and value of a single write), and address, count and byte count of a multiple write
+PDU_READ_RANGE = struct.Struct('>HH')
+PDU_WRITE_RANGE = struct.Struct('>HHB')
+# Function code and byte count of a standard read response
+PDU_READ_RESPONSE = struct.Struct('>BB')
+SERIAL_NUMBER = struct.Struct('>I')
+# The payload of a register event (little-endian)
+EVENT_REGISTER_VALUE = struct.Struct('<H')
+
+# Frame lengths including CRC
+READ_REQUEST_LENGTH = READ_REQUEST.size + CRC.size
+READ_RESPONSE_OVERHEAD = PDU_RESPONSE.size + CRC.size
+WRITE_RESPONSE_LENGTH = READ_REQUEST.size + CRC.size
+EXCEPTION_RESPONSE_LENGTH = PDU_RESPONSE.size + CRC.size
+EVENT_REQUEST_LENGTH = EVENT_REQUEST.size + CRC.size
+EVENT_RESPONSE_OVERHEAD = EVENT_HEADER.size + CRC.size
+
+# Flag bit of an event response: the device holds more events than the packet carries.
+# The lowest bit toggles with every new packet and confirms it when sent back.
+MORE_EVENTS_FLAG = 0x80
+
+BIT_FUNCTIONS = (0x01, 0x02)
+# The largest counts of one standard Modbus request
+MAX_READ_BITS = 2000
+MAX_READ_REGISTERS = 125
+MAX_WRITE_COILS = 1968
+MAX_WRITE_REGISTERS = 123
+
+
+def crc_table() -> list:
+    """
+    Build the lookup table of the Modbus CRC16 (polynomial 0xA001) for one byte at a time.
+
+    Returns:
+        list: The CRC contribution of every byte value.
+    """
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+CRC_TABLE = crc_table()
+
+
+@lru_cache(maxsize=256)
+def register_block(count: int) -> struct.Struct:
+    """
+    Get the codec of a block of big-endian 16-bit registers.
+
+    Args:
+        count (int): The number of registers.
+
+    Returns:
+        struct.Struct: The codec, shared by every caller with the same count.
+    """
+    return struct.Struct(f'>{count}H')
+
+
+def crc16(data, length: int = None) -> int:
+    """
+    Calculate the Modbus CRC16 of a frame.
+
+    Args:
+        data (bytes): The frame.
+        length (int): The number of leading bytes to include, all if None.
+
+    Returns:
+        int: The CRC16 checksum.
+    """
+    table = CRC_TABLE
+    crc = 0xFFFF
+    for index in range(len(data) if length is None else length):
+        crc = (crc >> 8) ^ table[(crc ^ data[index]) & 0xFF]
+    return crc
+
+
+def check_crc(frame) -> bool:
+    """
+    Check the CRC16 at the end of a frame.
+
+    Args:
+        frame (bytes): The frame including its CRC.
+
+    Returns:
+        bool: True if the CRC is valid.
+    """
+    length = len(frame)
+    return length >= 3 and frame[-2] | frame[-1] << 8 == crc16(frame, length - 2)
+
+
+def data_length(function: int, count: int) -> int:
+    """
+    Calculate the length of the data of a read response.
+
+    Args:
+        function (int): The read function code.
+        count (int): The number of coils, inputs or registers read.
+
+    Returns:
+        int: The byte count: packed bits for coils and discrete inputs, two bytes per register otherwise.
+    """
+    return (count + 7) // 8 if function in BIT_FUNCTIONS else 2 * count
+
+
+def encode_command(sub_command: int, ext_func_code: int = EXT_FUNC_CODE) -> bytes:
+    """
+    Encode a broadcast command without arguments, such as the scan commands.
+
+    Args:
+        sub_command (int): The sub-command (e.g., SCAN_START).
+        ext_func_code (int): The extension function code.
+
+    Returns:
+        bytes: The request frame without CRC.
+    """
+    return COMMAND.pack(BROADCAST_ADDRESS, ext_func_code, sub_command)
+
+
+def decode_scan_response(frame):
+    """
+    Decode a scan response.
+
+    Args:
+        frame (bytes): The response frame.
+
+    Returns:
+        tuple: The serial number and Modbus ID of the device, or None if the frame is not a
+        scan response (SCAN_END ends the scan).
+    """
+    if len(frame) < SCAN_DEVICE.size or frame[2] != SCAN_RESPONSE:
+        return None
+    return SCAN_DEVICE.unpack_from(frame)[3:]
+
+
+def encode_read_request(serial_number: int, function: int, register: int, count: int,
+                        ext_func_code: int = EXT_FUNC_CODE) -> bytes:
+    """
+    Encode a read request addressed by serial number.
+
+    Args:
+        serial_number (int): The serial number of the device.
+        function (int): The read function code (0x01 to 0x04).
+        register (int): The starting address.
+        count (int): The number of coils, inputs or registers.
+        ext_func_code (int): The extension function code.
+
+    Returns:
+        bytes: The request frame without CRC.
+    """
+    return READ_REQUEST.pack(BROADCAST_ADDRESS, ext_func_code, REQUEST, serial_number, function, register, count)
+
+
+def decode_read_response(frame, function: int, count: int):
+    """
+    Decode the response to a read request.
+
+    Args:
+        frame (bytes): The response frame.
+        function (int): The read function code of the request.
+        count (int): The number of coils, inputs or registers requested.
+
+    Returns:
+        tuple: The data (a slice of the frame, None unless the read succeeded) and the
+        Modbus exception code (None unless the device answered with an exception).
+    """
+    if len(frame) < EXCEPTION_RESPONSE_LENGTH:
+        return None, None
+    response_function, byte_count = PDU_RESPONSE.unpack_from(frame)[4:]
+    if response_function == function | EXCEPTION_FLAG:
+        return None, byte_count
+    expected = data_length(function, count)
+    if response_function != function or byte_count != expected or len(frame) < PDU_RESPONSE.size + expected:
+        return None, None
+    return frame[PDU_RESPONSE.size:PDU_RESPONSE.size + expected], None
+
+
+def encode_write_request(serial_number: int, function: int, register: int, payload, count: int = None,
+                         ext_func_code: int = EXT_FUNC_CODE) -> bytes:
+    """
+    Encode a write request for multiple registers or coils, addressed by serial number.
+
+    Args:
+        serial_number (int): The serial number of the device.
+        function (int): The write function code (0x10 for registers, 0x0F for coils).
+        register (int): The starting address.
+        payload (bytes): The big-endian register data, or the packed coil bits.
+        count (int): The number of registers or coils written, the registers in the payload if None.
+        ext_func_code (int): The extension function code.
+
+    Returns:
+        bytes: The request frame without CRC.
+    """
+    if count is None:
+        count = len(payload) // 2
+    return bytes(encode_write_request_into(bytearray(WRITE_REQUEST.size + len(payload)), serial_number, function,
+                                           register, count, payload, ext_func_code))
+
+
+def encode_write_request_into(buffer, serial_number: int, function: int, register: int, count: int, payload,
+                              ext_func_code: int = EXT_FUNC_CODE):
+    """
+    Encode a write request into a buffer.
+
+    Args:
+        buffer (bytearray): The buffer, at least WRITE_REQUEST.size + len(payload) bytes long.
+        serial_number (int): The serial number of the device.
+        function (int): The write function code (0x10 for registers, 0x0F for coils).
+        register (int): The starting address.
+        count (int): The number of registers or coils written.
+        payload (bytes): The big-endian register data, or the packed coil bits.
+        ext_func_code (int): The extension function code.
+
+    Returns:
+        memoryview: The request frame without CRC, within the buffer.
+    """
+    WRITE_REQUEST.pack_into(buffer, 0, BROADCAST_ADDRESS, ext_func_code, REQUEST, serial_number, function,
+                            register, count, len(payload))
+    end = WRITE_REQUEST.size + len(payload)
+    buffer[WRITE_REQUEST.size:end] = payload
+    return memoryview(buffer)[:end]
+
+
+def decode_write_response(frame, serial_number: int, function: int, register: int, count: int,
+                          ext_func_code: int = EXT_FUNC_CODE):
+    """
+    Decode the response to a write request.
+
+    Args:
+        frame (bytes): The response frame.
+        serial_number (int): The serial number of the device.
+        function (int): The write function code of the request.
+        register (int): The starting address of the request.
+        count (int): The number of registers or coils written.
+        ext_func_code (int): The extension function code.
+
+    Returns:
+        tuple: True if the response confirms the write, and the Modbus exception code (None
+        unless the device answered with an exception).
+    """
+    if len(frame) >= EXCEPTION_RESPONSE_LENGTH and frame[7] == function | EXCEPTION_FLAG:
+        return False, frame[8]
+    if len(frame) != WRITE_RESPONSE_LENGTH:
+        return False, None
+    expected = (BROADCAST_ADDRESS, ext_func_code, RESPONSE, serial_number, function, register, count)
+    return READ_REQUEST.unpack_from(frame) == expected, None
+
+
+def encode_rtu_write(slave_id: int, register: int, payload) -> bytes:
+    """
+    Encode a standard RTU Write Multiple Registers request, such as a broadcast write.
+
+    Args:
+        slave_id (int): The slave ID, RTU_BROADCAST_ID for every device.
+        register (int): The starting register address.
+        payload (bytes): The big-endian register data.
+
+    Returns:
+        bytes: The request frame without CRC.
+    """
+    return RTU_WRITE_MULTIPLE.pack(slave_id, 0x10, register, len(payload) // 2, len(payload)) + bytes(payload)
+
+
+def encode_event_request(min_slave_id: int, max_data_length: int, slave_id: int, flag: int,
+                         ext_func_code: int = EXT_FUNC_CODE) -> bytes:
+    """
+    Encode an event request, confirming the previous event packet.
+
+    Args:
+        min_slave_id (int): The minimum slave ID allowed to answer.
+        max_data_length (int): The maximum event data length of the response.
+        slave_id (int): The slave ID of the confirmed packet, 0 for none.
+        flag (int): The flag of the confirmed packet.
+        ext_func_code (int): The extension function code.
+
+    Returns:
+        bytes: The request frame without CRC.
+    """
+    return EVENT_REQUEST.pack(BROADCAST_ADDRESS, ext_func_code, REQUEST_EVENTS, min_slave_id, max_data_length,
+                              slave_id, flag)
+
+
+def decode_event_header(frame):
+    """
+    Decode the header of an event response.
+
+    Args:
+        frame (bytes): The response frame.
+
+    Returns:
+        tuple: The slave ID, flag, event count and event data length, or None if the frame
+        carries no events (including the NO_EVENTS response).
+    """
+    if len(frame) < EVENT_HEADER.size or frame[2] != EVENTS:
+        return None
+    slave_id, _, _, flag, event_count, events_data_length = EVENT_HEADER.unpack_from(frame)
+    return slave_id, flag, event_count, events_data_length
+
+
+def iter_events(frame, event_count: int):
+    """
+    Decode the events of an event response.
+
+    Args:
+        frame (bytes): The response frame.
+        event_count (int): The event count of the header.
+
+    Yields:
+        tuple: The event type, event ID, payload length and payload value (little-endian, 0 without payload).
+    """
+    index = EVENT_HEADER.size
+    end = len(frame)
+    for _ in range(event_count):
+        if index + EVENT.size > end:
+            return
+        payload_length, event_type, event_id = EVENT.unpack_from(frame, index)
+        index += EVENT.size
+        value = int.from_bytes(frame[index:index + payload_length], 'little') if payload_length else 0
+        index += payload_length
+        yield event_type, event_id, payload_length, value
+
+
+def encode_config_events(slave_id: int, ranges: list, ext_func_code: int = EXT_FUNC_CODE) -> bytes:
+    """
+    Encode an event configuration request for several ranges.
+
+    Args:
+        slave_id (int): The slave ID of the device.
+        ranges (list): Tuples of (register type, address, priorities) with the read function code as
+            register type and one priority per register (0 disables events).
+        ext_func_code (int): The extension function code.
+
+    Returns:
+        bytes: The request frame without CRC.
+    """
+    length = sum(CONFIG_RANGE.size + len(priorities) for _, _, priorities in ranges)
+    buffer = bytearray(CONFIG_HEADER.size + length)
+    CONFIG_HEADER.pack_into(buffer, 0, slave_id, ext_func_code, CONFIG_EVENTS, length)
+    offset = CONFIG_HEADER.size
+    for register_type, address, priorities in ranges:
+        CONFIG_RANGE.pack_into(buffer, offset, register_type, address, len(priorities))
+        offset += CONFIG_RANGE.size
+        buffer[offset:offset + len(priorities)] = bytes(priorities)
+        offset += len(priorities)
+    return bytes(buffer)
+
+
+def decode_config_response(frame):
+    """
+    Decode the response to an event configuration request.
+
+    Args:
+        frame (bytes): The response frame (a trailing CRC is ignored).
+
+    Returns:
+        bytes: The mask of registers with events enabled, one bit per configured register,
+        or None if the frame is too short.
+    """
+    if len(frame) < CONFIG_HEADER.size:
+        return None
+    length = frame[3]
+    mask = frame[CONFIG_HEADER.size:CONFIG_HEADER.size + length]
+    if len(mask) != length:
+        return None
+    return bytes(mask)
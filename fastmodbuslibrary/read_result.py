@@ -0,0 +1,191 @@
+import time
+import threading
+import logging
+
+
+class ReadResult:
+    """
+    The outcome of a read or write: the data, or why there is none.
+
+    A result is true only if the read succeeded, so `if result:` distinguishes data from
+    failures, and `status` tells a Modbus exception from an unanswered request or a
+    corrupted or malformed response. Batch reads also fill in `latency`, the time from
+    sending the request to decoding the response (in seconds).
+
+    Attributes:
+        OK (str): The device returned the data.
+        EXCEPTION (str): The device answered with a Modbus exception response.
+        TIMEOUT (str): The device did not answer.
+        CRC_ERROR (str): The response had an invalid CRC after all retries.
+        INVALID (str): The response did not match the request.
+        SKIPPED (str): The read was not sent because its batch ran out of time.
+        QUARANTINED (str): The read was not sent because the device is quarantined.
+        EXCEPTION_NAMES (dict): The names of the standard Modbus exception codes.
+    """
+
+    OK = "ok"
+    EXCEPTION = "exception"
+    TIMEOUT = "timeout"
+    CRC_ERROR = "crc_error"
+    INVALID = "invalid"
+    SKIPPED = "skipped"
+    QUARANTINED = "quarantined"
+    EXCEPTION_NAMES = {
+        0x01: "Illegal Function",
+        0x02: "Illegal Data Address",
+        0x03: "Illegal Data Value",
+        0x04: "Server Device Failure",
+        0x05: "Acknowledge",
+        0x06: "Server Device Busy",
+        0x08: "Memory Parity Error",
+        0x0A: "Gateway Path Unavailable",
+        0x0B: "Gateway Target Device Failed to Respond",
+    }
+
+    def __init__(self, status: str, data=None, exception_code: int = None, cached: bool = False):
+        """
+        Initialize the ReadResult instance.
+
+        Args:
+            status (str): One of OK, EXCEPTION, TIMEOUT, CRC_ERROR, INVALID, SKIPPED or QUARANTINED.
+            data (bytes): The data read, None unless the status is OK.
+            exception_code (int): The Modbus exception code, None unless the status is EXCEPTION.
+            cached (bool): True if the exception was answered from the negative cache without a request.
+        """
+        self.status = status
+        self.data = data
+        self.exception_code = exception_code
+        self.cached = cached
+        self.latency = None
+
+    def __bool__(self):
+        return self.status == self.OK
+
+    def __repr__(self):
+        if self.status == self.EXCEPTION:
+            return f"ReadResult({self.status}, {self.exception_code} {self.exception_name}{', cached' if self.cached else ''})"
+        return f"ReadResult({self.status}, {self.data!r})"
+
+    @property
+    def exception_name(self) -> str:
+        """
+        str: The name of the exception code, None unless the status is EXCEPTION.
+        """
+        if self.exception_code is None:
+            return None
+        return self.EXCEPTION_NAMES.get(self.exception_code, f"Exception {self.exception_code:#04x}")
+
+
+class NegativeCache:
+    """
+    Remembers reads that devices rejected, so that polling them again is answered locally.
+
+    Only exceptions that a device gives for every repetition of a request are cached: an
+    Illegal Function holds for every range of that function, and an Illegal Data Address
+    for every range containing the rejected one. Entries expire after `ttl` seconds, so a
+    reconfigured or replaced device is asked again eventually; invalidate() drops them at once.
+
+    Attributes:
+        ILLEGAL_FUNCTION (int): The exception code of an unsupported function.
+        ILLEGAL_DATA_ADDRESS (int): The exception code of a range containing missing registers.
+        stats (dict): Counters of requests answered from the cache ("hits") and of entries added ("added").
+    """
+
+    ILLEGAL_FUNCTION = 0x01
+    ILLEGAL_DATA_ADDRESS = 0x02
+
+    def __init__(self, ttl: float = 60.0):
+        """
+        Initialize the NegativeCache instance.
+
+        Args:
+            ttl (float): The lifetime of an entry (in seconds), 0 disables the cache.
+        """
+        self.ttl = ttl
+        self.entries = {}
+        self.stats = {"hits": 0, "added": 0}
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def lookup(self, serial_number: int, function: int, register: int, count: int) -> int:
+        """
+        Find a cached exception that a read would get.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            function (int): The read function code.
+            register (int): The starting register address.
+            count (int): The number of registers.
+
+        Returns:
+            int: The cached exception code, or None if the read has to be sent.
+        """
+        ranges = self.entries.get((serial_number, function))
+        if not ranges:
+            return None
+        now = time.monotonic()
+        with self.lock:
+            for (start, end), (code, expiry) in list(ranges.items()):
+                if expiry <= now:
+                    del ranges[(start, end)]
+                elif code == self.ILLEGAL_FUNCTION or register <= start and end <= register + count:
+                    self.stats["hits"] += 1
+                    return code
+        return None
+
+    def add(self, serial_number: int, function: int, register: int, count: int, code: int) -> bool:
+        """
+        Remember an exception response if the device would repeat it.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            function (int): The read function code.
+            register (int): The starting register address.
+            count (int): The number of registers.
+            code (int): The Modbus exception code.
+
+        Returns:
+            bool: True if the exception was cached.
+        """
+        if self.ttl <= 0 or code not in (self.ILLEGAL_FUNCTION, self.ILLEGAL_DATA_ADDRESS):
+            return False
+        with self.lock:
+            ranges = self.entries.setdefault((serial_number, function), {})
+            ranges[(register, register + count)] = (code, time.monotonic() + self.ttl)
+            self.stats["added"] += 1
+        self.logger.debug(f"Caching exception {code} of {serial_number} for function {function:#04x} "
+                          f"at {register}-{register + count - 1} for {self.ttl}s")
+        return True
+
+    def discard(self, serial_number: int, function: int, register: int, count: int):
+        """
+        Drop entries disproved by a successful read.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            function (int): The read function code.
+            register (int): The starting register address.
+            count (int): The number of registers read.
+        """
+        ranges = self.entries.get((serial_number, function))
+        if not ranges:
+            return
+        with self.lock:
+            for start, end in list(ranges):
+                code = ranges[(start, end)][0]
+                if code == self.ILLEGAL_FUNCTION or register <= start and end <= register + count:
+                    del ranges[(start, end)]
+
+    def invalidate(self, serial_number: int = None):
+        """
+        Drop the entries of one device, or of all devices.
+
+        Args:
+            serial_number (int): The serial number of the device, None for all devices.
+        """
+        with self.lock:
+            if serial_number is None:
+                self.entries.clear()
+            else:
+                for key in [key for key in self.entries if key[0] == serial_number]:
+                    del self.entries[key]
@@ -0,0 +1,232 @@
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# dtype: (array typecode, numpy type code, registers per value)
+DTYPES = {
+    "int16": ("h", "i2", 1),
+    "uint16": ("H", "u2", 1),
+    "int32": ("i", "i4", 2),
+    "uint32": ("I", "u4", 2),
+    "float32": ("f", "f4", 2),
+    "int64": ("q", "i8", 4),
+    "uint64": ("Q", "u8", 4),
+    "float64": ("d", "f8", 4),
+}
+
+
+def swap_words(data: bytes, registers: int) -> bytes:
+    """
+    Reverse the order of the registers within every value of a block.
+
+    Args:
+        data (bytes): The register block.
+        registers (int): The number of registers per value.
+
+    Returns:
+        bytes: The block with the register order of each value reversed.
+    """
+    if registers == 1:
+        return bytes(data)
+    stride = 2 * registers
+    swapped = bytearray(len(data))
+    for word in range(registers):
+        source = 2 * (registers - 1 - word)
+        swapped[2 * word::stride] = data[source::stride]
+        swapped[2 * word + 1::stride] = data[source + 1::stride]
+    return bytes(swapped)
+
+
+def decode_bits(data: bytes, count: int):
+    """
+    Unpack the coils or discrete inputs of a bit read, least significant bit first.
+
+    Args:
+        data (bytes): The packed bits as returned by ModbusClient.read_registers for 0x01 or 0x02.
+        count (int): The number of bits read.
+
+    Returns:
+        numpy.ndarray or list: The bits, a NumPy bool array when NumPy is installed and a list of bools otherwise.
+    """
+    if np is not None:
+        return np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=count, bitorder="little").view(bool)
+    return [bool(data[i >> 3] >> (i & 7) & 1) for i in range(count)]
+
+
+def encode_bits(values) -> bytes:
+    """
+    Pack coil values for a Write Multiple Coils (0x0F) request, least significant bit first.
+
+    Args:
+        values: A sequence or NumPy array of truth values.
+
+    Returns:
+        bytes: The packed bits, the unused high bits of the last byte cleared.
+    """
+    if np is not None:
+        return np.packbits(np.asarray(values, dtype=bool), bitorder="little").tobytes()
+    packed = bytearray((len(values) + 7) // 8)
+    for i, value in enumerate(values):
+        if value:
+            packed[i >> 3] |= 1 << (i & 7)
+    return bytes(packed)
+
+
+class RegisterCodec:
+    """
+    Converts whole register blocks to and from typed values without per-value struct calls.
+
+    Registers are big-endian on the wire. Values spanning several registers are sent
+    high register first for word_order 'big' and low register first for 'little'.
+    Decoded values are NumPy arrays when NumPy is installed and array.array otherwise;
+    with a scale or offset they are floats computed as raw * scale + offset.
+    """
+
+    def __init__(self, dtype: str = "uint16", word_order: str = "big", scale: float = 1.0, offset: float = 0.0):
+        """
+        Initialize the RegisterCodec instance.
+
+        Args:
+            dtype (str): The value type, one of DTYPES (e.g., 'int16', 'uint32', 'float32').
+            word_order (str): 'big' for high register first, 'little' for low register first.
+            scale (float): The factor applied to raw values when decoding.
+            offset (float): The offset added to scaled values when decoding.
+
+        Raises:
+            ValueError: If the type or word order is unknown.
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown register type: {dtype}")
+        if word_order not in ("big", "little"):
+            raise ValueError(f"Unknown word order: {word_order}")
+        self.dtype = dtype
+        self.word_order = word_order
+        self.scale = scale
+        self.offset = offset
+        self.typecode, numpy_code, self.registers = DTYPES[dtype]
+        self.scaled = scale != 1.0 or offset != 0.0
+        if np is not None:
+            self.wire_dtype = np.dtype(">" + numpy_code)
+            self.native_dtype = np.dtype(numpy_code)
+
+    def __repr__(self):
+        return f"RegisterCodec({self.dtype!r}, {self.word_order!r}, scale={self.scale}, offset={self.offset})"
+
+    def value_count(self, data: bytes) -> int:
+        """
+        Get the number of values in a register block.
+
+        Args:
+            data (bytes): The register block.
+
+        Returns:
+            int: The number of complete values in the block.
+        """
+        return len(data) // (2 * self.registers)
+
+    def decode(self, data: bytes):
+        """
+        Decode a register block into typed values.
+
+        Args:
+            data (bytes): The register block as returned by ModbusClient.read_registers.
+
+        Returns:
+            numpy.ndarray or array.array: The decoded values.
+
+        Raises:
+            ValueError: If the block length is not a multiple of the value size.
+        """
+        if len(data) % (2 * self.registers):
+            raise ValueError(f"Block of {len(data)} bytes does not hold whole {self.dtype} values")
+
+        if np is not None:
+            if self.word_order == "little" and self.registers > 1:
+                words = np.frombuffer(data, dtype=">u2").reshape(-1, self.registers)[:, ::-1]
+                raw = np.ascontiguousarray(words).view(self.wire_dtype).ravel()
+            else:
+                raw = np.frombuffer(data, dtype=self.wire_dtype)
+            if self.scaled:
+                return raw * self.scale + self.offset
+            return raw.astype(self.native_dtype)
+
+        if self.word_order == "little":
+            data = swap_words(data, self.registers)
+        values = array(self.typecode, bytes(data))
+        if sys.byteorder == "little":
+            values.byteswap()
+        if self.scaled:
+            return array("d", [value * self.scale + self.offset for value in values])
+        return values
+
+    def decode_blocks(self, blocks: list) -> list:
+        """
+        Decode many register blocks with a single conversion.
+
+        Args:
+            blocks (list): Register blocks; failed reads (None) decode to None.
+
+        Returns:
+            list: The decoded values of each block.
+        """
+        present = [block for block in blocks if block is not None]
+        values = self.decode(b"".join(present))
+        decoded = []
+        position = 0
+        for block in blocks:
+            if block is None:
+                decoded.append(None)
+                continue
+            count = self.value_count(block)
+            decoded.append(values[position:position + count])
+            position += count
+        return decoded
+
+    def encode(self, values) -> bytes:
+        """
+        Encode typed values into a register block for ModbusClient.write_registers.
+
+        Scaled codecs invert the scale and offset, and round to the raw type if it is an
+        integer type.
+
+        Args:
+            values: A sequence, array.array or NumPy array of values.
+
+        Returns:
+            bytes: The register block.
+
+        Raises:
+            ValueError: If a value does not fit the integer raw type.
+        """
+        if np is not None:
+            values = np.asarray(values)
+            if self.scaled:
+                values = (values - self.offset) / self.scale
+            if self.wire_dtype.kind in "iu":
+                if self.scaled:
+                    values = np.rint(values)
+                limits = np.iinfo(self.wire_dtype)
+                if values.size and (values.min() < limits.min or values.max() > limits.max):
+                    raise ValueError(f"Value out of range for {self.dtype}")
+            data = values.astype(self.wire_dtype).tobytes()
+        else:
+            if self.scaled:
+                values = [(value - self.offset) / self.scale for value in values]
+                if self.typecode not in "fd":
+                    values = [round(value) for value in values]
+            try:
+                raw = array(self.typecode, values)
+            except OverflowError as e:
+                raise ValueError(f"Value out of range for {self.dtype}: {e}") from None
+            if sys.byteorder == "little":
+                raw.byteswap()
+            data = raw.tobytes()
+
+        if self.word_order == "little":
+            data = swap_words(data, self.registers)
+        return data
@@ -0,0 +1,205 @@
+import logging
+from . import protocol
+from .fast_modbus_client import ModbusClient
+from .register_codec import decode_bits
+
+
+class RegisterDumper:
+    """
+    Surveys the register spaces of a device to find which addresses exist.
+
+    Every space is read in the largest blocks the protocol allows, so regions a device
+    serves without gaps cost one request per block. Devices reject a whole block if any
+    address in it is missing; such a block is bisected, its halves read and the failing
+    ones split again, down to `min_block` addresses. Valid runs are thus found as a few
+    aligned blocks, while a missing address costs up to two requests; a larger
+    `min_block` trades resolution for fewer requests over sparse maps. A space rejected
+    with Illegal Function is skipped entirely.
+
+    Blocks the device does not answer at all are not split but listed in `unanswered`,
+    so a dump of a device that went quiet shows the gap instead of reporting the
+    addresses as missing. The device is exempt from quarantine during the dump.
+
+    Attributes:
+        SPACES (dict): The read function code of every register space.
+        MAX_COUNT (dict): The largest number of addresses read in one request per function code.
+        ILLEGAL_FUNCTION (int): The exception code of a function the device does not support.
+        unanswered (list): The (function, start, count) blocks of the last dump left unanswered.
+    """
+
+    SPACES = {"coil": 0x01, "discrete": 0x02, "holding": 0x03, "input": 0x04}
+    MAX_COUNT = {0x01: protocol.MAX_READ_BITS, 0x02: protocol.MAX_READ_BITS,
+                 0x03: protocol.MAX_READ_REGISTERS, 0x04: protocol.MAX_READ_REGISTERS}
+    ILLEGAL_FUNCTION = 0x01
+
+    def __init__(self, client: ModbusClient, min_block: int = 1):
+        """
+        Initialize the RegisterDumper instance.
+
+        Args:
+            client (ModbusClient): The client used to read the device.
+            min_block (int): The size below which blocks rejected by the device are not split.
+        """
+        self.client = client
+        self.min_block = min_block
+        self.requests = 0
+        self.unanswered = []
+        self.logger = logging.getLogger(__name__)
+
+    def read_block(self, serial_number: int, function: int, address: int, count: int):
+        """
+        Read one block of addresses.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            function (int): The read function code (0x01 to 0x04).
+            address (int): The starting address.
+            count (int): The number of addresses.
+
+        Returns:
+            tuple: The values (a list of ints, None on failure) and the Modbus exception code (None unless
+            the device answered with an exception).
+        """
+        client = self.client
+        command = protocol.encode_read_request(serial_number, function, address, count, client.ext_func_code)
+        self.requests += 1
+        response = client.transact(serial_number, command, protocol.READ_RESPONSE_OVERHEAD
+                                   + protocol.data_length(function, count))
+
+        if response is None or not protocol.check_crc(response):
+            return None, None
+        data, exception_code = protocol.decode_read_response(response, function, count)
+        if data is None:
+            return None, exception_code
+
+        if function in (0x03, 0x04):
+            return list(protocol.register_block(count).unpack(data)), None
+        return [int(bit) for bit in decode_bits(data, count)], None
+
+    def dump_space(self, serial_number: int, space: str, ranges: list = ((0, 0x10000),)) -> list:
+        """
+        Find the valid addresses of one register space.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            space (str): The register space ('coil', 'discrete', 'holding' or 'input').
+            ranges (list): The (start, end) address ranges to survey, end excluded.
+
+        Returns:
+            list: The valid ranges in address order, as dictionaries with start, count and values.
+        """
+        function = self.SPACES[space]
+        max_count = self.MAX_COUNT[function]
+        found = []
+
+        for start, end in ranges:
+            for block in range(start, end, max_count):
+                count = min(max_count, end - block)
+                values, code = self.read_block(serial_number, function, block, count)
+                if values is not None:
+                    found.append((block, values))
+                    continue
+                if code == self.ILLEGAL_FUNCTION:
+                    self.logger.info(f"Device {serial_number} does not support {space} reads")
+                    return []
+                if code is None:
+                    self.unanswered.append((function, block, count))
+                    continue
+                found.extend(self.probe(serial_number, function, block, block + count))
+
+        merged = []
+        for address, values in sorted(found):
+            if merged and merged[-1]["start"] + merged[-1]["count"] == address:
+                merged[-1]["values"].extend(values)
+                merged[-1]["count"] += len(values)
+            else:
+                merged.append({"start": address, "count": len(values), "values": list(values)})
+        return merged
+
+    def probe(self, serial_number: int, function: int, start: int, end: int) -> list:
+        """
+        Find the valid runs of a range the device rejected as a whole, by bisection.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            function (int): The read function code.
+            start (int): The first address of the range.
+            end (int): The address past the range.
+
+        Returns:
+            list: Tuples of (start address, values) of the valid blocks, in address order.
+        """
+        if end - start <= self.min_block:
+            return []
+        middle = start + (end - start + 1) // 2
+        runs = []
+        for half_start, half_end in ((start, middle), (middle, end)):
+            values, code = self.read_block(serial_number, function, half_start, half_end - half_start)
+            if values is not None:
+                runs.append((half_start, values))
+            elif code is None:
+                self.unanswered.append((function, half_start, half_end - half_start))
+            else:
+                runs.extend(self.probe(serial_number, function, half_start, half_end))
+        return runs
+
+    def dump(self, serial_number: int, spaces: list = None, ranges: list = ((0, 0x10000),)) -> dict:
+        """
+        Find the valid addresses of several register spaces.
+
+        Args:
+            serial_number (int): The serial number of the device.
+            spaces (list): The register spaces to survey, all of SPACES if None.
+            ranges (list): The (start, end) address ranges to survey in every space, end excluded.
+
+        Returns:
+            dict: The serial number, the valid ranges per space, the (start, count) blocks per
+            space the device did not answer ("unanswered") and the number of requests sent.
+        """
+        self.requests = 0
+        self.unanswered = []
+        result = {"serial_number": serial_number, "spaces": {}, "unanswered": {}}
+        health = self.client.retry_policy.health
+        exempt = serial_number in health.exempt
+        # Timeouts during a survey must not quarantine the device and truncate the dump
+        health.exempt.add(serial_number)
+        try:
+            for space in spaces or self.SPACES:
+                result["spaces"][space] = self.dump_space(serial_number, space, ranges)
+                result["unanswered"][space] = [(start, count) for function, start, count in self.unanswered
+                                               if function == self.SPACES[space]]
+                self.logger.info(f"Surveyed {space} space of {serial_number}: "
+                                 f"{sum(r['count'] for r in result['spaces'][space])} addresses after "
+                                 f"{self.requests} requests")
+                if result["unanswered"][space]:
+                    self.logger.warning(f"{sum(count for _, count in result['unanswered'][space])} {space} addresses "
+                                        f"of {serial_number} went unanswered")
+        finally:
+            if not exempt:
+                health.exempt.discard(serial_number)
+        result["requests"] = self.requests
+        return result
+
+    @classmethod
+    def to_profile(cls, dump: dict, model: str, period: float = 1.0) -> dict:
+        """
+        Turn the register ranges of a dump into a device profile for ProfileDatabase.
+
+        Every holding and input register becomes a uint16 entry named after its space and
+        address; compiling the profile merges them back into block reads.
+
+        Args:
+            dump (dict): A result of dump().
+            model (str): The device model.
+            period (float): The poll interval of the registers (in seconds).
+
+        Returns:
+            dict: The profile.
+        """
+        registers = []
+        for space in ("holding", "input"):
+            for valid_range in dump["spaces"].get(space, []):
+                for address in range(valid_range["start"], valid_range["start"] + valid_range["count"]):
+                    registers.append({"name": f"{space}_{address}", "function": cls.SPACES[space],
+                                      "address": address, "type": "uint16"})
+        return {"model": model, "period": period, "registers": registers}
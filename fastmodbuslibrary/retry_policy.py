@@ -0,0 +1,201 @@
+import logging
+from .device_health import DeviceHealth
+
+
+class RttEstimator:
+    """
+    Smoothed round-trip time estimator for a single device, following the TCP
+    retransmission timer algorithm (RFC 6298).
+
+    The round-trip time measured here is the device turnaround only: the airtime of
+    the request and response frames is accounted for separately by the caller.
+
+    Attributes:
+        ALPHA (float): Gain applied to new samples of the smoothed RTT.
+        BETA (float): Gain applied to new samples of the RTT variation.
+        K (int): Multiplier of the RTT variation in the timeout.
+    """
+
+    ALPHA = 0.125
+    BETA = 0.25
+    K = 4
+
+    def __init__(self, initial_timeout: float, min_timeout: float, max_timeout: float):
+        """
+        Initialize the RttEstimator instance.
+
+        Args:
+            initial_timeout (float): The timeout used before the first sample is taken (in seconds).
+            min_timeout (float): The lower bound for the computed timeout (in seconds).
+            max_timeout (float): The upper bound for the computed timeout (in seconds).
+        """
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.srtt = None
+        self.rttvar = 0.0
+        self.min_rtt = None
+        self.samples = 0
+        self.rto = min(max(initial_timeout, min_timeout), max_timeout)
+        self.base_rto = self.rto
+
+    def add_sample(self, rtt: float):
+        """
+        Update the estimates with a new round-trip time measurement.
+
+        Args:
+            rtt (float): The measured round-trip time (in seconds).
+        """
+        rtt = max(rtt, 0.0)
+        self.samples += 1
+        self.min_rtt = rtt if self.min_rtt is None else min(self.min_rtt, rtt)
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+        self.rto = min(max(self.srtt + self.K * self.rttvar, self.min_timeout), self.max_timeout)
+        self.base_rto = self.rto
+
+    def backoff(self):
+        """
+        Double the timeout after an unanswered request, up to the upper bound.
+        """
+        self.rto = min(self.rto * 2, self.max_timeout)
+
+
+class RetryPolicy:
+    """
+    Per-device timeout and retry policy driven by measured round-trip times.
+
+    Each key (normally a device serial number) gets its own RttEstimator. A request that
+    is not answered in time is retransmitted up to `max_retries` times with a backed-off
+    timeout, while a response with a bad CRC is retransmitted immediately up to
+    `crc_retries` times.
+
+    Backed-off timeouts are capped at `unanswered_factor` times the timeout of the bus as
+    a whole (measured over all devices), so a device that stopped answering, or never did,
+    costs a small multiple of a healthy round trip instead of `max_timeout` on every poll.
+    Every outcome also feeds `health`, which quarantines failing devices: their requests
+    are refused without a transaction except for occasional probes (see DeviceHealth).
+
+    Attributes:
+        stats (dict): Per-key counters of successes, timeouts and CRC errors.
+        health (DeviceHealth): The health scores and quarantine of the devices.
+    """
+
+    def __init__(self, max_retries: int = 0, crc_retries: int = 2, initial_timeout: float = 1.0,
+                 min_timeout: float = 0.01, max_timeout: float = 2.0, unanswered_factor: float = 4.0,
+                 health: DeviceHealth = None):
+        """
+        Initialize the RetryPolicy instance.
+
+        Args:
+            max_retries (int): The number of retransmissions after a timeout.
+            crc_retries (int): The number of immediate retransmissions after a CRC failure.
+            initial_timeout (float): The turnaround timeout for devices without measurements (in seconds).
+            min_timeout (float): The lower bound for the turnaround timeout (in seconds).
+            max_timeout (float): The upper bound for the turnaround timeout (in seconds).
+            unanswered_factor (float): The cap of backed-off timeouts as a multiple of the bus-wide timeout.
+            health (DeviceHealth): The device health tracker, a default one is created if None.
+        """
+        self.max_retries = max_retries
+        self.crc_retries = crc_retries
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.unanswered_factor = unanswered_factor
+        self.bus = RttEstimator(initial_timeout, min_timeout, max_timeout)
+        self.estimators = {}
+        self.stats = {}
+        self.health = health or DeviceHealth()
+        self.logger = logging.getLogger(__name__)
+
+    def estimator(self, key) -> RttEstimator:
+        """
+        Get the RTT estimator for the given key, creating it on first use.
+
+        Args:
+            key: The device key (e.g., serial number).
+
+        Returns:
+            RttEstimator: The estimator for the device.
+        """
+        estimator = self.estimators.get(key)
+        if estimator is None:
+            estimator = RttEstimator(self.initial_timeout, self.min_timeout, self.max_timeout)
+            self.estimators[key] = estimator
+            self.stats[key] = {"success": 0, "timeout": 0, "crc_error": 0}
+        return estimator
+
+    def timeout(self, key, airtime: float = 0.0) -> float:
+        """
+        Compute the response timeout for a transaction with the given device.
+
+        Args:
+            key: The device key (e.g., serial number).
+            airtime (float): The airtime of the request and response frames (in seconds).
+
+        Returns:
+            float: The timeout for the whole transaction (in seconds).
+        """
+        estimator = self.estimator(key)
+        rto = estimator.rto
+        if self.bus.srtt is not None:
+            cap = self.unanswered_factor * self.bus.rto
+            if estimator.srtt is not None:
+                # Allow a device that answered before one backoff step above its own estimate
+                cap = max(cap, 2 * estimator.base_rto)
+            rto = min(rto, max(cap, self.min_timeout))
+        return rto + airtime
+
+    def turnaround(self, key=None) -> dict:
+        """
+        Report the measured device turnaround (request sent to response received, without airtime).
+
+        Args:
+            key: The device key (e.g., serial number), or None for the whole bus.
+
+        Returns:
+            dict: The smoothed ("srtt") and smallest ("min") turnaround in seconds, None before
+            the first response, and the number of responses measured ("samples").
+        """
+        estimator = self.bus if key is None else self.estimator(key)
+        return {"srtt": estimator.srtt, "min": estimator.min_rtt, "samples": estimator.samples}
+
+    def record_success(self, key, rtt: float):
+        """
+        Record a valid response and its round-trip time.
+
+        Args:
+            key: The device key (e.g., serial number).
+            rtt (float): The measured turnaround time (in seconds).
+        """
+        self.estimator(key).add_sample(rtt)
+        self.bus.add_sample(rtt)
+        self.stats[key]["success"] += 1
+        self.health.record(key, "success")
+
+    def record_timeout(self, key):
+        """
+        Record an unanswered request and back off the timeout.
+
+        Args:
+            key: The device key (e.g., serial number).
+        """
+        estimator = self.estimator(key)
+        estimator.backoff()
+        self.stats[key]["timeout"] += 1
+        self.health.record(key, "timeout")
+        self.logger.debug(f"Timeout for {key}, next timeout {estimator.rto:.3f}s")
+
+    def record_crc_error(self, key):
+        """
+        Record a response with an invalid CRC.
+
+        Args:
+            key: The device key (e.g., serial number).
+        """
+        self.estimator(key)
+        self.stats[key]["crc_error"] += 1
+        self.health.record(key, "crc_error")
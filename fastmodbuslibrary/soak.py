@@ -0,0 +1,269 @@
+import gc
+import os
+import time
+import logging
+import statistics
+import tracemalloc
+from array import array
+from .emulator import EmulatedBus, EmulatedDevice
+from .fast_modbus_client import ModbusClient
+from .fast_modbus_events import ModbusEventReader
+from .fast_modbus_scanner import ModbusScanner
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class SoakBus:
+    """
+    The acquisition roles (client, event reader and scanner) sharing an emulated bus.
+
+    Each transaction method performs the unit of work a deployment repeats: a register
+    read from the next device, an event poll after a device changed a register, and a
+    full scan. The bus keeps the last MAX_REQUESTS requests only, so the emulator itself
+    does not grow over a long run.
+
+    Attributes:
+        FIRST_SERIAL_NUMBER (int): The serial number of the first emulated device.
+        EVENT_REGISTER (int): The holding register reporting changes as events.
+        MAX_REQUESTS (int): The number of requests the emulated bus keeps.
+    """
+
+    FIRST_SERIAL_NUMBER = 4265607340
+    EVENT_REGISTER = 5
+    MAX_REQUESTS = 100
+
+    def __init__(self, device_count: int = 8, baudrate: int = 115200, register_count: int = 10):
+        """
+        Initialize the SoakBus instance.
+
+        Args:
+            device_count (int): The number of emulated devices.
+            baudrate (int): The baud rate the roles assume for frame airtime.
+            register_count (int): The number of holding registers read per transaction.
+        """
+        self.devices = [EmulatedDevice(self.FIRST_SERIAL_NUMBER + i, i + 1, "WBMCM8",
+                                       holding=dict.fromkeys(range(register_count), 0),
+                                       events={(0x03, self.EVENT_REGISTER)})
+                        for i in range(device_count)]
+        for device in self.devices:
+            device.configure_events(bytes([0x03, 0, self.EVENT_REGISTER, 1, 1]))
+        self.bus = EmulatedBus(self.devices, max_requests=self.MAX_REQUESTS)
+        self.register_count = register_count
+        self.client = ModbusClient('soak://bus', baudrate)
+        self.event_reader = ModbusEventReader('soak://bus', baudrate)
+        self.scanner = ModbusScanner('soak://bus', baudrate)
+        for role in (self.client, self.event_reader, self.scanner):
+            role.serial_port = self.bus
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the roles.
+        """
+        for role in (self.client, self.event_reader, self.scanner):
+            role.close()
+
+    def read(self):
+        """
+        Read the registers of the next device.
+        """
+        self.count += 1
+        serial_number = self.FIRST_SERIAL_NUMBER + self.count % len(self.devices)
+        if self.client.read_registers(serial_number, 0x03, 0, self.register_count) is None:
+            raise RuntimeError(f"Device {serial_number} did not answer")
+
+    def poll_events(self):
+        """
+        Change the event register of the next device and poll its event.
+        """
+        self.count += 1
+        self.devices[self.count % len(self.devices)].set_value(0x03, self.EVENT_REGISTER, self.count & 0xFFFF)
+        if not self.event_reader.poll_events():
+            raise RuntimeError("No event packet received")
+
+    def scan(self):
+        """
+        Scan the bus.
+        """
+        if len(self.scanner.scan_devices()) != len(self.devices):
+            raise RuntimeError("Scan did not find every device")
+
+    def transactions(self) -> dict:
+        """
+        Get the transaction of every role.
+
+        Returns:
+            dict: The transaction callables by role name ("client", "events" and "scanner").
+        """
+        return {"client": self.read, "events": self.poll_events, "scanner": self.scan}
+
+
+class SoakHarness:
+    """
+    Repeats a transaction and checks its memory growth and latency against budgets.
+
+    Latency and memory are measured in separate runs, since tracing allocations slows
+    every transaction down several times. The latency run times every `sample_interval`-th
+    transaction with time.perf_counter() and reports the median, the 99th percentile, the
+    maximum and the drift: the median of the last `segments`-th of the samples over the
+    median of the first, which exposes a role getting slower as it runs. The memory run
+    compares snapshots of the allocations made by the library code (the emulator and the
+    harness excluded) before and after the run, so the growth per transaction shows a
+    leak regardless of the run length; it also reports the median of the peak
+    allocation of sampled transactions.
+
+    Attributes:
+        DEFAULT_BUDGETS (dict): The budgets of the SoakBus transactions by role name:
+            "bytes_per_transaction" of retained memory, "p99" latency (in seconds) and
+            latency "drift" ratio.
+        stats (dict): The reports of the runs by name.
+    """
+
+    DEFAULT_BUDGETS = {
+        "client": {"bytes_per_transaction": 1.0, "p99": 0.002, "drift": 2.0},
+        "events": {"bytes_per_transaction": 1.0, "p99": 0.002, "drift": 2.0},
+        "scanner": {"bytes_per_transaction": 8.0, "p99": 0.02, "drift": 2.0},
+    }
+
+    def __init__(self, transactions: int = 1000000, memory_transactions: int = None, warmup: int = 1000,
+                 sample_interval: int = 10, segments: int = 4, filters: list = None):
+        """
+        Initialize the SoakHarness instance.
+
+        Args:
+            transactions (int): The number of transactions of the latency run.
+            memory_transactions (int): The number of transactions of the memory run, `transactions` if None.
+            warmup (int): The number of transactions run before measuring, to fill caches and pools.
+            sample_interval (int): Every how many transactions latency and peak allocation are sampled.
+            segments (int): The number of segments the latency samples are split into for the drift.
+            filters (list): The tracemalloc filters selecting the allocations counted, the
+                library code without the emulator and the harness if None.
+        """
+        self.transactions = transactions
+        self.memory_transactions = memory_transactions or transactions
+        self.warmup = warmup
+        self.sample_interval = sample_interval
+        self.segments = segments
+        self.filters = filters or [
+            tracemalloc.Filter(True, os.path.join(PACKAGE_DIR, "*")),
+            tracemalloc.Filter(False, os.path.join(PACKAGE_DIR, "emulator.py")),
+            tracemalloc.Filter(False, os.path.join(PACKAGE_DIR, "soak.py")),
+        ]
+        self.stats = {}
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def percentile(ordered: list, fraction: float) -> float:
+        """
+        Get a percentile of sorted samples (nearest rank).
+
+        Args:
+            ordered (list): The samples, ascending.
+            fraction (float): The percentile as a fraction (e.g., 0.99).
+
+        Returns:
+            float: The sample at the percentile.
+        """
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    def measure_latency(self, transaction) -> dict:
+        """
+        Run a transaction `transactions` times and sample its latency.
+
+        Args:
+            transaction (callable): The transaction.
+
+        Returns:
+            dict: The "p50", "p99" and "max" latency (in seconds) and the "drift" ratio.
+        """
+        for _ in range(self.warmup):
+            transaction()
+        samples = array('d')
+        clock = time.perf_counter
+        for index in range(self.transactions):
+            if index % self.sample_interval:
+                transaction()
+            else:
+                start = clock()
+                transaction()
+                samples.append(clock() - start)
+
+        segment = max(len(samples) // self.segments, 1)
+        first = statistics.median(samples[:segment])
+        last = statistics.median(samples[-segment:])
+        ordered = sorted(samples)
+        return {"p50": self.percentile(ordered, 0.5), "p99": self.percentile(ordered, 0.99),
+                "max": ordered[-1], "drift": last / first if first > 0 else 1.0}
+
+    def measure_memory(self, transaction) -> dict:
+        """
+        Run a transaction `memory_transactions` times with allocations traced.
+
+        Args:
+            transaction (callable): The transaction.
+
+        Returns:
+            dict: The "bytes_per_transaction" retained by the library code, the "retained"
+            bytes in total with the "top" allocation sites, and the median "peak_bytes"
+            allocated during a transaction.
+        """
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        try:
+            # Objects kept in steady state (e.g., replaced estimates) are traced before the first snapshot
+            for _ in range(self.warmup):
+                transaction()
+            gc.collect()
+            before = tracemalloc.take_snapshot().filter_traces(self.filters)
+            peaks = array('l')
+            for index in range(self.memory_transactions):
+                if index % self.sample_interval:
+                    transaction()
+                else:
+                    current = tracemalloc.get_traced_memory()[0]
+                    tracemalloc.reset_peak()
+                    transaction()
+                    peaks.append(tracemalloc.get_traced_memory()[1] - current)
+            gc.collect()
+            after = tracemalloc.take_snapshot().filter_traces(self.filters)
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+
+        differences = after.compare_to(before, 'lineno')
+        retained = sum(difference.size_diff for difference in differences)
+        top = [str(difference) for difference in differences[:5] if difference.size_diff > 0]
+        return {"bytes_per_transaction": retained / self.memory_transactions, "retained": retained, "top": top,
+                "peak_bytes": statistics.median(peaks)}
+
+    def run(self, name: str, transaction, budgets: dict = None) -> dict:
+        """
+        Measure a transaction and check it against its budgets.
+
+        Args:
+            name (str): The name of the run (e.g., the role).
+            transaction (callable): The transaction.
+            budgets (dict): The upper bounds by report key (e.g., "p99"), DEFAULT_BUDGETS[name] if None.
+
+        Returns:
+            dict: The latency and memory report with the "violations" of the budgets, as messages.
+        """
+        if budgets is None:
+            budgets = self.DEFAULT_BUDGETS.get(name, {})
+        report = self.measure_latency(transaction)
+        report.update(self.measure_memory(transaction))
+        report["violations"] = [f"{name}: {key} {report[key]:.6g} exceeds the budget of {limit:.6g}"
+                                for key, limit in budgets.items() if report[key] > limit]
+        for violation in report["violations"]:
+            self.logger.error(violation)
+        if report["violations"] and report["top"]:
+            self.logger.error(f"{name}: largest allocation growth:\n" + "\n".join(report["top"]))
+        self.stats[name] = report
+        return report
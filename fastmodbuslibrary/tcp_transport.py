@@ -0,0 +1,205 @@
+import select
+import socket
+import logging
+from urllib.parse import urlsplit
+from .transport import SerialTransport
+
+
+class TcpPort:
+    """
+    A TCP connection to a serial device server carrying raw RTU frames.
+
+    It implements the subset of the pyserial interface used by SerialTransport. The
+    socket is non-blocking with TCP_NODELAY set, so a request leaves in a single segment
+    as soon as it is written; received data lands in a preallocated buffer.
+    """
+
+    def __init__(self, host: str, port: int, baudrate: int, connect_timeout: float):
+        """
+        Connect to the serial device server.
+
+        Args:
+            host (str): The host name or address of the server.
+            port (int): The TCP port of the serial channel.
+            baudrate (int): The baud rate of the remote bus (configured on the server).
+            connect_timeout (float): The connection timeout (in seconds).
+
+        Raises:
+            OSError: If the connection fails.
+        """
+        self.socket = socket.create_connection((host, port), timeout=connect_timeout)
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.socket.setblocking(False)
+        self.baudrate = baudrate
+        self.buffer = bytearray(256)
+        self.view = memoryview(self.buffer)
+
+    def fileno(self) -> int:
+        """
+        Get the file descriptor of the socket.
+
+        Returns:
+            int: The file descriptor.
+        """
+        return self.socket.fileno()
+
+    def write(self, data: bytes) -> int:
+        """
+        Send data to the server.
+
+        Args:
+            data (bytes): The data to send.
+
+        Returns:
+            int: The number of bytes sent.
+        """
+        view = memoryview(data)
+        sent = 0
+        while sent < len(view):
+            try:
+                sent += self.socket.send(view[sent:])
+            except BlockingIOError:
+                select.select([], [self.socket], [])
+        return sent
+
+    def read(self, size: int = 1) -> bytes:
+        """
+        Read up to size bytes without blocking.
+
+        Args:
+            size (int): The maximum number of bytes to read.
+
+        Returns:
+            bytes: The data read.
+
+        Raises:
+            ConnectionResetError: If the server closed the connection.
+        """
+        if size > len(self.buffer):
+            self.buffer = bytearray(size)
+            self.view = memoryview(self.buffer)
+        try:
+            count = self.socket.recv_into(self.view, size)
+        except BlockingIOError:
+            return b''
+        if count == 0:
+            raise ConnectionResetError("Connection closed by the serial device server")
+        return bytes(self.view[:count])
+
+    def readinto(self, buffer: memoryview) -> int:
+        """
+        Read available data into a buffer without blocking.
+
+        Args:
+            buffer (memoryview): The buffer to fill.
+
+        Returns:
+            int: The number of bytes read.
+
+        Raises:
+            ConnectionResetError: If the server closed the connection.
+        """
+        try:
+            count = self.socket.recv_into(buffer)
+        except BlockingIOError:
+            return 0
+        if count == 0:
+            raise ConnectionResetError("Connection closed by the serial device server")
+        return count
+
+    @property
+    def in_waiting(self) -> int:
+        """
+        int: The number of received bytes ready to be read (up to the buffer size).
+        """
+        try:
+            return len(self.socket.recv(len(self.buffer), socket.MSG_PEEK))
+        except BlockingIOError:
+            return 0
+
+    def reset_input_buffer(self):
+        """
+        Discard received data.
+        """
+        try:
+            while self.socket.recv_into(self.view):
+                pass
+        except BlockingIOError:
+            pass
+
+    def flush(self):
+        """
+        Do nothing, data is handed to the network as soon as it is written.
+        """
+
+    def set_low_latency_mode(self, enabled: bool):
+        """
+        Refuse to change driver settings, the bus sits behind the server.
+
+        Raises:
+            NotImplementedError: Always.
+        """
+        raise NotImplementedError("Driver settings of a remote bus are configured on the serial device server")
+
+    def close(self):
+        """
+        Close the connection.
+        """
+        self.view.release()
+        self.socket.close()
+
+
+class TcpTransport(SerialTransport):
+    """
+    A shared transport reaching a bus through a serial device server in transparent
+    (raw TCP) mode, selected with a tcp://host:port device path.
+
+    The fast Modbus extended frames are carried unchanged (RTU over TCP): servers that
+    translate Modbus TCP to RTU cannot pass the 0xFD extended frames. Every role using the
+    same server channel shares one pooled connection through the transport registry,
+    since most servers accept a single client per channel, and a dropped connection is
+    reestablished like a replugged serial adapter. Roles on different channels can run in
+    separate threads; waits block in select() without holding the GIL.
+
+    The baud rate is configured on the server and is only used here to budget frame
+    airtime; network latency is learned by the retry policy as part of the turnaround.
+
+    Attributes:
+        CONNECT_TIMEOUT (float): The timeout for establishing the connection (in seconds).
+    """
+
+    SCHEME = "tcp://"
+    CONNECT_TIMEOUT = 3.0
+
+    def __init__(self, device: str, baudrate: int, registry=None):
+        """
+        Initialize the TcpTransport instance.
+
+        Args:
+            device (str): The server channel as tcp://host:port.
+            baudrate (int): The baud rate of the remote bus.
+            registry (TransportRegistry): The registry to notify when the last user closes the transport.
+
+        Raises:
+            ValueError: If the device path has no host or port.
+        """
+        super().__init__(device, baudrate, registry)
+        address = urlsplit(device)
+        if not address.hostname or address.port is None:
+            raise ValueError(f"Expected tcp://host:port, got {device}")
+        self.host = address.hostname
+        self.tcp_port = address.port
+        self.low_latency = True
+        self.logger = logging.getLogger(__name__)
+
+    def open_port(self) -> TcpPort:
+        """
+        Connect to the serial device server.
+
+        Returns:
+            TcpPort: The connection.
+
+        Raises:
+            OSError: If the connection fails.
+        """
+        return TcpPort(self.host, self.tcp_port, self.baudrate, self.CONNECT_TIMEOUT)
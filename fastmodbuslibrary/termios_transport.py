@@ -0,0 +1,244 @@
+import os
+import array
+import fcntl
+import select
+import termios
+import logging
+from .transport import SerialTransport
+
+
+class TermiosPort:
+    """
+    A raw tty configured with termios and driven with plain os calls.
+
+    It implements the subset of the pyserial interface used by SerialTransport with one
+    system call per operation: writes go straight to os.write, reads land in a
+    preallocated buffer through os.readv, and the receive count is fetched with an ioctl
+    into a preallocated array.
+
+    The tty is non-blocking with VMIN and VTIME set to 0. VTIME counts in tenths of a
+    second, longer than a whole frame at bus speeds, so frames are delimited by length
+    and CRC and waits block in select() instead.
+
+    Attributes:
+        ASYNC_LOW_LATENCY (int): The serial_struct flag asking the driver to deliver received bytes immediately.
+    """
+
+    ASYNC_LOW_LATENCY = 0x2000
+
+    def __init__(self, path: str, baudrate: int, buffer_size: int = 256):
+        """
+        Open and configure the tty.
+
+        Args:
+            path (str): The tty device path (e.g., /dev/ttyUSB0).
+            baudrate (int): The baud rate.
+            buffer_size (int): The initial size of the receive buffer in bytes.
+
+        Raises:
+            OSError: If the tty cannot be opened or configured.
+            ValueError: If the baud rate has no termios constant.
+        """
+        self.path = path
+        self.fd = os.open(path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        try:
+            self.configure(baudrate)
+        except (OSError, ValueError):
+            os.close(self.fd)
+            raise
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        self.count = array.array('i', [0])
+
+    def configure(self, baudrate: int):
+        """
+        Put the tty in raw 8N1 mode at the given baud rate.
+
+        Args:
+            baudrate (int): The baud rate.
+
+        Raises:
+            ValueError: If the baud rate has no termios constant.
+        """
+        speed = getattr(termios, f"B{baudrate}", None)
+        if speed is None:
+            raise ValueError(f"Unsupported baud rate: {baudrate}")
+        _, _, _, _, _, _, cc = termios.tcgetattr(self.fd)
+        cc[termios.VMIN] = 0
+        cc[termios.VTIME] = 0
+        cflag = termios.CS8 | termios.CREAD | termios.CLOCAL
+        termios.tcsetattr(self.fd, termios.TCSANOW, [0, 0, cflag, 0, speed, speed, cc])
+        self.baudrate_value = baudrate
+
+    @property
+    def baudrate(self) -> int:
+        """
+        int: The current baud rate; setting it reconfigures the tty.
+        """
+        return self.baudrate_value
+
+    @baudrate.setter
+    def baudrate(self, baudrate: int):
+        self.configure(baudrate)
+
+    def fileno(self) -> int:
+        """
+        Get the file descriptor of the tty.
+
+        Returns:
+            int: The file descriptor.
+        """
+        return self.fd
+
+    def write(self, data: bytes) -> int:
+        """
+        Write data to the tty.
+
+        Args:
+            data (bytes): The data to write.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        view = memoryview(data)
+        written = 0
+        while written < len(view):
+            try:
+                written += os.write(self.fd, view[written:])
+            except BlockingIOError:
+                select.select([], [self.fd], [])
+        return written
+
+    def read(self, size: int = 1) -> bytes:
+        """
+        Read up to size bytes without blocking.
+
+        Args:
+            size (int): The maximum number of bytes to read.
+
+        Returns:
+            bytes: The data read.
+        """
+        if size > len(self.buffer):
+            self.buffer = bytearray(size)
+            self.view = memoryview(self.buffer)
+        try:
+            count = os.readv(self.fd, [self.view[:size]])
+        except BlockingIOError:
+            return b''
+        return bytes(self.view[:count])
+
+    def readinto(self, buffer: memoryview) -> int:
+        """
+        Read available data into a buffer without blocking.
+
+        Args:
+            buffer (memoryview): The buffer to fill.
+
+        Returns:
+            int: The number of bytes read.
+        """
+        try:
+            return os.readv(self.fd, [buffer])
+        except BlockingIOError:
+            return 0
+
+    @property
+    def in_waiting(self) -> int:
+        """
+        int: The number of bytes in the receive buffer.
+        """
+        fcntl.ioctl(self.fd, termios.FIONREAD, self.count, True)
+        return self.count[0]
+
+    def reset_input_buffer(self):
+        """
+        Discard the contents of the receive buffer.
+        """
+        termios.tcflush(self.fd, termios.TCIFLUSH)
+
+    def flush(self):
+        """
+        Wait until all written data has been transmitted.
+        """
+        termios.tcdrain(self.fd)
+
+    def set_low_latency_mode(self, enabled: bool):
+        """
+        Set or clear the driver's low-latency flag.
+
+        Args:
+            enabled (bool): True to set the flag.
+
+        Raises:
+            ValueError: If the driver does not support the flag.
+        """
+        serial_struct = array.array('i', [0] * 32)
+        try:
+            fcntl.ioctl(self.fd, termios.TIOCGSERIAL, serial_struct)
+            if enabled:
+                serial_struct[4] |= self.ASYNC_LOW_LATENCY
+            else:
+                serial_struct[4] &= ~self.ASYNC_LOW_LATENCY
+            fcntl.ioctl(self.fd, termios.TIOCSSERIAL, serial_struct)
+        except OSError as e:
+            raise ValueError(f"Failed to update the low-latency flag: {e}") from e
+
+    @property
+    def rs485_mode(self):
+        """
+        None: Kernel RS-485 settings are not supported; only None can be assigned.
+        """
+        return None
+
+    @rs485_mode.setter
+    def rs485_mode(self, settings):
+        if settings is not None:
+            raise NotImplementedError("Kernel RS-485 settings are not supported by TermiosPort")
+
+    def close(self):
+        """
+        Close the tty.
+        """
+        self.view.release()
+        os.close(self.fd)
+
+
+class TermiosTransport(SerialTransport):
+    """
+    A shared transport driving the tty directly with termios instead of pyserial.
+
+    It is selected with a `termios://` device path (e.g., termios:///dev/ttyUSB0) and
+    otherwise behaves like SerialTransport, including reconnects. The low-latency
+    profile is on by default, so responses are awaited with select().
+    """
+
+    SCHEME = "termios://"
+
+    def __init__(self, device: str, baudrate: int, registry=None):
+        """
+        Initialize the TermiosTransport instance.
+
+        Args:
+            device (str): The device path with the termios:// prefix (e.g., termios:///dev/ttyUSB0).
+            baudrate (int): The baud rate for the serial connection.
+            registry (TransportRegistry): The registry to notify when the last user closes the transport.
+        """
+        super().__init__(device, baudrate, registry)
+        self.path = device[len(self.SCHEME):] if device.startswith(self.SCHEME) else device
+        self.low_latency = True
+
+    def open_port(self) -> TermiosPort:
+        """
+        Open and configure the tty.
+
+        Returns:
+            TermiosPort: The opened tty.
+
+        Raises:
+            OSError: If the tty cannot be opened.
+        """
+        port = TermiosPort(self.path, self.baudrate)
+        if self.low_latency or self.rs485 is not None:
+            self.apply_tuning(port)
+        return port
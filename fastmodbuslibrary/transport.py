@@ -0,0 +1,388 @@
+import serial
+import serial.rs485
+import select
+import threading
+import time
+import weakref
+import logging
+from .device_health import DeviceHealth
+
+
+class SerialTransport:
+    """
+    A serial port shared by every role working on the same device.
+
+    The port is opened lazily on first use. If an operation fails because the port
+    went away (e.g., a USB-serial adapter was replugged), the port is reopened and the
+    operation is repeated, so callers waiting on the transport lock do not lose work.
+    Roles hold `lock` for a whole request/response transaction, and roles with a default
+    retry policy share `health`, so a device quarantined by one role is refused by all.
+
+    The low-latency profile (see set_low_latency) trades CPU time for turnaround: the
+    driver is asked to deliver received bytes immediately (on FTDI adapters this drops
+    the 16 ms latency timer to 1 ms), writes are drained to the wire before the caller
+    starts listening, and waits for a response block on the port instead of polling.
+
+    Attributes:
+        RECONNECT_ATTEMPTS (int): The number of attempts to reopen a failed port.
+        RECONNECT_DELAY (float): The delay between reconnect attempts (in seconds).
+    """
+
+    RECONNECT_ATTEMPTS = 3
+    RECONNECT_DELAY = 0.5
+
+    def __init__(self, device: str, baudrate: int, registry=None):
+        """
+        Initialize the SerialTransport instance.
+
+        Args:
+            device (str): The serial device path (e.g., /dev/ttyUSB0).
+            baudrate (int): The baud rate for the serial connection.
+            registry (TransportRegistry): The registry to notify when the last user closes the transport.
+        """
+        self.device = device
+        self.baudrate = baudrate
+        self.registry = registry
+        self.refcount = 0
+        self.port = None
+        self.low_latency = False
+        self.rs485 = None
+        self.lock = threading.RLock()
+        self.health = DeviceHealth()
+        self.holders = weakref.WeakSet()
+        self.logger = logging.getLogger(__name__)
+
+    def open_port(self):
+        """
+        Open the underlying serial port.
+
+        Returns:
+            serial.Serial: The opened serial port.
+
+        Raises:
+            serial.SerialException: If the port cannot be opened.
+        """
+        port = serial.Serial(
+            port=self.device,
+            baudrate=self.baudrate,
+            bytesize=serial.EIGHTBITS,
+            parity=serial.PARITY_NONE,
+            stopbits=serial.STOPBITS_ONE,
+            timeout=0
+        )
+        if self.low_latency or self.rs485 is not None:
+            self.apply_tuning(port)
+        return port
+
+    def apply_tuning(self, port) -> dict:
+        """
+        Apply the low-latency and RS-485 driver settings to an open port.
+
+        Settings the driver does not support are logged and skipped.
+
+        Args:
+            port (serial.Serial): The open serial port.
+
+        Returns:
+            dict: Whether the low-latency flag ("low_latency") and the RS-485 settings ("rs485") were applied.
+        """
+        applied = {"low_latency": False, "rs485": False}
+        if self.low_latency:
+            try:
+                port.set_low_latency_mode(True)
+                applied["low_latency"] = True
+            except (NotImplementedError, ValueError, OSError) as e:
+                self.logger.warning(f"Low-latency mode is not supported on {self.device}: {e}")
+        if self.rs485 is not None:
+            try:
+                port.rs485_mode = self.rs485
+                applied["rs485"] = True
+            except (NotImplementedError, ValueError, OSError) as e:
+                port.rs485_mode = None
+                self.logger.warning(f"Kernel RS-485 mode is not supported on {self.device}: {e}")
+        return applied
+
+    def set_low_latency(self, enabled: bool = True, rs485: serial.rs485.RS485Settings = None) -> dict:
+        """
+        Switch the low-latency profile on or off, applying it to the open port and on every reopen.
+
+        Args:
+            enabled (bool): True to enable the low-latency profile.
+            rs485 (serial.rs485.RS485Settings): Kernel RS-485 settings (RTS levels and delays before
+                and after transmitting, in seconds), or None to leave the driver's RS-485 mode alone.
+
+        Returns:
+            dict: Whether the low-latency flag ("low_latency") and the RS-485 settings ("rs485") were
+            applied, both False if the port is not open yet.
+        """
+        with self.lock:
+            self.low_latency = enabled
+            self.rs485 = rs485
+            if self.port is None:
+                return {"low_latency": False, "rs485": False}
+            applied = self.apply_tuning(self.port)
+            if not enabled:
+                try:
+                    self.port.set_low_latency_mode(False)
+                except (NotImplementedError, ValueError, OSError):
+                    pass
+            return applied
+
+    def ensure_open(self):
+        """
+        Open the port if it is not open yet.
+
+        Returns:
+            serial.Serial: The opened serial port.
+        """
+        with self.lock:
+            if self.port is None:
+                self.port = self.open_port()
+                self.logger.debug(f"Opened {self.device} at {self.baudrate} baud")
+            return self.port
+
+    def drop_port(self):
+        """
+        Close the underlying port, ignoring errors from a port that is already gone.
+        """
+        with self.lock:
+            if self.port is not None:
+                try:
+                    self.port.close()
+                except (serial.SerialException, OSError):
+                    pass
+                self.port = None
+
+    def call(self, operation):
+        """
+        Run an operation on the port, reconnecting if the port fails.
+
+        Args:
+            operation (callable): A function taking the open port.
+
+        Returns:
+            The result of the operation.
+
+        Raises:
+            serial.SerialException: If the port cannot be reopened.
+        """
+        with self.lock:
+            for attempt in range(self.RECONNECT_ATTEMPTS + 1):
+                try:
+                    return operation(self.ensure_open())
+                except (serial.SerialException, OSError) as e:
+                    self.drop_port()
+                    if attempt == self.RECONNECT_ATTEMPTS:
+                        self.logger.error(f"Error on serial port {self.device}: {e}")
+                        raise serial.SerialException(str(e)) from e
+                    self.logger.warning(f"Serial port {self.device} failed ({e}), reconnecting...")
+                    if attempt > 0:
+                        time.sleep(self.RECONNECT_DELAY)
+
+    def write(self, data: bytes) -> int:
+        """
+        Write data to the port.
+
+        In low-latency mode the call returns once the data has left the transmitter.
+
+        Args:
+            data (bytes): The data to write.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        if self.low_latency:
+            def write_and_drain(port):
+                written = port.write(data)
+                port.flush()
+                return written
+            return self.call(write_and_drain)
+        return self.call(lambda port: port.write(data))
+
+    def wait_readable(self, timeout: float) -> bool:
+        """
+        Block until received data is available or the timeout passes.
+
+        Args:
+            timeout (float): The maximum time to wait (in seconds).
+
+        Returns:
+            bool: True if data is available.
+        """
+        def wait(port):
+            if port.in_waiting:
+                return True
+            readable, _, _ = select.select([port.fileno()], [], [], max(timeout, 0))
+            return bool(readable)
+        return self.call(wait)
+
+    def read(self, size: int = 1) -> bytes:
+        """
+        Read up to size bytes from the port without blocking.
+
+        Args:
+            size (int): The maximum number of bytes to read.
+
+        Returns:
+            bytes: The data read.
+        """
+        return self.call(lambda port: port.read(size))
+
+    def readinto(self, buffer: memoryview) -> int:
+        """
+        Read available data into a buffer without blocking.
+
+        Args:
+            buffer (memoryview): The buffer to fill.
+
+        Returns:
+            int: The number of bytes read.
+        """
+        return self.call(lambda port: port.readinto(buffer))
+
+    @property
+    def in_waiting(self) -> int:
+        """
+        int: The number of bytes in the receive buffer.
+        """
+        return self.call(lambda port: port.in_waiting)
+
+    def reset_input_buffer(self):
+        """
+        Discard the contents of the receive buffer.
+        """
+        self.call(lambda port: port.reset_input_buffer())
+
+    def flush(self):
+        """
+        Wait until all written data has been transmitted.
+        """
+        self.call(lambda port: port.flush())
+
+    def set_baudrate(self, baudrate: int):
+        """
+        Change the baud rate, reconfiguring the port if it is open.
+
+        The roles holding the transport take over the new rate, so their airtime budgets
+        and timeouts follow it.
+
+        Args:
+            baudrate (int): The new baud rate.
+        """
+        with self.lock:
+            self.baudrate = baudrate
+            for holder in list(self.holders):
+                holder.baudrate = baudrate
+            if self.port is not None:
+                self.call(lambda port: setattr(port, 'baudrate', baudrate))
+
+    @property
+    def is_open(self) -> bool:
+        """
+        bool: True if the underlying port is currently open.
+        """
+        return self.port is not None
+
+    def close(self):
+        """
+        Release one reference to the transport, closing the port when it was the last one.
+        """
+        if self.registry is not None:
+            self.registry.release(self)
+        else:
+            self.drop_port()
+
+
+class TransportRegistry:
+    """
+    A registry handing out one shared, reference-counted transport per device path.
+
+    Plain paths get a pyserial based SerialTransport; paths prefixed with termios://
+    get a TermiosTransport driving the tty directly, and tcp://host:port paths get a
+    TcpTransport connected to a serial device server. Sharing the transport pools one
+    connection per server channel.
+    """
+
+    def __init__(self):
+        """
+        Initialize the TransportRegistry instance.
+        """
+        self.transports = {}
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def create(self, device: str, baudrate: int) -> SerialTransport:
+        """
+        Create the transport matching a device path.
+
+        Args:
+            device (str): The device path, optionally with a termios:// prefix, or tcp://host:port.
+            baudrate (int): The baud rate for the serial connection.
+
+        Returns:
+            SerialTransport: The new transport.
+        """
+        if device.startswith("termios://"):
+            from .termios_transport import TermiosTransport
+            return TermiosTransport(device, baudrate, self)
+        if device.startswith("tcp://"):
+            from .tcp_transport import TcpTransport
+            return TcpTransport(device, baudrate, self)
+        return SerialTransport(device, baudrate, self)
+
+    def acquire(self, device: str, baudrate: int) -> SerialTransport:
+        """
+        Get the transport for a device, creating it if needed, and take a reference to it.
+
+        Args:
+            device (str): The serial device path (e.g., /dev/ttyUSB0).
+            baudrate (int): The baud rate for the serial connection.
+
+        A bus has a single baud rate, so a device already in use can only be acquired at
+        its current rate; SerialTransport.set_baudrate changes the rate for every holder.
+
+        Returns:
+            SerialTransport: The shared transport.
+
+        Raises:
+            ValueError: If the device is in use at a different baud rate.
+        """
+        with self.lock:
+            transport = self.transports.get(device)
+            if transport is None:
+                transport = self.create(device, baudrate)
+                self.transports[device] = transport
+            elif transport.baudrate != baudrate:
+                raise ValueError(f"Device {device} is in use at {transport.baudrate} baud, not {baudrate}")
+            transport.refcount += 1
+            return transport
+
+    def release(self, transport: SerialTransport):
+        """
+        Drop a reference to a transport, closing and forgetting it when no references are left.
+
+        Args:
+            transport (SerialTransport): The transport to release.
+        """
+        with self.lock:
+            if transport.refcount <= 0:
+                return
+            transport.refcount -= 1
+            if transport.refcount == 0:
+                transport.drop_port()
+                if self.transports.get(transport.device) is transport:
+                    del self.transports[transport.device]
+                self.logger.debug(f"Closed {transport.device}")
+
+    def clear(self):
+        """
+        Close and forget all transports regardless of their references (e.g., between tests).
+        """
+        with self.lock:
+            for transport in self.transports.values():
+                transport.refcount = 0
+                transport.drop_port()
+            self.transports.clear()
+
+
+registry = TransportRegistry()
@@ -2,11 +2,14 @@ from setuptools import setup, find_packages
 
 setup(
     name='fastmodbuslibrary',
-    version='0.1.4',
+    version='0.1.5',
     packages=find_packages(),
     install_requires=[
         'pyserial',
     ],
+    extras_require={
+        'numpy': ['numpy'],
+    },
     entry_points={
         'console_scripts': [
             'modbus_scan = fastmodbuslibrary.fast_modbus_scanner:main',
@@ -0,0 +1,87 @@
+from unittest import mock
+import unittest
+from fastmodbuslibrary.baudrate_session import BaudrateSession
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.retry_policy import RetryPolicy
+
+class TestBaudrateSession(unittest.TestCase):
+    """
+    Test suite for raising the bus baud rate for a job and restoring it, using an emulated bus.
+    """
+
+    def setUp(self):
+        # Mock serial.Serial to avoid needing real port
+        self.patcher = mock.patch('serial.Serial')
+        self.mock_serial = self.patcher.start()
+        self.devices = [EmulatedDevice(4265607340 + i, 10 + i, "WBMCM8", holding={0: i}, baudrate=9600) for i in range(3)]
+        self.bus = EmulatedBus(self.devices, baudrate=9600)
+        self.client = ModbusClient('/dev/ttyACM0', 9600, retry_policy=RetryPolicy(max_retries=1, initial_timeout=0.02))
+        self.client.serial_port = self.bus
+        self.serial_numbers = [device.serial_number for device in self.devices]
+
+    def tearDown(self):
+        self.client.close()
+        self.patcher.stop()
+
+    def test_session_switches_and_restores(self):
+        """
+        Test that the devices, the port and the roles run at the higher rate inside the session only.
+        """
+        reader = mock.Mock(serial_port=self.bus, baudrate=9600)
+        with BaudrateSession(self.client, self.serial_numbers, 115200, roles=[reader], settle=0) as session:
+            self.assertEqual([device.baudrate for device in self.devices], [115200] * 3)
+            self.assertEqual((self.bus.baudrate, self.client.baudrate, reader.baudrate), (115200, 115200, 115200))
+            self.assertEqual(self.client.read_registers(4265607342, 0x03, 0, 1), b'\x00\x02')
+            session.check()
+        self.assertEqual([device.baudrate for device in self.devices], [9600] * 3)
+        self.assertEqual((self.bus.baudrate, self.client.baudrate, reader.baudrate), (9600, 9600, 9600))
+        self.assertEqual(session.stats["stranded"], [])
+
+    def test_restores_after_exception(self):
+        """
+        Test that an exception in the job still restores the original rate.
+        """
+        with self.assertRaises(RuntimeError):
+            with BaudrateSession(self.client, self.serial_numbers, 57600, settle=0):
+                raise RuntimeError("job failed")
+        self.assertEqual([device.baudrate for device in self.devices], [9600] * 3)
+        self.assertEqual(self.bus.baudrate, 9600)
+
+    def test_device_refusing_rate_rolls_back(self):
+        """
+        Test that a device staying at the old rate rolls the whole bus back before the job starts.
+        """
+        self.devices[1].apply_settings = lambda: None
+        with self.assertRaises(ConnectionError):
+            BaudrateSession(self.client, self.serial_numbers, 115200, settle=0).start()
+        self.assertEqual([device.baudrate for device in self.devices], [9600] * 3)
+        self.assertEqual(self.bus.baudrate, 9600)
+        self.assertEqual([self.client.read_registers(sn, 0x03, 0, 1) for sn in self.serial_numbers],
+                         [b'\x00\x00', b'\x00\x01', b'\x00\x02'])
+
+    def test_lost_device_during_job(self):
+        """
+        Test that a device lost during the job aborts it, and that a device left elsewhere is reported.
+        """
+        session = BaudrateSession(self.client, self.serial_numbers, 115200, settle=0)
+        with self.assertRaises(ConnectionError):
+            with session:
+                self.devices[2].baudrate = 19200
+                session.check()
+        self.assertEqual(session.stats["stranded"], [4265607342])
+        self.assertEqual([device.baudrate for device in self.devices[:2]], [9600] * 2)
+        self.assertEqual(self.bus.baudrate, 9600)
+
+    def test_device_not_at_original_rate(self):
+        """
+        Test that a device missing at the original rate prevents the switch.
+        """
+        with self.assertRaises(ConnectionError):
+            BaudrateSession(self.client, self.serial_numbers + [11111111], 115200, settle=0).start()
+        self.assertEqual([device.baudrate for device in self.devices], [9600] * 3)
+        with self.assertRaises(ValueError):
+            BaudrateSession(self.client, self.serial_numbers, 100000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+from unittest import mock
+import statistics
+import struct
+import threading
+import tracemalloc
+import unittest
+from fastmodbuslibrary import protocol
+from fastmodbuslibrary.buffer_pool import BufferPool
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+
+class ReplayPort:
+    """
+    A transport answering every request with the same prepared frame, without allocating.
+    """
+
+    def __init__(self, response: bytes):
+        self.lock = threading.RLock()
+        self.response = response
+        self.pending = 0
+
+    def write(self, data: bytes) -> int:
+        self.pending = len(self.response)
+        return len(data)
+
+    @property
+    def in_waiting(self) -> int:
+        return self.pending
+
+    def readinto(self, buffer: memoryview) -> int:
+        count = self.pending
+        buffer[:count] = self.response
+        self.pending = 0
+        return count
+
+    def reset_input_buffer(self):
+        self.pending = 0
+
+class TestBufferPool(unittest.TestCase):
+    """
+    Test suite for pooled, zero-copy response buffers.
+    """
+
+    def setUp(self):
+        # Mock serial.Serial to avoid needing real port
+        self.patcher = mock.patch('serial.Serial')
+        self.mock_serial = self.patcher.start()
+        frame = b'\xFF\xFD\x46\x09' + struct.pack('>I', 4265607340) + b'\x03\x14' + bytes(range(20))
+        frame += protocol.CRC.pack(protocol.crc16(frame[1:]))
+        self.client = ModbusClient('/dev/ttyACM0', 115200)
+        self.client.serial_port = ReplayPort(frame)
+
+    def tearDown(self):
+        self.client.close()
+        self.patcher.stop()
+
+    def test_response_lifetime(self):
+        """
+        Test that a pooled response aliases the receive buffer until it is released.
+        """
+        pool = self.client.buffer_pool
+        free = len(pool.free)
+        response = self.client.read_registers_view(4265607340, 0x03, 0, 10)
+        self.assertEqual(len(pool.free), free - 1)
+        self.assertEqual(response.data, bytes(range(20)))
+        self.assertEqual(response.tobytes(), bytes(range(20)))
+
+        response.release()
+        self.assertEqual(len(pool.free), free)
+        with self.assertRaises(ValueError):
+            response.data[0]
+        response.release()
+        self.assertEqual(len(pool.free), free)
+
+        self.assertEqual(self.client.read_registers(4265607340, 0x03, 0, 10), bytes(range(20)))
+        self.assertEqual(len(pool.free), free)
+
+    def test_pool_grows_when_exhausted(self):
+        """
+        Test that the pool hands out new buffers when all are in use and keeps them afterwards.
+        """
+        pool = BufferPool(buffer_size=64, count=1)
+        buffers = [pool.acquire(), pool.acquire()]
+        self.assertEqual(pool.allocated, 2)
+        for buffer in buffers:
+            pool.release(buffer)
+        self.assertEqual(len(pool.free), 2)
+
+    def test_allocation_budget(self):
+        """
+        Test that polling keeps no memory and allocates only small temporaries per transaction.
+        """
+        for _ in range(100):
+            self.client.read_registers_view(4265607340, 0x03, 0, 10).release()
+
+        tracemalloc.start()
+        try:
+            peaks = []
+            for _ in range(200):
+                current = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                self.client.read_registers_view(4265607340, 0x03, 0, 10).release()
+                peaks.append(tracemalloc.get_traced_memory()[1] - current)
+
+            before = tracemalloc.take_snapshot()
+            for _ in range(1000):
+                self.client.read_registers_view(4265607340, 0x03, 0, 10).release()
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(statistics.median(peaks), 1024)
+        retained = sum(stat.size_diff for stat in after.compare_to(before, 'filename')
+                       if 'fastmodbuslibrary' in stat.traceback[0].filename)
+        self.assertLess(retained, 1024)
+
+if __name__ == '__main__':
+    unittest.main()
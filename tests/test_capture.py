@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+from fastmodbuslibrary import capture, protocol
+from fastmodbuslibrary.capture import CaptureDecoder, CaptureWriter
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice
+
+class TestCapture(unittest.TestCase):
+    """
+    Test suite for recording captures and decoding them into columns, in one or several processes.
+    """
+
+    def setUp(self):
+        if capture.np is None:
+            self.skipTest("NumPy is not installed")
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'bus.cap')
+        self.device = EmulatedDevice(4265607340, 10, "WBMCM8", holding={address: address for address in range(10)},
+                                     events={(0x03, 5)})
+        self.bus = EmulatedBus([self.device])
+        self.timestamp = 1000.0
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def with_crc(self, frame: bytes) -> bytes:
+        """
+        Append the CRC to a frame.
+        """
+        return frame + protocol.CRC.pack(protocol.crc16(frame))
+
+    def record(self, writer: CaptureWriter, request: bytes, answer: bool = True):
+        """
+        Record a request and the emulated response, 10 ms apart.
+        """
+        writer.write_frame(self.with_crc(request), self.timestamp)
+        response = self.bus.respond(request)
+        if answer and response is not None:
+            writer.write_frame(self.with_crc(response), self.timestamp + 0.01)
+        self.timestamp += 0.1
+
+    def write_capture(self, rounds: int = 50):
+        """
+        Write a capture of reads, exceptions, timeouts, events, a corrupt frame and garbage.
+        """
+        self.device.configure_events(bytes([0x03, 0, 5, 1, 1]))
+        with CaptureWriter(self.path) as writer:
+            for i in range(rounds):
+                self.record(writer, protocol.encode_read_request(4265607340, 0x03, i % 5, 4))
+                self.record(writer, protocol.encode_read_request(4265607340, 0x03, 100, 1))
+                self.record(writer, protocol.encode_read_request(4265607340, 0x03, 0, 1), answer=False)
+                self.device.set_value(0x03, 5, i)
+                self.record(writer, protocol.encode_event_request(1, 100, 0, 0))
+                self.device.confirm_events(self.device.event_flag)
+            writer.write_frame(b'\xFD\x46\x09\x00\x00\x00\x00\x03\x02\x00\x01\x00\x00', self.timestamp)
+            writer.file.write(b'\xA5\x5A\xFF\xFF garbage')
+            self.record(writer, protocol.encode_read_request(4265607340, 0x03, 1, 1))
+
+    def test_decode_columns(self):
+        """
+        Test the frame, transaction and event columns of a capture decoded in this process.
+        """
+        self.write_capture()
+        columns = CaptureDecoder(workers=1).decode(self.path)
+
+        frames = len(columns["frame_kind"])
+        self.assertEqual(frames, 50 * 7 + 1 + 2)
+        self.assertEqual(int((~columns["frame_crc_ok"]).sum()), 1)
+        first = columns["frame_data"][columns["frame_offsets"][0]:columns["frame_offsets"][0] + columns["frame_length"][0]]
+        self.assertEqual(first.tobytes(), self.with_crc(protocol.encode_read_request(4265607340, 0x03, 0, 4)))
+        self.assertEqual(list(columns["frame_kind"][:7]), [capture.KIND_REQUEST, capture.KIND_RESPONSE,
+                                                          capture.KIND_REQUEST, capture.KIND_RESPONSE,
+                                                          capture.KIND_REQUEST, capture.KIND_EVENT_REQUEST,
+                                                          capture.KIND_EVENTS])
+
+        status = columns["transaction_status"]
+        self.assertEqual(len(status), 151)
+        self.assertEqual(list(status[:3]), [capture.STATUS_OK, capture.STATUS_EXCEPTION, capture.STATUS_TIMEOUT])
+        self.assertEqual(columns["transaction_exception"][1], 0x02)
+        self.assertAlmostEqual(columns["transaction_latency"][0], 0.01)
+        self.assertEqual(list(columns["transaction_register"][:3]), [0, 100, 0])
+        self.assertEqual(list(columns["transaction_count"][:3]), [4, 1, 1])
+
+        # The reboot event comes first, then one register event per round
+        self.assertEqual(list(columns["event_type"][:2]), [0x0F, 0x03])
+        self.assertEqual(list(columns["event_value"][1:]), list(range(50)))
+        self.assertEqual(set(columns["event_id"][1:]), {5})
+        self.assertTrue((columns["frame_kind"][columns["event_frame"]] == capture.KIND_EVENTS).all())
+        self.assertAlmostEqual(columns["event_timestamp"][1], 1000.0 + 0.3 + 0.01)
+
+    def test_parallel_decode_matches(self):
+        """
+        Test that decoding small chunks in worker processes gives the same columns and saves them.
+        """
+        self.write_capture()
+        expected = CaptureDecoder(workers=1).decode(self.path)
+        output = os.path.join(self.directory.name, 'bus.npz')
+        decoder = CaptureDecoder(workers=2, chunk_size=500)
+        columns = decoder.decode(self.path, output)
+
+        self.assertGreater(decoder.stats["chunks"], 10)
+        self.assertEqual(set(columns), set(expected))
+        for name in expected:
+            self.assertTrue(capture.np.array_equal(columns[name], expected[name], equal_nan=name.endswith("latency")), name)
+        with capture.np.load(output) as saved:
+            self.assertTrue(capture.np.array_equal(saved["event_value"], expected["event_value"]))
+
+    def test_empty_capture(self):
+        """
+        Test that an empty capture decodes to empty columns.
+        """
+        open(self.path, 'wb').close()
+        columns = CaptureDecoder(workers=1).decode(self.path)
+        self.assertEqual(len(columns["frame_kind"]), 0)
+        self.assertEqual(len(columns["transaction_status"]), 0)
+
+    def test_vectorized_crc(self):
+        """
+        Test the column-wise CRC against the per-frame CRC.
+        """
+        frames = [self.with_crc(protocol.encode_read_request(4265607340, 0x03, register, 1)) for register in range(20)]
+        matrix = capture.np.frombuffer(b''.join(frames), dtype=capture.np.uint8).reshape(20, -1).copy()
+        matrix[3, 5] ^= 1
+        self.assertEqual(list(capture.crc_ok_vectorized(matrix)), [i != 3 for i in range(20)])
+
+if __name__ == '__main__':
+    unittest.main()
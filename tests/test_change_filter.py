@@ -0,0 +1,125 @@
+import struct
+import unittest
+from unittest.mock import patch
+from fastmodbuslibrary import change_filter
+from fastmodbuslibrary.change_filter import ChangeFilter
+from fastmodbuslibrary.register_codec import RegisterCodec
+
+class TestChangeFilter(unittest.TestCase):
+    """
+    Test suite for the deadband change filter, with and without NumPy.
+    """
+
+    SERIAL_NUMBER = 4265607340
+
+    def setUp(self):
+        self.now = 0.0
+        self.deltas = []
+
+    def make_filter(self, **kwargs) -> ChangeFilter:
+        """
+        Create a filter collecting its deltas, on a manual clock.
+        """
+        return ChangeFilter(self.deltas.append, clock=lambda: self.now, **kwargs)
+
+    def update(self, change, values: list, register: int = 10):
+        """
+        Pass a block of uint16 values through a filter.
+
+        Returns:
+            dict: The values passed on by address.
+        """
+        delta = change.update(self.SERIAL_NUMBER, 0x03, register, struct.pack(f'>{len(values)}H', *values))
+        return {} if delta is None else {address: int(value) for address, value in zip(delta.addresses, delta.values)}
+
+    def check_deadbands(self):
+        """
+        Check absolute and percentage deadbands against the last values passed on.
+        """
+        change = self.make_filter(absolute=2)
+        change.set_deadband(self.SERIAL_NUMBER, 0x03, 12, absolute=0, percent=10)
+        self.assertEqual(self.update(change, [100, 100, 100]), {10: 100, 11: 100, 12: 100})
+        self.assertEqual(self.update(change, [100, 100, 100]), {})
+        self.assertEqual(self.update(change, [102, 98, 109]), {})
+        # Register 10 drifts past its band relative to the value last passed on, not the last one read
+        self.assertEqual(self.update(change, [103, 100, 111]), {10: 103, 12: 111})
+        self.assertEqual(self.update(change, [104, 100, 111]), {})
+        self.assertEqual(change.stats, {"blocks": 5, "values": 15, "changed": 5, "heartbeats": 0})
+        self.assertEqual(len(self.deltas), 2)
+
+    def check_heartbeat(self):
+        """
+        Check that values not passed on for the heartbeat interval are passed on again.
+        """
+        change = self.make_filter(heartbeat=10.0)
+        self.update(change, [1, 2])
+        self.now = 5.0
+        self.assertEqual(self.update(change, [1, 3]), {11: 3})
+        self.now = 10.0
+        self.assertEqual(self.update(change, [1, 3]), {10: 1})
+        self.now = 15.0
+        self.assertEqual(self.update(change, [1, 3]), {11: 3})
+        self.assertEqual(change.stats["heartbeats"], 2)
+
+    def check_exact_values(self):
+        """
+        Check that large 64-bit values and bit blocks are compared exactly.
+        """
+        change = self.make_filter(codec=RegisterCodec('uint64'))
+        base = 2 ** 60
+        change.update(self.SERIAL_NUMBER, 0x04, 0, change.codec.encode([base, base]))
+        delta = change.update(self.SERIAL_NUMBER, 0x04, 0, change.codec.encode([base + 1, base]))
+        self.assertEqual(delta.addresses, [0])
+        self.assertEqual(int(delta.values[0]), base + 1)
+
+        # Coils 0-9 as packed bits; the scheduler passes the bit count
+        self.assertEqual(len(change.update(self.SERIAL_NUMBER, 0x01, 0, b'\x01\x00', 10)), 10)
+        delta = change.update(self.SERIAL_NUMBER, 0x01, 0, b'\x00\x02', 10)
+        self.assertEqual((delta.addresses, [bool(value) for value in delta.values]), ([0, 9], [False, True]))
+
+    def test_numpy(self):
+        """
+        Test the filter with vectorized comparisons when NumPy is installed.
+        """
+        if change_filter.np is None:
+            self.skipTest("NumPy is not installed")
+        self.check_deadbands()
+        self.check_heartbeat()
+        self.check_exact_values()
+
+    def test_without_numpy(self):
+        """
+        Test the filter with the pure Python comparison.
+        """
+        with patch.object(change_filter, 'np', None):
+            self.check_deadbands()
+            self.check_heartbeat()
+            self.check_exact_values()
+            self.assertIsInstance(self.deltas[0].values, list)
+
+    def test_typed_values(self):
+        """
+        Test the addresses of multi-register values, NaN transitions and blocks changing size.
+        """
+        change = self.make_filter(codec=RegisterCodec('float32'), absolute=0.5)
+        codec = change.codec
+        change.update(self.SERIAL_NUMBER, 0x04, 0, codec.encode([1.0, 2.0]))
+        delta = change.update(self.SERIAL_NUMBER, 0x04, 0, codec.encode([1.2, float('nan')]))
+        self.assertEqual(delta.addresses, [2])
+        self.assertIsNone(change.update(self.SERIAL_NUMBER, 0x04, 0, codec.encode([1.4, float('nan')])))
+        delta = change.update(self.SERIAL_NUMBER, 0x04, 0, codec.encode([1.6, 2.0, 3.0]))
+        self.assertEqual(delta.addresses, [0, 2, 4])
+
+    def test_failed_reads_and_reset(self):
+        """
+        Test that failed reads are ignored and that a reset passes on every value again.
+        """
+        change = self.make_filter()
+        self.update(change, [1, 2])
+        self.assertIsNone(change.update(self.SERIAL_NUMBER, 0x03, 10, None))
+        self.assertEqual(self.update(change, [1, 2]), {})
+        change.reset(self.SERIAL_NUMBER)
+        self.assertEqual(self.update(change, [1, 2]), {10: 1, 11: 2})
+
+if __name__ == '__main__':
+    unittest.main()
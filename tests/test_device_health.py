@@ -0,0 +1,124 @@
+from unittest import mock
+import struct
+import unittest
+from fastmodbuslibrary.device_health import DeviceHealth
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.fast_modbus_events import ModbusEventReader
+from fastmodbuslibrary.fast_modbus_scanner import ModbusScanner
+from fastmodbuslibrary.read_result import ReadResult
+from fastmodbuslibrary.retry_policy import RetryPolicy
+
+class TestDeviceHealth(unittest.TestCase):
+    """
+    Test suite for device health scoring and quarantine, using an emulated bus.
+    """
+
+    def setUp(self):
+        # Mock serial.Serial to avoid needing real port
+        self.patcher = mock.patch('serial.Serial')
+        self.mock_serial = self.patcher.start()
+        self.now = 0.0
+        self.health = DeviceHealth(max_failures=3, probe_interval=5.0, max_probe_interval=20.0, clock=lambda: self.now)
+        self.bus = EmulatedBus([EmulatedDevice(4265607340 + i, 10 + i, "WBMCM8", holding={128: i}) for i in range(3)])
+        self.client = ModbusClient('/dev/ttyACM0', 115200,
+                                   retry_policy=RetryPolicy(max_retries=1, initial_timeout=0.02, health=self.health))
+        self.client.serial_port = self.bus
+
+    def tearDown(self):
+        self.client.close()
+        self.patcher.stop()
+
+    def requests_to(self, serial_number: int) -> int:
+        """
+        Count the requests sent to a serial number.
+        """
+        return sum(1 for frame in self.bus.requests if frame[2] == 0x08 and struct.unpack_from('>I', frame, 3)[0] == serial_number)
+
+    def poll_round(self):
+        """
+        Read every device once, including the dead one.
+        """
+        for serial_number in (4265607340, 4265607341, 4265607342, 11111111):
+            self.client.read_result(serial_number, 0x03, 128)
+
+    def test_dead_device_is_quarantined(self):
+        """
+        Test that a dead device is quarantined, probed once per interval with backoff, and readmitted.
+        """
+        for _ in range(20):
+            self.poll_round()
+            self.now += 0.1
+        # The first read is retransmitted once, the third timeout in a row quarantines the device
+        self.assertEqual(self.requests_to(11111111), 3)
+        self.assertEqual(self.health.quarantined(), [11111111])
+        self.assertEqual(self.client.read_result(11111111, 0x03, 128).status, ReadResult.QUARANTINED)
+        report = self.health.report(11111111)
+        self.assertEqual((report["state"], report["timeout"]), (DeviceHealth.QUARANTINED, 3))
+        self.assertGreater(report["refused"], 10)
+        self.assertEqual(self.health.report(4265607340)["state"], DeviceHealth.HEALTHY)
+
+        # Probes are single attempts, the interval doubles after each unanswered one
+        self.now += 5.0
+        self.poll_round()
+        self.poll_round()
+        self.assertEqual(self.requests_to(11111111), 4)
+        self.assertEqual(self.health.report(11111111)["probe_interval"], 10.0)
+
+        self.bus.devices.append(EmulatedDevice(11111111, 20, "WBMR6", holding={128: 7}))
+        self.now += 5.0
+        self.poll_round()
+        self.assertEqual(self.requests_to(11111111), 4)
+        self.now += 5.0
+        self.assertTrue(self.client.read_result(11111111, 0x03, 128))
+        self.assertEqual(self.health.quarantined(), [])
+        self.assertTrue(self.client.read_result(11111111, 0x03, 128))
+
+    def test_event_polls_are_not_quarantined(self):
+        """
+        Test that unanswered event polls to the broadcast address never quarantine the event channel.
+        """
+        reader = ModbusEventReader('/dev/ttyACM0', 115200,
+                                   retry_policy=RetryPolicy(max_retries=0, initial_timeout=0.01, health=self.health))
+        reader.serial_port = self.bus
+        with mock.patch.object(self.bus, 'respond_events', return_value=None):
+            for _ in range(5):
+                self.assertEqual(reader.poll_events(), {})
+        reader.close()
+        self.assertEqual(sum(1 for frame in self.bus.requests if frame[2] == 0x10), 5)
+        self.assertEqual(self.health.quarantined(), [])
+
+    def test_roles_share_health(self):
+        """
+        Test that roles with default policies on one port share quarantine, so other roles skip a dead device.
+        """
+        client = ModbusClient('/dev/ttyACM1', 115200)
+        scanner = ModbusScanner('/dev/ttyACM1', 115200)
+        self.assertIs(client.retry_policy.health, scanner.retry_policy.health)
+        client.retry_policy.health.max_failures = 1
+        client.serial_port = scanner.serial_port = self.bus
+        client.retry_policy.initial_timeout = 0.01
+        self.assertIsNone(client.read_registers(11111111, 0x03, 128))
+        requests = len(self.bus.requests)
+        self.assertEqual(scanner.request_device_model(11111111), "Unknown")
+        self.assertEqual(len(self.bus.requests), requests)
+        client.close()
+        scanner.close()
+
+    def test_score(self):
+        """
+        Test that CRC errors lower the score less than timeouts and a low score quarantines a device.
+        """
+        for outcome in ("crc_error", "success", "timeout", "success", "timeout"):
+            self.health.record(1, outcome)
+            self.health.record(2, "crc_error")
+        self.assertLess(self.health.report(1)["score"], self.health.report(2)["score"])
+        self.assertEqual(self.health.report(1)["state"], DeviceHealth.HEALTHY)
+
+        health = DeviceHealth(max_failures=10, min_score=0.5)
+        for outcome in ("timeout", "timeout", "success", "timeout", "timeout"):
+            health.record(1, outcome)
+        self.assertEqual(health.quarantined(), [1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+from unittest import mock
+import json
+import os
+import tempfile
+import unittest
+from fastmodbuslibrary.device_profiles import ProfileDatabase
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.fast_modbus_scheduler import PollScheduler
+
+PROFILE = {
+    "model": "WBMSW",
+    "period": 1.0,
+    "registers": [
+        {"name": "humidity", "function": 4, "address": 1, "type": "uint16", "scale": 0.01},
+        {"name": "temperature", "function": 4, "address": 0, "type": "int16", "scale": 0.01},
+        {"name": "illuminance", "function": 4, "address": 9, "type": "uint32", "scale": 0.01},
+        {"name": "uptime", "function": 4, "address": 104, "type": "uint32", "period": 60.0},
+        {"name": "co2", "function": 4, "address": 8},
+    ],
+}
+
+class TestProfileDatabase(unittest.TestCase):
+    """
+    Test suite for device profiles and compiled read plans.
+    """
+
+    def setUp(self):
+        # Mock serial.Serial to avoid needing real port
+        self.patcher = mock.patch('serial.Serial')
+        self.mock_serial = self.patcher.start()
+        self.directory = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.directory.name, 'WBMSW.json'), 'w') as file:
+            json.dump(PROFILE, file)
+        self.database = ProfileDatabase([self.directory.name])
+
+    def tearDown(self):
+        self.directory.cleanup()
+        self.patcher.stop()
+
+    def test_compile_merges_ranges(self):
+        """
+        Test that registers are merged into one read per function and period, and plans are cached.
+        """
+        plan = self.database.plan('WBMSW')
+        self.assertEqual([(b.function, b.register, b.count, b.period) for b in plan.blocks],
+                         [(4, 0, 11, 1.0), (4, 104, 2, 60.0)])
+        self.assertIs(self.database.plan('WBMSW'), plan)
+        self.assertIsNone(self.database.plan('WBMR6C'))
+
+        self.database.max_gap = 5
+        self.assertEqual(len(self.database.compile(PROFILE).blocks), 3)
+
+    def test_read_and_schedule_scanned_devices(self):
+        """
+        Test that a scanned bus is polled with decoded values, skipping unknown models.
+        """
+        bus = EmulatedBus([
+            EmulatedDevice(4265607340, 12, "WBMSW", input={**dict.fromkeys(range(11), 0), 0: 0xF830, 1: 4500,
+                                                           8: 650, 9: 1, 10: 0x86A0, 104: 0, 105: 30}),
+            EmulatedDevice(113245, 4, "WBMR6C"),
+        ])
+        client = ModbusClient('/dev/ttyPR0', 115200)
+        client.serial_port = bus
+        try:
+            values = self.database.plan('WBMSW').read(client, 4265607340)
+            self.assertAlmostEqual(values['temperature'], -20.0)
+            self.assertAlmostEqual(values['humidity'], 45.0)
+            self.assertAlmostEqual(values['illuminance'], 1000.0)
+            self.assertEqual(values['co2'], 650)
+
+            received = []
+            scheduler = PollScheduler(client)
+            devices = [{"serial_number": 4265607340, "modbus_id": 12, "model": "WBMSW"},
+                       {"serial_number": 113245, "modbus_id": 4, "model": "WBMR6C"}]
+            unknown = self.database.schedule_devices(scheduler, devices, lambda sn, v: received.append((sn, v)))
+            self.assertEqual([device["serial_number"] for device in unknown], [113245])
+            self.assertEqual(len(scheduler.tasks), 2)
+            scheduler.run_pending()
+            self.assertEqual(len(received), 2)
+            self.assertEqual(received[0][0], 4265607340)
+        finally:
+            client.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+from unittest import mock
+import unittest
+from fastmodbuslibrary import protocol
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice
+from fastmodbuslibrary.event_batching import EventBatchSizer
+from fastmodbuslibrary.fast_modbus_events import ModbusEventReader
+
+class TestEventBatchSizer(unittest.TestCase):
+    """
+    Test suite for adaptive event batch sizing, using an emulated bus.
+    """
+
+    def setUp(self):
+        # Mock serial.Serial to avoid needing real port
+        self.patcher = mock.patch('serial.Serial')
+        self.mock_serial = self.patcher.start()
+        self.device = EmulatedDevice(4265607340, 10, "WBMCM8", input={0: 0}, events={(0x04, 0)})
+        self.device.event_enabled.add((0x04, 0))
+        self.bus = EmulatedBus([self.device])
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def drain(self, reader: ModbusEventReader) -> tuple:
+        """
+        Request events until the device has none left.
+
+        Returns:
+            tuple: The number of rounds and of events received.
+        """
+        rounds = events = 0
+        while True:
+            response = reader.poll_events()
+            rounds += 1
+            if not response:
+                return rounds, events
+            events += len(response['events'])
+
+    def test_bounds(self):
+        """
+        Test that the length grows on full responses up to the latency cap and shrinks when idle.
+        """
+        reader = ModbusEventReader('/dev/ttyACM0', 9600)
+        sizer = EventBatchSizer(reader.frame_airtime, latency_target=0.1)
+        self.assertEqual(sizer.cap, 72)
+        reader.baudrate = 115200
+        self.assertEqual(sizer.cap, EventBatchSizer.MAX_DATA_LENGTH)
+        reader.baudrate = 9600
+
+        full = {'packet_info': {'events_data_length': 72, 'flag': 0}, 'events': [{}] * 12}
+        self.assertEqual([sizer.update(full) for _ in range(3)], [32, 64, 72])
+        self.assertEqual([sizer.update({}) for _ in range(3)], [54, 40, 30])
+        for _ in range(10):
+            sizer.update({})
+        self.assertEqual(sizer.length, 16)
+
+        # A short packet flagged as leaving events behind also shows a backlog
+        more = {'packet_info': {'events_data_length': 6, 'flag': protocol.MORE_EVENTS_FLAG | 1}, 'events': [{}]}
+        self.assertEqual(sizer.update(more), 32)
+        self.assertEqual(sizer.stats["full"], 4)
+        reader.close()
+
+    def test_burst_is_drained_in_fewer_rounds(self):
+        """
+        Test that a burst of events takes fewer, larger rounds than with a fixed small length.
+        """
+        fixed = ModbusEventReader('/dev/ttyACM0', 115200)
+        fixed.batch_sizer = EventBatchSizer(fixed.frame_airtime, latency_target=0.0)
+        fixed.serial_port = self.bus
+        for value in range(200):
+            self.device.set_value(0x04, 0, value)
+        # The reboot event queued at start comes first
+        fixed_rounds, events = self.drain(fixed)
+        self.assertEqual(events, 201)
+
+        adaptive = ModbusEventReader('/dev/ttyACM0', 115200)
+        adaptive.serial_port = self.bus
+        for value in range(200):
+            self.device.set_value(0x04, 0, value)
+        adaptive_rounds, events = self.drain(adaptive)
+        self.assertEqual(events, 200)
+        self.assertLess(adaptive_rounds, fixed_rounds / 5)
+        self.assertEqual(adaptive.batch_sizer.stats["max_length"], EventBatchSizer.MAX_DATA_LENGTH)
+
+        fixed.close()
+        adaptive.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+from unittest import mock
+import unittest
+from unittest.mock import patch, MagicMock
+from fastmodbuslibrary.event_ring import EventRingWriter, EventRingReader, RECORD
+from fastmodbuslibrary.fast_modbus_events import ModbusEventReader
+
+class TestEventRing(unittest.TestCase):
+    """
+    Test suite for the shared-memory event ring buffer.
+    """
+
+    def setUp(self):
+        self.writer = EventRingWriter(capacity=8)
+
+    def tearDown(self):
+        self.writer.close()
+
+    def test_readers_keep_own_cursors(self):
+        """
+        Test that every reader sees every record once, independently of other readers.
+        """
+        first = EventRingReader(self.writer.name)
+        self.writer.publish_event(201, 4, 464, 12, 1.0)
+        second = EventRingReader(self.writer.name)
+        self.writer.publish_event(201, 4, 480, 3, 2.0)
+
+        self.assertEqual(first.read(), [(0, 1.0, 201, 4, 464, 12), (1, 2.0, 201, 4, 480, 3)])
+        self.assertEqual(second.read(), [(1, 2.0, 201, 4, 480, 3)])
+        self.assertEqual(first.read(), [])
+        first.close()
+        second.close()
+
+    def test_signed_and_large_payloads(self):
+        """
+        Test that negative payloads and unsigned 32-bit payloads are stored unchanged.
+        """
+        reader = EventRingReader(self.writer.name)
+        self.writer.publish_event(201, 4, 464, -12, 1.0)
+        self.writer.publish_event(201, 4, 466, 0xFFFFFFFF, 1.0)
+        self.assertEqual([record[5] for record in reader.read()], [-12, 0xFFFFFFFF])
+        reader.close()
+
+    def test_zero_copy_view_and_overrun(self):
+        """
+        Test that lapped readers report lost records and views alias the shared buffer.
+        """
+        reader = EventRingReader(self.writer.name)
+        for event_id in range(10):
+            self.writer.publish_event(1, 2, event_id, 0, 0.0)
+
+        view = reader.read_view()
+        self.assertEqual(reader.lost, 2)
+        self.assertEqual([record[4] for record in RECORD.iter_unpack(view)], [2, 3, 4, 5, 6, 7])
+        self.assertTrue(reader.is_valid())
+        self.writer.publish_event(1, 2, 10, 0, 0.0)
+        self.assertFalse(reader.is_valid())
+        view.release()
+
+        self.assertEqual([record[4] for record in reader.read()], [8, 9, 10])
+        reader.close()
+
+    @patch('fastmodbuslibrary.common.ModbusCommon.send_command')
+    @patch('fastmodbuslibrary.common.ModbusCommon.wait_for_response')
+    def test_event_reader_publishes(self, mock_wait_for_response, mock_send_command):
+        """
+        Test that ModbusEventReader publishes received events to the ring.
+        """
+        with mock.patch('serial.Serial'):
+            event_reader = ModbusEventReader('/dev/ttyACM0', 9600, event_ring=self.writer)
+        event_reader.serial_port = MagicMock()
+        mock_wait_for_response.return_value = True
+        event_reader.serial_port.read.return_value = (
+            b'\xFF' * 9 + b'\xC9\x46\x11\x00\x05\x1B\x01\x02\x00\x00\x01\x02\x04\x01\xD0\x0C\x00\x02'
+            b'\x04\x01\xE0\x03\x00\x02\x04\x01\xF0\x0B\x00\x00\x0F\x00\x00\x5C\xD2')
+
+        reader = EventRingReader(self.writer.name)
+        event_reader.request_events(1, 100, 0, 0)
+        records = reader.read()
+        self.assertEqual([(r[2], r[3], r[4], r[5]) for r in records],
+                         [(201, 2, 0, 1), (201, 4, 464, 12), (201, 4, 480, 3), (201, 4, 496, 11), (201, 15, 0, 0)])
+        reader.close()
+        event_reader.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+from unittest import mock
+import threading
+import time
+import unittest
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice
+from fastmodbuslibrary.event_router import EventRouter, Subscription
+from fastmodbuslibrary.fast_modbus_events import ModbusEventReader
+
+class TestEventRouter(unittest.TestCase):
+    """
+    Test suite for indexed event dispatch and bounded subscriber queues.
+    """
+
+    def setUp(self):
+        self.router = EventRouter()
+
+    def event(self, device_id: int, event_type: int, event_id: int, value: int = 0) -> dict:
+        """
+        Build an event as delivered by the router.
+        """
+        return {"device_id": device_id, "event_type": event_type, "event_id": event_id, "event_payload_value": value}
+
+    def test_wildcard_dispatch(self):
+        """
+        Test that every matching pattern, exact or wild, receives the event once.
+        """
+        exact = self.router.subscribe(10, 0x04, 464)
+        device = self.router.subscribe(device_id=10)
+        register = self.router.subscribe(event_type=0x04, event_id=464)
+        everything = self.router.subscribe()
+        other = self.router.subscribe(11)
+
+        self.assertEqual(self.router.publish_event(self.event(10, 0x04, 464, 12)), 4)
+        self.assertEqual(self.router.publish_event(self.event(10, 0x0F, 0)), 2)
+        self.assertEqual([len(s) for s in (exact, device, register, everything, other)], [1, 2, 1, 2, 0])
+        self.assertEqual(exact.get(0)["event_payload_value"], 12)
+
+        self.router.unsubscribe(everything)
+        self.assertEqual(self.router.publish_event(self.event(12, 0x01, 0)), 0)
+        self.assertEqual(self.router.stats, {"published": 3, "deliveries": 6, "unmatched": 1})
+
+    def test_drop_oldest(self):
+        """
+        Test that a full queue with the drop-oldest policy keeps the newest events.
+        """
+        subscription = self.router.subscribe(max_size=3)
+        for value in range(5):
+            self.router.publish_event(self.event(10, 0x04, 1, value))
+        self.assertEqual([event["event_payload_value"] for event in subscription.drain()], [2, 3, 4])
+        self.assertEqual(subscription.stats, {"delivered": 5, "dropped": 2, "coalesced": 0})
+        self.assertIsNone(subscription.get(0))
+
+    def test_coalesce(self):
+        """
+        Test that the coalescing policy keeps the newest event per key in first-arrival order.
+        """
+        subscription = self.router.subscribe(max_size=2, overflow=Subscription.COALESCE)
+        self.router.publish_event(self.event(10, 0x04, 1, 1))
+        self.router.publish_event(self.event(10, 0x04, 2, 2))
+        self.router.publish_event(self.event(10, 0x04, 1, 3))
+        self.assertEqual([(e["event_id"], e["event_payload_value"]) for e in subscription.drain()], [(1, 3), (2, 2)])
+        self.router.publish_event(self.event(10, 0x04, 1, 1))
+        self.router.publish_event(self.event(10, 0x04, 2, 2))
+        self.router.publish_event(self.event(10, 0x04, 3, 3))
+        self.assertEqual([e["event_id"] for e in subscription.drain(1)], [2])
+        self.assertEqual(subscription.stats["dropped"], 1)
+
+    def test_block_is_bounded(self):
+        """
+        Test that the blocking policy waits for a consumer, but a stuck one costs one timeout only.
+        """
+        subscription = self.router.subscribe(max_size=1, overflow=Subscription.BLOCK, block_timeout=0.05)
+        self.router.publish_event(self.event(10, 0x04, 1, 1))
+        consumer = threading.Timer(0.01, subscription.get)
+        consumer.start()
+        self.router.publish_event(self.event(10, 0x04, 1, 2))
+        consumer.join()
+        self.assertEqual(subscription.get(0)["event_payload_value"], 2)
+
+        self.router.publish_event(self.event(10, 0x04, 1, 3))
+        start = time.monotonic()
+        for value in range(4, 24):
+            self.router.publish_event(self.event(10, 0x04, 1, value))
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(subscription.stats["dropped"], 20)
+        self.assertEqual(subscription.get(0)["event_payload_value"], 3)
+
+    def test_invalid_subscription(self):
+        """
+        Test that unknown policies and empty queues are rejected.
+        """
+        with self.assertRaises(ValueError):
+            self.router.subscribe(overflow="newest")
+        with self.assertRaises(ValueError):
+            self.router.subscribe(max_size=0)
+
+    def test_event_reader_publishes(self):
+        """
+        Test that an event reader with a router delivers the events it receives.
+        """
+        with mock.patch('serial.Serial'):
+            reader = ModbusEventReader('/dev/ttyACM0', 115200, event_router=self.router)
+        device = EmulatedDevice(4265607340, 10, "WBMCM8", holding={5: 0}, events={(0x03, 5)})
+        reader.serial_port = EmulatedBus([device])
+        device.configure_events(bytes([0x03, 0, 5, 1, 1]))
+        device.set_value(0x03, 5, 300)
+        subscription = self.router.subscribe(10, 0x03)
+        reboot = self.router.subscribe(event_type=0x0F)
+
+        reader.poll_events()
+        reader.close()
+        self.assertEqual(subscription.drain(), [self.event(10, 0x03, 5, 300)])
+        self.assertEqual(len(reboot), 1)
+
+if __name__ == '__main__':
+    unittest.main()
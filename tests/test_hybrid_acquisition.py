@@ -0,0 +1,115 @@
+from unittest import mock
+import unittest
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.fast_modbus_config_events import ModbusConfigEvents
+from fastmodbuslibrary.fast_modbus_events import ModbusEventReader
+from fastmodbuslibrary.fast_modbus_scheduler import PollScheduler
+from fastmodbuslibrary.hybrid_acquisition import HybridAcquisition
+
+class TestHybridAcquisition(unittest.TestCase):
+    """
+    Test suite for event-first acquisition with polling fallback, using an emulated bus.
+    """
+
+    def setUp(self):
+        # Mock serial.Serial to avoid needing real port
+        self.patcher = mock.patch('serial.Serial')
+        self.mock_serial = self.patcher.start()
+        self.event_device = EmulatedDevice(4265607340, 10, "WBMCM8", holding={address: address for address in range(8)},
+                                           events={(0x03, address) for address in range(6)})
+        self.polled_device = EmulatedDevice(4265607341, 11, "WBMAP3", input={address: 100 for address in range(4)})
+        self.bus = EmulatedBus([self.event_device, self.polled_device])
+
+        self.client = ModbusClient('/dev/ttyACM0', 115200)
+        self.config_events = ModbusConfigEvents('/dev/ttyACM0', 115200)
+        self.event_reader = ModbusEventReader('/dev/ttyACM0', 115200)
+        for role in (self.client, self.config_events, self.event_reader):
+            role.serial_port = self.bus
+
+        self.now = 0.0
+        self.scheduler = PollScheduler(self.client, clock=lambda: self.now)
+        self.values = []
+        self.acquisition = HybridAcquisition(self.scheduler, self.config_events, self.event_reader,
+                                             lambda *value: self.values.append(value), poll_period=1.0, event_period=0.1)
+        self.acquisition.add(4265607340, 10, 0x03, 0, 8)
+        self.acquisition.add(4265607341, 11, 0x04, 0, 4)
+
+    def tearDown(self):
+        for role in (self.client, self.config_events, self.event_reader):
+            role.close()
+        self.patcher.stop()
+
+    def run_for(self, duration: float, step: float = 0.1):
+        """
+        Advance the scheduler clock, running released work at every step.
+        """
+        end = self.now + duration
+        while self.now < end:
+            self.scheduler.run_pending()
+            self.now += step
+
+    def test_only_rejected_registers_are_polled(self):
+        """
+        Test that registers with events are not polled and every block is read once at start.
+        """
+        self.acquisition.start()
+        blocks = self.acquisition.blocks
+        self.assertEqual(blocks[0].event_registers, set(range(6)))
+        self.assertEqual(blocks[1].event_registers, set())
+        self.assertEqual([(task.serial_number, task.register, task.count) for task in self.scheduler.tasks if task.serial_number],
+                         [(4265607340, 6, 2), (4265607341, 0, 4)])
+        self.assertEqual(self.values[0], (4265607340, 0x03, 0, bytes(sum(([0, address] for address in range(8)), []))))
+        self.assertEqual(self.values[1], (4265607341, 0x04, 0, b'\x00\x64' * 4))
+
+    def test_event_reads_block(self):
+        """
+        Test that an event makes the whole block be read back once.
+        """
+        self.acquisition.start()
+        self.run_for(0.5)
+        self.values.clear()
+
+        self.event_device.set_value(0x03, 2, 500)
+        self.event_device.set_value(0x03, 3, 600)
+        self.run_for(0.3)
+        event_values = [value for value in self.values if value[0] == 4265607340 and value[2] == 0]
+        self.assertEqual(len(event_values), 1)
+        self.assertEqual(event_values[0][3][4:8], b'\x01\xF4\x02\x58')
+
+        # A change of a polled register is seen at the next poll only
+        self.polled_device.set_value(0x04, 1, 7)
+        self.run_for(1.0)
+        self.assertIn((4265607341, 0x04, 0, b'\x00\x64\x00\x07\x00\x64\x00\x64'), self.values)
+
+    def test_reboot_reconfigures_events(self):
+        """
+        Test that a device that lost its event settings in a restart is configured again.
+        """
+        self.acquisition.start()
+        self.run_for(0.5)
+        self.event_device.reboot()
+        self.assertEqual(self.event_device.event_enabled, set())
+        self.run_for(0.3)
+        self.assertEqual(len(self.event_device.event_enabled), 6)
+        self.assertEqual(len([task for task in self.scheduler.tasks if task.serial_number == 4265607340]), 1)
+
+    def test_coil_block(self):
+        """
+        Test that coil blocks are acquired through events like registers, with packed bits.
+        """
+        coil_device = EmulatedDevice(4265607342, 12, "WBMR6C", coils={address: 0 for address in range(6)},
+                                     events={(0x01, address) for address in range(6)})
+        self.bus.devices.append(coil_device)
+        self.acquisition.add(4265607342, 12, 0x01, 0, 6)
+        self.acquisition.start()
+        self.assertEqual(self.acquisition.blocks[2].event_registers, set(range(6)))
+        self.assertIn((4265607342, 0x01, 0, b'\x00'), self.values)
+        self.run_for(0.5)
+
+        coil_device.set_value(0x01, 4, 1)
+        self.run_for(0.3)
+        self.assertEqual(self.values[-1], (4265607342, 0x01, 0, b'\x10'))
+
+if __name__ == '__main__':
+    unittest.main()
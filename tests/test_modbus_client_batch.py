@@ -0,0 +1,84 @@
+from unittest import mock
+import struct
+import unittest
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.read_result import ReadResult
+from fastmodbuslibrary.retry_policy import RetryPolicy
+
+class TestModbusClientBatch(unittest.TestCase):
+    """
+    Test suite for batch reads with an overall deadline, using an emulated bus.
+    """
+
+    def setUp(self):
+        # Mock serial.Serial to avoid needing real port
+        self.patcher = mock.patch('serial.Serial')
+        self.mock_serial = self.patcher.start()
+        self.devices = [EmulatedDevice(4265607340 + i, 10 + i, "WBMCM8", holding={128: i, 129: 5})
+                        for i in range(5)]
+        self.bus = EmulatedBus(self.devices, turnaround=0.002)
+        self.client = ModbusClient('/dev/ttyACM0', 115200, retry_policy=RetryPolicy(max_retries=1, initial_timeout=0.2))
+        self.client.serial_port = self.bus
+
+    def tearDown(self):
+        self.client.close()
+        self.patcher.stop()
+
+    def requests_to(self, serial_number: int) -> int:
+        """
+        Count the requests sent to a serial number.
+        """
+        return sum(1 for frame in self.bus.requests if struct.unpack_from('>I', frame, 3)[0] == serial_number)
+
+    def test_results_per_request(self):
+        """
+        Test that every request gets its own status, data and latency.
+        """
+        requests = [(device.serial_number, 0x03, 128, 2) for device in self.devices]
+        requests.append((4265607340, 0x03, 127, 2))
+        results = self.client.read_many(requests, deadline=1.0)
+
+        self.assertEqual(list(results), requests)
+        for i, device in enumerate(self.devices):
+            result = results[(device.serial_number, 0x03, 128, 2)]
+            self.assertEqual(result.data, bytes([0, i, 0, 5]))
+            self.assertGreater(result.latency, 0.002)
+        self.assertEqual(results[(4265607340, 0x03, 127, 2)].exception_code, 0x02)
+
+    def test_dead_device_costs_one_timeout(self):
+        """
+        Test that an unanswering device is skipped after its first timeout and the batch meets its deadline.
+        """
+        requests = []
+        for register in range(4):
+            requests.extend((device.serial_number, 0x03, 128 + register % 2, 1) for device in self.devices)
+            requests.append((11111111, 0x03, register, 1))
+
+        results = self.client.read_many(requests, deadline=0.5)
+        # One request and its retransmission, the later reads of the device are not sent
+        self.assertEqual(self.requests_to(11111111), 2)
+        # Timeouts of unknown devices are capped at a multiple of the bus round trip measured meanwhile
+        self.assertLess(self.client.retry_policy.timeout(11111111), 0.2)
+
+        statuses = [results[(11111111, 0x03, register, 1)].status for register in range(4)]
+        self.assertEqual(statuses, [ReadResult.TIMEOUT] + [ReadResult.SKIPPED] * 3)
+        self.assertTrue(all(results[(device.serial_number, 0x03, 129, 1)] for device in self.devices))
+
+    def test_deadline_skips_remaining_reads(self):
+        """
+        Test that reads that cannot finish before the deadline are skipped, not started.
+        """
+        requests = [(device.serial_number, 0x03, 128, 2) for device in self.devices]
+        self.client.read_many(requests, deadline=1.0)
+
+        sent = len(self.bus.requests)
+        results = self.client.read_many([(11111111, 0x03, 0, 1)] + requests, deadline=0.02)
+        self.assertEqual(len(self.bus.requests), sent + 1)
+        self.assertEqual(results[(11111111, 0x03, 0, 1)].status, ReadResult.TIMEOUT)
+        self.assertTrue(all(results[request].status == ReadResult.SKIPPED for request in requests))
+        # A timeout cut short by the deadline does not back off the device
+        self.assertEqual(self.client.retry_policy.stats[11111111]["timeout"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
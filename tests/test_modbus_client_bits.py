@@ -0,0 +1,97 @@
+from unittest import mock
+import unittest
+from fastmodbuslibrary import register_codec
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.read_result import ReadResult
+from fastmodbuslibrary.register_codec import decode_bits, encode_bits
+from fastmodbuslibrary.retry_policy import RetryPolicy
+
+class TestModbusClientBits(unittest.TestCase):
+    """
+    Test suite for coil and discrete input reads and multi-coil writes, using an emulated bus.
+    """
+
+    SERIAL_NUMBER = 4265607340
+    COUNT = 3000
+
+    def setUp(self):
+        # Mock serial.Serial to avoid needing real port
+        self.patcher = mock.patch('serial.Serial')
+        self.mock_serial = self.patcher.start()
+        self.device = EmulatedDevice(self.SERIAL_NUMBER, 10, "WBMCM8",
+                                     coils={address: address % 3 == 0 for address in range(self.COUNT)},
+                                     discrete={address: 1 for address in range(10)})
+        self.bus = EmulatedBus([self.device])
+        self.client = ModbusClient('/dev/ttyACM0', 115200, retry_policy=RetryPolicy(max_retries=1, initial_timeout=0.05))
+        self.client.serial_port = self.bus
+        self.requests = 0
+        respond = self.bus.respond
+
+        def counting_respond(frame):
+            self.requests += 1
+            return respond(frame)
+        self.bus.respond = counting_respond
+
+    def tearDown(self):
+        self.client.close()
+        self.patcher.stop()
+
+    def test_packed_read(self):
+        """
+        Test that a bit read returns the packed bytes with a byte-count-aware length check.
+        """
+        result = self.client.read_result(self.SERIAL_NUMBER, 0x02, 0, 10)
+        self.assertTrue(result)
+        self.assertEqual(result.data, b'\xFF\x03')
+        self.assertEqual(self.client.read_result(self.SERIAL_NUMBER, 0x02, 5, 10).exception_code, 0x02)
+
+    def test_read_bits_in_few_frames(self):
+        """
+        Test that thousands of coils are read with one request per 2000 coils.
+        """
+        bits = self.client.read_bits(self.SERIAL_NUMBER, 0x01, 0, self.COUNT)
+        self.assertEqual(self.requests, 2)
+        self.assertEqual(len(bits), self.COUNT)
+        self.assertEqual([bool(bit) for bit in bits], [address % 3 == 0 for address in range(self.COUNT)])
+
+        bits = self.client.read_bits(self.SERIAL_NUMBER, 0x01, 1, 5)
+        self.assertEqual(list(map(bool, bits)), [False, False, True, False, False])
+        self.assertIsNone(self.client.read_bits(self.SERIAL_NUMBER, 0x01, 2990, 20))
+        with self.assertRaises(ValueError):
+            self.client.read_bits(self.SERIAL_NUMBER, 0x03, 0, 1)
+
+    def test_write_coils(self):
+        """
+        Test writing multiple coils with 0x0F and reading them back.
+        """
+        values = [True, False, True, True, False, False, True, False, True, True, True]
+        self.assertTrue(self.client.write_coils(self.SERIAL_NUMBER, 100, values))
+        self.assertEqual([self.device.registers[0x01][100 + i] for i in range(len(values))], [int(v) for v in values])
+        self.assertEqual(list(map(bool, self.client.read_bits(self.SERIAL_NUMBER, 0x01, 100, len(values)))), values)
+
+        self.assertFalse(self.client.write_coils(self.SERIAL_NUMBER, 2999, [True, True]))
+        with self.assertRaises(ValueError):
+            self.client.write_coils(self.SERIAL_NUMBER, 0, [True] * 2000)
+
+    def test_bit_codec(self):
+        """
+        Test packing and unpacking bits with and without NumPy.
+        """
+        values = [True, False, False, True, True, False, True, False, False, True]
+        for numpy in (register_codec.np, None):
+            with mock.patch.object(register_codec, 'np', numpy):
+                self.assertEqual(encode_bits(values), b'\x59\x02')
+                self.assertEqual([bool(bit) for bit in decode_bits(b'\x59\x02', 10)], values)
+                self.assertEqual(len(decode_bits(b'\x59\x02', 9)), 9)
+
+    def test_batch_and_scheduler_sizing(self):
+        """
+        Test that batch reads and the scheduler size bit reads by their packed length.
+        """
+        results = self.client.read_many([(self.SERIAL_NUMBER, 0x01, 0, 2000)], deadline=1.0)
+        self.assertEqual(results[(self.SERIAL_NUMBER, 0x01, 0, 2000)].status, ReadResult.OK)
+        self.assertEqual(len(results[(self.SERIAL_NUMBER, 0x01, 0, 2000)].data), 250)
+
+if __name__ == '__main__':
+    unittest.main()
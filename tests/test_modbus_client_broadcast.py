@@ -0,0 +1,53 @@
+from unittest import mock
+import unittest
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+
+class TestModbusClientBroadcast(unittest.TestCase):
+    """
+    Test suite for the ModbusClient class, focusing on broadcast group writes.
+    """
+
+    def setUp(self):
+        # Mock serial.Serial to avoid needing real port
+        self.patcher = mock.patch('serial.Serial')
+        self.mock_serial = self.patcher.start()
+        self.bus = EmulatedBus([
+            EmulatedDevice(4265607340, 201, "WBMCM8", holding={128: 0, 129: 0}),
+            EmulatedDevice(113245, 4, "WBMAO4", holding={128: 0, 129: 0}),
+            EmulatedDevice(200300, 5, "WBMR6C", holding={130: 0}),
+        ])
+        self.client = ModbusClient('/dev/ttyACM0', 115200)
+        self.client.serial_port = self.bus
+        self.serial_numbers = [4265607340, 113245, 200300]
+
+    def tearDown(self):
+        self.client.close()
+        self.patcher.stop()
+
+    def test_broadcast_write(self):
+        """
+        Test that one broadcast frame writes every device and verification only reads.
+        """
+        failed = self.client.broadcast_write(128, [5, 6], self.serial_numbers[:2], delay=0)
+        self.assertEqual(failed, [])
+        self.assertEqual(self.bus.requests[0][:2], b'\x00\x10')
+        self.assertEqual(len(self.bus.requests), 3)
+        for device in self.bus.devices[:2]:
+            self.assertEqual((device.registers[0x03][128], device.registers[0x03][129]), (5, 6))
+
+    def test_missed_broadcast_is_retried(self):
+        """
+        Test that devices missing the broadcast get a unicast write and unwritable ones are reported.
+        """
+        with mock.patch.object(self.bus, 'RTU_BROADCAST_ID', 0xFF):
+            failed = self.client.broadcast_write(128, [5, 6], self.serial_numbers, delay=0)
+        self.assertEqual(failed, [200300])
+        for device in self.bus.devices[:2]:
+            self.assertEqual((device.registers[0x03][128], device.registers[0x03][129]), (5, 6))
+
+        self.assertEqual(self.client.broadcast_write(128, [7, 8], self.serial_numbers, retry=False, delay=0),
+                         [200300])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+from unittest import mock
+import unittest
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.read_result import NegativeCache, ReadResult
+from fastmodbuslibrary.retry_policy import RetryPolicy
+
+class TestModbusClientExceptions(unittest.TestCase):
+    """
+    Test suite for exception decoding and the negative cache of ModbusClient, using an emulated bus.
+    """
+
+    def setUp(self):
+        # Mock serial.Serial to avoid needing real port
+        self.patcher = mock.patch('serial.Serial')
+        self.mock_serial = self.patcher.start()
+        self.bus = EmulatedBus([EmulatedDevice(4265607340, 201, "WBMCM8", holding={128: 201, 129: 5})])
+        self.client = ModbusClient('/dev/ttyACM0', 115200, retry_policy=RetryPolicy(initial_timeout=0.05))
+        self.client.serial_port = self.bus
+
+    def tearDown(self):
+        self.client.close()
+        self.patcher.stop()
+
+    def test_exception_is_decoded(self):
+        """
+        Test that exception responses, timeouts and data are reported with distinct statuses.
+        """
+        result = self.client.read_result(4265607340, 0x03, 128, 3)
+        self.assertFalse(result)
+        self.assertEqual(result.status, ReadResult.EXCEPTION)
+        self.assertEqual(result.exception_code, 0x02)
+        self.assertEqual(result.exception_name, "Illegal Data Address")
+        self.assertFalse(result.cached)
+
+        result = self.client.read_result(12345678, 0x03, 128, 2)
+        self.assertEqual(result.status, ReadResult.TIMEOUT)
+
+        result = self.client.read_result(4265607340, 0x03, 128, 2)
+        self.assertTrue(result)
+        self.assertEqual(result.data, b'\x00\xC9\x00\x05')
+        self.assertIsNone(self.client.read_registers(4265607340, 0x03, 128, 3))
+
+    def test_rejected_reads_are_cached(self):
+        """
+        Test that reads covering a rejected range are answered locally until the entry expires.
+        """
+        self.client.read_result(4265607340, 0x03, 129, 2)
+        self.client.read_result(4265607340, 0x05, 0, 1)
+        requests = len(self.bus.requests)
+
+        for _ in range(10):
+            self.assertEqual(self.client.read_result(4265607340, 0x03, 128, 5).exception_code, 0x02)
+            self.assertTrue(self.client.read_result(4265607340, 0x05, 10, 1).cached)
+        self.assertEqual(len(self.bus.requests), requests)
+        self.assertEqual(self.client.negative_cache.stats["hits"], 20)
+
+        # Ranges inside the rejected one are still asked
+        self.assertTrue(self.client.read_result(4265607340, 0x03, 129, 1))
+        self.assertEqual(len(self.bus.requests), requests + 1)
+
+        with mock.patch('time.monotonic', return_value=10 ** 6):
+            result = self.client.read_result(4265607340, 0x03, 128, 5)
+        self.assertFalse(result.cached)
+        self.assertEqual(len(self.bus.requests), requests + 2)
+
+    def test_cache_invalidation(self):
+        """
+        Test that invalidated and disabled caches send every read.
+        """
+        self.client.read_result(4265607340, 0x03, 129, 2)
+        self.client.negative_cache.invalidate(4265607340)
+        self.assertFalse(self.client.read_result(4265607340, 0x03, 129, 2).cached)
+
+        self.client.negative_cache = NegativeCache(ttl=0)
+        self.client.read_result(4265607340, 0x03, 129, 2)
+        self.assertFalse(self.client.read_result(4265607340, 0x03, 129, 2).cached)
+
+if __name__ == '__main__':
+    unittest.main()
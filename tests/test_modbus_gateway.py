@@ -0,0 +1,124 @@
+from unittest import mock
+import asyncio
+import struct
+import unittest
+import serial
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.fast_modbus_gateway import ModbusTcpGateway
+
+class TestModbusTcpGateway(unittest.IsolatedAsyncioTestCase):
+    """
+    Test suite for the ModbusTcpGateway class, using a local TCP client and an emulated bus.
+    """
+
+    async def asyncSetUp(self):
+        # Mock serial.Serial to avoid needing real port
+        self.patcher = mock.patch('serial.Serial')
+        self.mock_serial = self.patcher.start()
+        self.bus = EmulatedBus([
+            EmulatedDevice(4265607340, 201, "WBMCM8", holding={128: 201, 129: 5}),
+            EmulatedDevice(113245, 4, "WBMAO4", input={0: 1000}),
+        ], turnaround=0.05)
+        self.client = ModbusClient('/dev/ttyGW0', 115200)
+        self.client.serial_port = self.bus
+        self.gateway = ModbusTcpGateway(self.client, {1: 4265607340, 4: 113245, 5: 11111111})
+        server = await self.gateway.start('127.0.0.1', 0)
+        self.port = server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        await self.gateway.stop()
+        self.client.close()
+        self.patcher.stop()
+
+    async def request(self, unit_id: int, pdu: bytes) -> bytes:
+        """
+        Send one Modbus TCP request on a new connection and return the response PDU.
+        """
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        writer.write(struct.pack('>HHHB', 7, 0, len(pdu) + 1, unit_id) + pdu)
+        header = await reader.readexactly(7)
+        transaction_id, _, length, response_unit = struct.unpack('>HHHB', header)
+        response = await reader.readexactly(length - 1)
+        writer.close()
+        self.assertEqual((transaction_id, response_unit), (7, unit_id))
+        return response
+
+    async def test_read_and_write(self):
+        """
+        Test that reads and writes are forwarded to the device mapped to the unit ID.
+        """
+        response = await self.request(1, struct.pack('>BHH', 0x03, 128, 2))
+        self.assertEqual(response, b'\x03\x04\x00\xC9\x00\x05')
+
+        response = await self.request(1, struct.pack('>BHH', 0x06, 129, 7))
+        self.assertEqual(response, struct.pack('>BHH', 0x06, 129, 7))
+        self.assertEqual(self.bus.devices[0].registers[0x03][129], 7)
+
+        response = await self.request(4, struct.pack('>BHH', 0x04, 0, 1))
+        self.assertEqual(response, b'\x04\x02\x03\xE8')
+
+    async def test_exceptions(self):
+        """
+        Test exception responses for unmapped units, unsupported functions, rejected and unanswered reads.
+        """
+        self.assertEqual(await self.request(9, struct.pack('>BHH', 0x03, 0, 1)), b'\x83\x0A')
+        self.assertEqual(await self.request(1, struct.pack('>BHH', 0x2B, 0, 1)), b'\xAB\x01')
+        # The device's own exception code is passed through
+        self.assertEqual(await self.request(1, struct.pack('>BHH', 0x03, 1000, 1)), b'\x83\x02')
+        self.assertEqual(await self.request(5, struct.pack('>BHH', 0x03, 0, 1)), b'\x83\x0B')
+
+    async def test_malformed_writes(self):
+        """
+        Test that writes with a register count out of range are rejected without touching the bus.
+        """
+        self.assertEqual(await self.request(1, struct.pack('>BHHB', 0x10, 128, 0, 0)), b'\x90\x03')
+        pdu = struct.pack('>BHHB', 0x10, 0, 124, 248) + b'\x00' * 248
+        self.assertEqual(await self.request(1, pdu), b'\x90\x03')
+        self.assertEqual(self.bus.requests, [])
+
+    async def test_bus_failure(self):
+        """
+        Test that an exception raised on the bus is answered with GATEWAY_PATH_UNAVAILABLE.
+        """
+        error = serial.SerialException("device disconnected")
+        with mock.patch.object(self.client, 'read_result', side_effect=error), \
+                mock.patch.object(self.client, 'write_result', side_effect=error):
+            response = await asyncio.wait_for(self.request(1, struct.pack('>BHH', 0x03, 128, 1)), 1)
+            self.assertEqual(response, b'\x83\x0A')
+            response = await asyncio.wait_for(self.request(1, struct.pack('>BHH', 0x06, 128, 1)), 1)
+            self.assertEqual(response, b'\x86\x0A')
+
+    async def test_concurrent_reads_are_coalesced(self):
+        """
+        Test that identical reads from several clients share one bus transaction.
+        """
+        pdu = struct.pack('>BHH', 0x03, 128, 1)
+        responses = await asyncio.gather(*[self.request(1, pdu) for _ in range(5)])
+        self.assertEqual(responses, [b'\x03\x02\x00\xC9'] * 5)
+        self.assertEqual(len(self.bus.requests), 1)
+
+    async def test_fresh_values_are_served_from_cache(self):
+        """
+        Test that reads within max_age of a covering read do not touch the bus.
+        """
+        self.gateway.max_age = 10
+        await self.request(1, struct.pack('>BHH', 0x03, 128, 2))
+        response = await self.request(1, struct.pack('>BHH', 0x03, 129, 1))
+        self.assertEqual(response, b'\x03\x02\x00\x05')
+        self.assertEqual(len(self.bus.requests), 1)
+
+        await self.request(1, struct.pack('>BHH', 0x06, 129, 9))
+        response = await self.request(1, struct.pack('>BHH', 0x03, 129, 1))
+        self.assertEqual(response, b'\x03\x02\x00\x09')
+        self.assertEqual(len(self.bus.requests), 3)
+
+    async def test_rejected_writes_pass_the_exception_through(self):
+        """
+        Test that a write the device rejects is answered with the device's exception code.
+        """
+        response = await self.request(1, struct.pack('>BHH', 0x06, 5000, 1))
+        self.assertEqual(response, b'\x86\x02')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+from unittest import mock
+import unittest
+from unittest.mock import MagicMock
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.fast_modbus_scheduler import PollScheduler, PollTask
+
+class FakeClock:
+    """
+    A manually advanced clock standing in for time.monotonic and time.sleep.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.now += delay
+
+class TestPollScheduler(unittest.TestCase):
+    """
+    Test suite for the PollScheduler class.
+    """
+
+    def setUp(self):
+        # Mock serial.Serial to avoid needing real port
+        self.patcher = mock.patch('serial.Serial')
+        self.mock_serial = self.patcher.start()
+        self.client = ModbusClient('/dev/ttyACM0', 115200)
+        self.clock = FakeClock()
+        self.order = []
+
+        def read_registers(serial_number, command, register, count):
+            self.order.append(serial_number)
+            self.clock.now += 0.01
+            return b'\x00\x01' * count
+
+        self.client.read_registers = MagicMock(side_effect=read_registers)
+        self.scheduler = PollScheduler(self.client, clock=self.clock, sleep=self.clock.sleep)
+
+    def tearDown(self):
+        self.client.close()
+        self.patcher.stop()
+
+    def test_airtime_and_feasibility(self):
+        """
+        Test that transaction airtime follows the baud rate and overloaded plans are rejected.
+        """
+        airtime = self.scheduler.read_airtime(10)
+        expected = (14 + 3.5 + 31 + 3.5) * 10 / 115200 + self.client.retry_policy.min_timeout
+        self.assertAlmostEqual(airtime, expected)
+
+        self.scheduler.add_poll(1, 0x03, 0, 10, period=0.05)
+        with self.assertRaises(ValueError):
+            self.scheduler.add_poll(2, 0x03, 0, 10, period=0.02)
+        with self.assertRaises(ValueError):
+            self.scheduler.add_poll(3, 0x03, 0, 10, period=1.0, deadline=0.001)
+        self.assertEqual(len(self.scheduler.tasks), 1)
+
+    def test_infeasible_plan_is_rejected(self):
+        """
+        Test that a plan within the utilization limit is rejected if released reads would miss a deadline.
+        """
+        first = PollTask(1, 0x03, 0, 1, period=1.0, deadline=0.05, airtime=0.04)
+        self.scheduler.add_task(first)
+        with self.assertRaises(ValueError) as raised:
+            self.scheduler.add_task(PollTask(2, 0x03, 0, 1, period=1.0, deadline=0.05, airtime=0.04))
+        self.assertIn("miss deadlines", str(raised.exception))
+        self.assertLess(self.scheduler.utilization(), 0.1)
+
+        # A long read with a late deadline blocks a short one that is released just after it starts
+        self.scheduler.remove_task(first)
+        self.scheduler.add_task(PollTask(3, 0x03, 0, 1, period=0.1, deadline=0.02, airtime=0.005))
+        with self.assertRaises(ValueError):
+            self.scheduler.add_task(PollTask(4, 0x03, 0, 1, period=10.0, deadline=10.0, airtime=0.03))
+        self.scheduler.add_task(PollTask(5, 0x03, 0, 1, period=1.0, deadline=0.1, airtime=0.01))
+        self.assertEqual(len(self.scheduler.tasks), 2)
+
+    def test_earliest_deadline_first_without_drift(self):
+        """
+        Test that released reads run by deadline and releases stay on the period grid.
+        """
+        results = []
+        self.scheduler.add_poll(1, 0x03, 0, 1, period=1.0, callback=lambda task, data: results.append(data))
+        self.scheduler.add_poll(2, 0x03, 0, 1, period=0.1, deadline=0.05)
+
+        self.scheduler.run(duration=0.95)
+
+        self.assertEqual(self.order[:2], [2, 1])
+        self.assertEqual(self.order.count(2), 10)
+        self.assertEqual(self.order.count(1), 1)
+        self.assertEqual(results, [b'\x00\x01'])
+        self.assertAlmostEqual(self.scheduler.tasks[1].next_release, 1.0)
+        self.assertEqual([stats['misses'] for stats in self.scheduler.stats()], [0, 0])
+
+    def test_deadline_misses_are_reported(self):
+        """
+        Test that late completions and skipped releases are counted as misses.
+        """
+        # The reads take 10 ms, twice their budgeted airtime
+        task = self.scheduler.add_task(PollTask(1, 0x03, 0, 1, period=0.1, deadline=0.015, airtime=0.005))
+        self.scheduler.add_task(PollTask(2, 0x03, 0, 1, period=0.1, deadline=0.015, airtime=0.005))
+
+        self.scheduler.run_pending()
+        self.assertEqual(sum(stats['misses'] for stats in self.scheduler.stats()), 1)
+
+        self.clock.now = 0.35
+        self.scheduler.run_pending()
+        self.assertEqual(task.misses, 3)
+        self.assertAlmostEqual(task.next_release, 0.4)
+
+    def test_event_slot(self):
+        """
+        Test that event requests are interleaved and follow the reported device and flag.
+        """
+        event_reader = MagicMock()
+        event_reader.request_events.side_effect = [
+            {'packet_info': {'device_id': 201, 'flag': 1}, 'events': [{'event_type': 2}]},
+            {},
+        ]
+        self.scheduler.add_event_slot(event_reader, period=0.5, max_data_length=50)
+        self.scheduler.run(duration=0.9)
+
+        self.assertEqual(event_reader.request_events.call_args_list,
+                         [mock.call(1, 50, 0, 0), mock.call(1, 50, 201, 1)])
+
+if __name__ == '__main__':
+    unittest.main()
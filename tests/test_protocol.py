@@ -0,0 +1,121 @@
+import unittest
+from fastmodbuslibrary import protocol
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice
+
+class TestProtocol(unittest.TestCase):
+    """
+    Test suite for the I/O-free encoding and decoding of the protocol module.
+    """
+
+    EVENT_FRAME = (b'\xC9\x46\x11\x00\x05\x1B\x01\x02\x00\x00\x01\x02\x04\x01\xD0\x0C\x00\x02\x04\x01\xE0\x03\x00'
+                   b'\x02\x04\x01\xF0\x0B\x00\x00\x0F\x00\x00\x5C\xD2')
+
+    def setUp(self):
+        """
+        Set up an emulated bus used as an independent implementation of the frames.
+        """
+        self.device = EmulatedDevice(0xFE8B7C42, 0xC9, holding={10: 0x1234, 11: 0xABCD}, events={(0x03, 10)})
+        self.bus = EmulatedBus([self.device])
+
+    def with_crc(self, frame: bytes) -> bytes:
+        """
+        Append the CRC to a frame.
+        """
+        return frame + protocol.CRC.pack(protocol.crc16(frame))
+
+    def test_crc(self):
+        """
+        Test the CRC against a known frame and its rejection of corrupted frames.
+        """
+        self.assertEqual(self.with_crc(b'\xFD\x46\x12'), b'\xFD\x46\x12\x52\x5D')
+        self.assertTrue(protocol.check_crc(self.EVENT_FRAME))
+        self.assertFalse(protocol.check_crc(self.EVENT_FRAME[:-1] + b'\x00'))
+        self.assertFalse(protocol.check_crc(b'\x00\x00'))
+        self.assertEqual(protocol.crc16(self.EVENT_FRAME, len(self.EVENT_FRAME) - 2), 0xD25C)
+
+    def test_read_round_trip(self):
+        """
+        Test encoding a read request and decoding the emulated response, including exceptions.
+        """
+        request = protocol.encode_read_request(0xFE8B7C42, 0x03, 10, 2)
+        self.assertEqual(request, b'\xFD\x46\x08\xFE\x8B\x7C\x42\x03\x00\x0A\x00\x02')
+        self.assertEqual(len(self.with_crc(request)), protocol.READ_REQUEST_LENGTH)
+
+        response = self.with_crc(self.bus.respond(request))
+        self.assertEqual(len(response), protocol.READ_RESPONSE_OVERHEAD + protocol.data_length(0x03, 2))
+        self.assertEqual(protocol.decode_read_response(response, 0x03, 2), (b'\x12\x34\xAB\xCD', None))
+        # A response of another length or function is rejected
+        self.assertEqual(protocol.decode_read_response(response, 0x03, 3), (None, None))
+        self.assertEqual(protocol.decode_read_response(response, 0x04, 2), (None, None))
+
+        response = self.with_crc(self.bus.respond(protocol.encode_read_request(0xFE8B7C42, 0x03, 12, 1)))
+        self.assertEqual(len(response), protocol.EXCEPTION_RESPONSE_LENGTH)
+        self.assertEqual(protocol.decode_read_response(response, 0x03, 1), (None, 0x02))
+        self.assertEqual(protocol.decode_read_response(response[:5], 0x03, 1), (None, None))
+
+    def test_data_length(self):
+        """
+        Test the byte count of register and packed bit reads.
+        """
+        self.assertEqual(protocol.data_length(0x03, 4), 8)
+        self.assertEqual(protocol.data_length(0x01, 1), 1)
+        self.assertEqual(protocol.data_length(0x02, 9), 2)
+
+    def test_write_round_trip(self):
+        """
+        Test encoding a write request, in place and not, and decoding the emulated confirmation.
+        """
+        request = protocol.encode_write_request(0xFE8B7C42, 0x10, 10, b'\x00\x01\x00\x02')
+        buffer = bytearray(64)
+        self.assertEqual(bytes(protocol.encode_write_request_into(buffer, 0xFE8B7C42, 0x10, 10, 2,
+                                                                  b'\x00\x01\x00\x02')), request)
+
+        response = self.with_crc(self.bus.respond(request))
+        self.assertEqual(len(response), protocol.WRITE_RESPONSE_LENGTH)
+        self.assertEqual(protocol.decode_write_response(response, 0xFE8B7C42, 0x10, 10, 2), (True, None))
+        self.assertFalse(protocol.decode_write_response(response, 0xFE8B7C42, 0x10, 11, 2)[0])
+        self.assertEqual([self.device.registers[0x03][10], self.device.registers[0x03][11]], [1, 2])
+
+        response = self.with_crc(self.bus.respond(protocol.encode_write_request(0xFE8B7C42, 0x10, 20, b'\x00\x01')))
+        self.assertEqual(protocol.decode_write_response(response, 0xFE8B7C42, 0x10, 20, 1), (False, 0x02))
+
+    def test_scan_response(self):
+        """
+        Test decoding a scan response and rejecting the end of a scan.
+        """
+        self.assertEqual(protocol.encode_command(protocol.SCAN_START), b'\xFD\x46\x01')
+        response = self.with_crc(b'\xFD\x46\x03\xFE\x8B\x7C\x42\xC9')
+        self.assertEqual(protocol.decode_scan_response(response), (0xFE8B7C42, 0xC9))
+        self.assertIsNone(protocol.decode_scan_response(self.with_crc(b'\xFD\x46\x04')))
+
+    def test_events(self):
+        """
+        Test decoding the header and events of a known event frame.
+        """
+        self.assertEqual(protocol.encode_event_request(1, 100, 0, 0), b'\xFD\x46\x10\x01\x64\x00\x00')
+        self.assertEqual(protocol.decode_event_header(self.EVENT_FRAME), (0xC9, 0, 5, 27))
+        self.assertEqual(list(protocol.iter_events(self.EVENT_FRAME, 5)),
+                         [(2, 0, 1, 1), (4, 464, 2, 12), (4, 480, 2, 3), (4, 496, 2, 11), (0x0F, 0, 0, 0)])
+        # A truncated frame yields only its complete events
+        self.assertEqual(len(list(protocol.iter_events(self.EVENT_FRAME[:14], 5))), 1)
+        self.assertIsNone(protocol.decode_event_header(self.with_crc(b'\xFD\x46\x12')))
+
+    def test_config_events(self):
+        """
+        Test encoding an event configuration and decoding the emulated mask.
+        """
+        request = protocol.encode_config_events(0xC9, [(0x03, 10, [1, 1])])
+        self.assertEqual(request, b'\xC9\x46\x18\x06\x03\x00\x0A\x02\x01\x01')
+        response = self.with_crc(self.bus.respond(request))
+        self.assertEqual(protocol.decode_config_response(response), b'\x01')
+        self.assertIsNone(protocol.decode_config_response(response[:3]))
+
+    def test_rtu_write(self):
+        """
+        Test encoding a standard RTU broadcast write of multiple registers.
+        """
+        self.assertEqual(protocol.encode_rtu_write(protocol.RTU_BROADCAST_ID, 10, b'\x00\x05'),
+                         b'\x00\x10\x00\x0A\x00\x01\x02\x00\x05')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+from unittest import mock
+import unittest
+from unittest.mock import patch, MagicMock
+from fastmodbuslibrary import register_codec
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.register_codec import RegisterCodec
+
+class TestRegisterCodec(unittest.TestCase):
+    """
+    Test suite for the RegisterCodec class, with and without NumPy.
+    """
+
+    BLOCK = b'\xFF\xFE\x00\x01\x3F\xC0\x00\x00'
+
+    def check_codec(self):
+        """
+        Check decoding and encoding with the currently available backend.
+        """
+        self.assertEqual(list(RegisterCodec('int16').decode(self.BLOCK)), [-2, 1, 16320, 0])
+        self.assertEqual(list(RegisterCodec('uint32').decode(self.BLOCK)), [0xFFFE0001, 0x3FC00000])
+        self.assertEqual(list(RegisterCodec('uint32', 'little').decode(self.BLOCK)), [0x0001FFFE, 0x00003FC0])
+        self.assertEqual(list(RegisterCodec('float32').decode(self.BLOCK[4:])), [1.5])
+        self.assertEqual(list(RegisterCodec('int16', scale=0.1, offset=1).decode(self.BLOCK[:4])),
+                         [-2 * 0.1 + 1, 1 * 0.1 + 1])
+
+        codec = RegisterCodec('int32', 'little')
+        self.assertEqual(codec.encode([-2, 70000]), b'\xFF\xFE\xFF\xFF\x11\x70\x00\x01')
+        self.assertEqual(list(codec.decode(codec.encode([-2, 70000]))), [-2, 70000])
+        self.assertEqual(RegisterCodec('uint16', scale=0.1).encode([20.0, 0.5]), b'\x00\xC8\x00\x05')
+        # Float raw types are not rounded
+        self.assertEqual(RegisterCodec('float32', scale=0.1).encode([1.25]), b'\x41\x48\x00\x00')
+        self.assertEqual(list(RegisterCodec('float32', scale=0.1).decode(b'\x41\x48\x00\x00')), [1.25])
+
+        for codec, values in ((RegisterCodec('int16'), [1, 70000]), (RegisterCodec('uint16'), [-1]),
+                              (RegisterCodec('int16', scale=0.1), [4000])):
+            with self.assertRaises(ValueError):
+                codec.encode(values)
+
+        blocks = RegisterCodec('uint16').decode_blocks([self.BLOCK[:2], None, self.BLOCK[2:6]])
+        self.assertEqual([None if block is None else list(block) for block in blocks], [[65534], None, [1, 16320]])
+
+        with self.assertRaises(ValueError):
+            RegisterCodec('uint32').decode(self.BLOCK[:6])
+
+    def test_codec_numpy(self):
+        """
+        Test the codec using NumPy when it is installed.
+        """
+        if register_codec.np is None:
+            self.skipTest("NumPy is not installed")
+        self.check_codec()
+
+    def test_codec_array(self):
+        """
+        Test the codec using the array module fallback.
+        """
+        with patch.object(register_codec, 'np', None):
+            self.check_codec()
+
+    @patch('fastmodbuslibrary.common.ModbusCommon.send_command')
+    @patch('fastmodbuslibrary.common.ModbusCommon.wait_for_response')
+    def test_client_typed_access(self, mock_wait_for_response, mock_send_command):
+        """
+        Test reading and writing typed values through ModbusClient.
+        """
+        with mock.patch('serial.Serial'):
+            client = ModbusClient('/dev/ttyACM0', 9600)
+        client.serial_port = MagicMock()
+        mock_wait_for_response.return_value = True
+
+        client.serial_port.read.return_value = b'\xFD\x46\x09\xFE\x40\x00\xAC\x03\x02\x00\xC9\x88\x16'
+        self.assertEqual(list(client.read_values(4265607340, 0x03, 128, 1, RegisterCodec('int16'))), [201])
+
+        client.serial_port.read.return_value = b'\xFD\x46\x09\xFE\x40\x00\xAC\x10\x00\x80\x00\x01\x04\x65'
+        self.assertTrue(client.write_values(4265607340, 0x10, 128, [201], RegisterCodec('int16')))
+        self.assertTrue(mock_send_command.call_args.args[0].endswith(b'\x00\x01\x02\x00\xC9'))
+        client.close()
+
+if __name__ == '__main__':
+    unittest.main()
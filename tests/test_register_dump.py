@@ -0,0 +1,72 @@
+from unittest import mock
+import unittest
+from fastmodbuslibrary.device_profiles import ProfileDatabase
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.register_dump import RegisterDumper
+
+class TestRegisterDumper(unittest.TestCase):
+    """
+    Test suite for the RegisterDumper class, using an emulated bus.
+    """
+
+    def setUp(self):
+        # Mock serial.Serial to avoid needing real port
+        self.patcher = mock.patch('serial.Serial')
+        self.mock_serial = self.patcher.start()
+        holding = {address: address for address in range(0, 10)}
+        holding.update({128: 201, 129: 5, 700: 1})
+        self.bus = EmulatedBus([EmulatedDevice(4265607340, 201, "WBMCM8", holding=holding,
+                                               input={address: 1000 + address for address in range(250, 300)})])
+        self.client = ModbusClient('/dev/ttyACM0', 115200)
+        self.client.serial_port = self.bus
+        self.dumper = RegisterDumper(self.client)
+
+    def tearDown(self):
+        self.client.close()
+        self.patcher.stop()
+
+    def test_dump_finds_valid_ranges(self):
+        """
+        Test that bisection finds every valid range with its values, skipping unsupported spaces.
+        """
+        result = self.dumper.dump(4265607340, ranges=[(0, 1000)])
+
+        self.assertEqual(result["spaces"]["coil"], [])
+        self.assertEqual(result["spaces"]["discrete"], [])
+        self.assertEqual([(r["start"], r["count"]) for r in result["spaces"]["holding"]],
+                         [(0, 10), (128, 2), (200, 20), (700, 1)])
+        self.assertEqual(result["spaces"]["holding"][1]["values"], [201, 5])
+        self.assertEqual(result["spaces"]["input"],
+                         [{"start": 250, "count": 50, "values": [1000 + address for address in range(250, 300)]}])
+        self.assertEqual(result["requests"], len(self.bus.requests))
+        # Bisection costs at most two requests per address of the two register spaces,
+        # while coil and discrete reads are rejected once each
+        self.assertLessEqual(result["requests"], 2 * 2000 + 2)
+        self.assertEqual(result["unanswered"], {"coil": [], "discrete": [], "holding": [], "input": []})
+
+    def test_unanswered_blocks(self):
+        """
+        Test that unanswered blocks are reported apart from missing ones and do not quarantine the device.
+        """
+        self.client.retry_policy.initial_timeout = 0.01
+        result = self.dumper.dump(11111111, spaces=["holding"], ranges=[(0, 500)])
+        self.assertEqual(result["spaces"]["holding"], [])
+        self.assertEqual(result["unanswered"]["holding"], [(0, 125), (125, 125), (250, 125), (375, 125)])
+        self.assertEqual(len(self.bus.requests), 4)
+        self.assertEqual(self.client.retry_policy.health.quarantined(), [])
+        self.assertNotIn(11111111, self.client.retry_policy.health.exempt)
+
+    def test_dump_as_profile(self):
+        """
+        Test that a dump becomes a profile compiling into block reads of the valid ranges.
+        """
+        result = self.dumper.dump(4265607340, spaces=["holding"], ranges=[(100, 250)])
+        database = ProfileDatabase(max_gap=0)
+        database.add_profile(RegisterDumper.to_profile(result, "WBMCM8"))
+        plan = database.plan("WBMCM8")
+        self.assertEqual([(b.function, b.register, b.count) for b in plan.blocks], [(3, 128, 2), (3, 200, 20)])
+        self.assertEqual(plan.read(self.client, 4265607340)["holding_129"], 5)
+
+if __name__ == '__main__':
+    unittest.main()
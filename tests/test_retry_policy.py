@@ -0,0 +1,111 @@
+from unittest import mock
+import unittest
+from unittest.mock import patch, MagicMock
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.retry_policy import RetryPolicy, RttEstimator
+
+class TestRetryPolicy(unittest.TestCase):
+    """
+    Test suite for the RetryPolicy class and its use by ModbusClient.
+    """
+
+    def setUp(self):
+        # Mock serial.Serial to avoid needing real port
+        self.patcher = mock.patch('serial.Serial')
+        self.mock_serial = self.patcher.start()
+        self.client = ModbusClient('/dev/ttyACM0', 115200)
+        self.client.serial_port = MagicMock()
+
+    def tearDown(self):
+        self.client.close()
+        self.patcher.stop()
+
+    def test_timeout_converges_on_healthy_device(self):
+        """
+        Test that a device answering quickly gets a timeout of tens of milliseconds.
+        """
+        policy = RetryPolicy()
+        self.assertEqual(policy.timeout(1), 1.0)
+
+        for _ in range(50):
+            policy.record_success(1, 0.003)
+
+        self.assertLess(policy.timeout(1), 0.05)
+        self.assertEqual(policy.stats[1]['success'], 50)
+
+    def test_backoff_is_bounded(self):
+        """
+        Test that timeouts double on missing responses but stay within the upper bound.
+        """
+        estimator = RttEstimator(0.1, 0.01, 0.5)
+        estimator.backoff()
+        self.assertAlmostEqual(estimator.rto, 0.2)
+        for _ in range(5):
+            estimator.backoff()
+        self.assertEqual(estimator.rto, 0.5)
+
+    def test_dead_device_timeout_is_capped(self):
+        """
+        Test that a device that never answers costs a multiple of the bus RTT, not max_timeout.
+        """
+        policy = RetryPolicy()
+        for _ in range(20):
+            policy.record_success(1, 0.003)
+
+        for _ in range(10):
+            policy.record_timeout(2)
+            self.assertLess(policy.timeout(2), 0.1)
+
+        # A device that answered before may back off above its own estimate, but not to max_timeout
+        for _ in range(10):
+            policy.record_timeout(1)
+        self.assertLess(policy.timeout(1), 0.1)
+
+    @patch('fastmodbuslibrary.common.ModbusCommon.send_command')
+    @patch('fastmodbuslibrary.common.ModbusCommon.wait_for_response')
+    def test_response_with_preamble(self, mock_wait_for_response, mock_send_command):
+        """
+        Test that a valid response preceded by 0xFF arbitration bytes is accepted.
+        """
+        mock_wait_for_response.return_value = True
+        self.client.serial_port.read.return_value = b'\xFF\xFF' + b'\xFD\x46\x09\xFE\x40\x00\xAC\x03\x02\x00\xC9\x88\x16'
+
+        result = self.client.read_registers(4265607340, 0x03, 128, 1)
+        self.assertEqual(result, b'\x00\xC9')
+        self.assertEqual(mock_send_command.call_count, 1)
+
+    @patch('fastmodbuslibrary.common.ModbusCommon.send_command')
+    @patch('fastmodbuslibrary.common.ModbusCommon.wait_for_response')
+    def test_crc_error_retransmits_immediately(self, mock_wait_for_response, mock_send_command):
+        """
+        Test that a corrupted response is retransmitted without waiting for the timeout.
+        """
+        mock_wait_for_response.return_value = True
+        self.client.serial_port.read.side_effect = [
+            b'\xFD\x46\x09\xFE\x40\x00\xAC\x03\x02\x00\xC9\x00\x00',  # Invalid CRC
+            b'\xFD\x46\x09\xFE\x40\x00\xAC\x03\x02\x00\xC9\x88\x16'
+        ]
+
+        result = self.client.read_registers(4265607340, 0x03, 128, 1)
+        self.assertEqual(result, b'\x00\xC9')
+        self.assertEqual(mock_send_command.call_count, 2)
+        self.assertEqual(self.client.retry_policy.stats[4265607340]['crc_error'], 1)
+
+    @patch('fastmodbuslibrary.common.ModbusCommon.send_command')
+    @patch('fastmodbuslibrary.common.ModbusCommon.wait_for_response')
+    def test_timeout_uses_retry_budget(self, mock_wait_for_response, mock_send_command):
+        """
+        Test that an unanswered request is retried according to the configured budget.
+        """
+        self.client.retry_policy = RetryPolicy(max_retries=2)
+        mock_wait_for_response.return_value = False
+
+        result = self.client.read_registers(4265607340, 0x03, 128, 1)
+        self.assertIsNone(result)
+        self.assertEqual(mock_send_command.call_count, 3)
+
+        timeouts = [call.args[0] for call in mock_wait_for_response.call_args_list]
+        self.assertLess(timeouts[0], timeouts[1])
+
+if __name__ == '__main__':
+    unittest.main()
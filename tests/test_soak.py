@@ -0,0 +1,73 @@
+import tracemalloc
+import unittest
+from fastmodbuslibrary.soak import SoakBus, SoakHarness
+
+class TestSoak(unittest.TestCase):
+    """
+    Test suite for the allocation and latency budgets of the acquisition roles.
+
+    These are short runs of the soak harness; benchmarks/soak.py runs it for millions of transactions.
+    """
+
+    def setUp(self):
+        self.bus = SoakBus()
+        self.harness = SoakHarness(transactions=2000, memory_transactions=2000, warmup=200, sample_interval=1)
+        self.history = []
+
+    def tearDown(self):
+        self.bus.close()
+
+    def check_memory(self, name: str, transaction, harness: SoakHarness = None):
+        """
+        Soak a transaction and check its memory budget; latency budgets are left to benchmarks/soak.py,
+        since wall-clock bounds depend on the load of the machine.
+        """
+        harness = harness or self.harness
+        budgets = {"bytes_per_transaction": SoakHarness.DEFAULT_BUDGETS[name]["bytes_per_transaction"]}
+        report = harness.run(name, transaction, budgets)
+        self.assertEqual(report["violations"], [])
+        self.assertGreater(report["p99"], 0)
+
+    def test_client_budget(self):
+        """
+        Test that register reads keep no memory.
+        """
+        self.check_memory("client", self.bus.read)
+        self.assertEqual(len(self.bus.bus.requests), SoakBus.MAX_REQUESTS)
+
+    def test_event_reader_budget(self):
+        """
+        Test that event polls keep no memory.
+        """
+        self.check_memory("events", self.bus.poll_events)
+
+    def test_scanner_budget(self):
+        """
+        Test that scans find every device and keep no memory.
+        """
+        self.check_memory("scanner", self.bus.scan,
+                          SoakHarness(transactions=200, memory_transactions=200, warmup=20, sample_interval=1))
+
+    def leaky_transaction(self):
+        """
+        A transaction keeping 64 bytes and getting slower with every call.
+        """
+        self.history.append(bytes(64))
+        sum(len(entry) for entry in self.history)
+
+    def test_regressions_are_reported(self):
+        """
+        Test that a leak, a slowdown and a missed latency budget are reported as violations.
+        """
+        harness = SoakHarness(transactions=2000, memory_transactions=500, warmup=100, sample_interval=1,
+                              filters=[tracemalloc.Filter(True, __file__)])
+        report = harness.run("leaky", self.leaky_transaction,
+                             {"bytes_per_transaction": 1.0, "drift": 1.5, "p99": 0.0})
+        self.assertGreaterEqual(report["bytes_per_transaction"], 64)
+        self.assertGreater(report["drift"], 1.5)
+        self.assertEqual([violation.split()[1] for violation in report["violations"]],
+                         ["bytes_per_transaction", "drift", "p99"])
+        self.assertIs(harness.stats["leaky"], report)
+
+if __name__ == '__main__':
+    unittest.main()
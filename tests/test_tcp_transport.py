@@ -0,0 +1,74 @@
+import socket
+import threading
+import time
+import unittest
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice, TcpBus
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.fast_modbus_events import ModbusEventReader
+from fastmodbuslibrary.tcp_transport import TcpTransport
+
+class TestTcpTransport(unittest.TestCase):
+    """
+    Test suite for the TCP transport, using emulated serial device servers on local sockets.
+    """
+
+    def setUp(self):
+        self.servers = [
+            TcpBus(EmulatedBus([EmulatedDevice(4265607340, 201, "WBMCM8", holding={128: 201})], turnaround=0.1)),
+            TcpBus(EmulatedBus([EmulatedDevice(113245, 4, "WBMAO4", input={0: 1000})], turnaround=0.1)),
+        ]
+
+    def tearDown(self):
+        for server in self.servers:
+            server.close()
+
+    def test_roles_share_one_connection(self):
+        """
+        Test that reads and writes go over TCP and roles on the same server channel share one connection.
+        """
+        server = self.servers[0]
+        with ModbusClient(server.device, 115200) as client, ModbusEventReader(server.device, 115200) as events:
+            self.assertIsInstance(client.serial_port, TcpTransport)
+            self.assertIs(client.serial_port, events.serial_port)
+            self.assertEqual(client.read_registers(4265607340, 0x03, 128, 1), b'\x00\xC9')
+            self.assertTrue(client.write_registers(4265607340, 0x10, 128, [7]))
+            self.assertEqual(client.read_registers(4265607340, 0x03, 128, 1), b'\x00\x07')
+            self.assertEqual(client.serial_port.port.socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY), 1)
+            self.assertEqual(len(server.connections), 1)
+
+    def test_reconnect_after_server_drop(self):
+        """
+        Test that a connection dropped by the server is reestablished by the next transaction.
+        """
+        server = self.servers[0]
+        with ModbusClient(server.device, 115200) as client:
+            self.assertEqual(client.read_registers(4265607340, 0x03, 128, 1), b'\x00\xC9')
+            server.connections[0].shutdown(socket.SHUT_RDWR)
+            self.assertEqual(client.read_registers(4265607340, 0x03, 128, 1), b'\x00\xC9')
+            self.assertEqual(len(server.connections), 2)
+
+    def test_concurrent_buses(self):
+        """
+        Test that buses behind different servers are driven concurrently from one process.
+        """
+        results = {}
+
+        def poll(server, serial_number, command, register):
+            with ModbusClient(server.device, 115200) as client:
+                results[serial_number] = [client.read_registers(serial_number, command, register, 1) for _ in range(3)]
+
+        threads = [threading.Thread(target=poll, args=(self.servers[0], 4265607340, 0x03, 128)),
+                   threading.Thread(target=poll, args=(self.servers[1], 113245, 0x04, 0))]
+        start_time = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start_time
+
+        self.assertEqual(results[4265607340], [b'\x00\xC9'] * 3)
+        self.assertEqual(results[113245], [b'\x03\xE8'] * 3)
+        self.assertLess(elapsed, 0.55)
+
+if __name__ == '__main__':
+    unittest.main()
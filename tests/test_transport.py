@@ -0,0 +1,172 @@
+from unittest import mock
+import gc
+import sys
+import unittest
+import serial
+import serial.rs485
+from fastmodbuslibrary.emulator import EmulatedBus, EmulatedDevice, PtyBus
+from fastmodbuslibrary.fast_modbus_client import ModbusClient
+from fastmodbuslibrary.fast_modbus_events import ModbusEventReader
+from fastmodbuslibrary.fast_modbus_scanner import ModbusScanner
+from fastmodbuslibrary.transport import SerialTransport, TransportRegistry, registry
+
+class TestTransportRegistry(unittest.TestCase):
+    """
+    Test suite for the shared transport registry.
+    """
+
+    def setUp(self):
+        # Mock serial.Serial to avoid needing real port
+        self.patcher = mock.patch('serial.Serial')
+        self.mock_serial = self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_roles_share_one_lazily_opened_port(self):
+        """
+        Test that roles on the same device share one transport and open the port only on use.
+        """
+        client = ModbusClient('/dev/ttyUSB7', 9600)
+        event_reader = ModbusEventReader('/dev/ttyUSB7', 9600)
+
+        self.assertIs(client.serial_port, event_reader.serial_port)
+        self.assertIs(registry.transports['/dev/ttyUSB7'], client.serial_port)
+        self.assertEqual(client.serial_port.refcount, 2)
+        self.mock_serial.assert_not_called()
+
+        client.serial_port.write(b'\x01')
+        event_reader.serial_port.write(b'\x02')
+        self.mock_serial.assert_called_once()
+
+        transport = client.serial_port
+        client.close()
+        self.assertTrue(transport.is_open)
+        event_reader.close()
+        self.assertFalse(transport.is_open)
+        self.assertNotIn('/dev/ttyUSB7', registry.transports)
+
+    def test_baudrate_change(self):
+        """
+        Test that a shared device cannot be acquired at another rate and that an explicit change reaches every holder.
+        """
+        local_registry = TransportRegistry()
+        transport = local_registry.acquire('/dev/ttyUSB7', 9600)
+        transport.write(b'\x01')
+        with self.assertRaises(ValueError):
+            local_registry.acquire('/dev/ttyUSB7', 115200)
+        self.assertEqual((transport.baudrate, transport.refcount), (9600, 1))
+        local_registry.clear()
+
+        with ModbusClient('/dev/ttyUSB7', 9600) as client, ModbusEventReader('/dev/ttyUSB7', 9600) as event_reader:
+            with self.assertRaises(ValueError):
+                ModbusScanner('/dev/ttyUSB7', 115200)
+            client.serial_port.set_baudrate(115200)
+            self.assertEqual((client.baudrate, event_reader.baudrate), (115200, 115200))
+            self.assertIs(ModbusScanner('/dev/ttyUSB7', 115200).serial_port, client.serial_port)
+        self.assertEqual(local_registry.transports, {})
+
+    def test_release_without_close(self):
+        """
+        Test that roles release their reference when leaving a with block or being collected.
+        """
+        with ModbusClient('/dev/ttyUSB8', 9600) as client:
+            transport = client.serial_port
+            self.assertEqual(transport.refcount, 1)
+        self.assertEqual(transport.refcount, 0)
+        self.assertNotIn('/dev/ttyUSB8', registry.transports)
+
+        client = ModbusClient('/dev/ttyUSB8', 9600)
+        del client
+        gc.collect()
+        self.assertNotIn('/dev/ttyUSB8', registry.transports)
+
+    def test_reconnect_after_disconnect(self):
+        """
+        Test that a write failing on a vanished port is repeated on a reopened port.
+        """
+        broken_port = mock.MagicMock()
+        broken_port.write.side_effect = serial.SerialException("device disconnected")
+        new_port = mock.MagicMock()
+        new_port.write.return_value = 3
+        self.mock_serial.side_effect = [broken_port, new_port]
+
+        transport = SerialTransport('/dev/ttyUSB7', 9600)
+        self.assertEqual(transport.write(b'\x01\x02\x03'), 3)
+        broken_port.close.assert_called_once()
+        new_port.write.assert_called_once_with(b'\x01\x02\x03')
+
+    def test_reconnect_gives_up(self):
+        """
+        Test that the error is raised once the port cannot be reopened.
+        """
+        self.mock_serial.side_effect = serial.SerialException("no such device")
+
+        transport = SerialTransport('/dev/ttyUSB7', 9600)
+        transport.RECONNECT_DELAY = 0
+        with self.assertRaises(serial.SerialException):
+            transport.read(256)
+        self.assertEqual(self.mock_serial.call_count, transport.RECONNECT_ATTEMPTS + 1)
+
+    def test_low_latency_profile(self):
+        """
+        Test that the low-latency profile tunes the driver on open and drains every write.
+        """
+        port = self.mock_serial.return_value
+        port.write.return_value = 3
+        transport = SerialTransport('/dev/ttyUSB7', 9600)
+        settings = serial.rs485.RS485Settings(delay_before_tx=0.0005, delay_before_rx=0.0005)
+        self.assertEqual(transport.set_low_latency(rs485=settings), {"low_latency": False, "rs485": False})
+
+        self.assertEqual(transport.write(b'\x01\x02\x03'), 3)
+        port.set_low_latency_mode.assert_called_once_with(True)
+        self.assertIs(port.rs485_mode, settings)
+        port.flush.assert_called_once()
+
+        port.set_low_latency_mode.side_effect = ValueError("not a serial driver")
+        self.assertEqual(transport.set_low_latency(), {"low_latency": False, "rs485": False})
+        transport.close()
+
+@unittest.skipIf(sys.platform == 'win32', "pseudo-terminals are not available")
+class TestPtyTransport(unittest.TestCase):
+    """
+    Test suite for transports on a real serial port, served by an emulated bus on a pseudo-terminal.
+    """
+
+    def setUp(self):
+        self.pty = PtyBus(EmulatedBus([EmulatedDevice(4265607340, 201, "WBMCM8", holding={128: 201})]))
+
+    def tearDown(self):
+        self.pty.close()
+
+    def test_low_latency_transactions(self):
+        """
+        Test that transactions work in low-latency mode on a port without driver support and report the turnaround.
+        """
+        with ModbusClient(self.pty.device, 115200) as client:
+            client.serial_port.set_low_latency()
+            for _ in range(5):
+                self.assertEqual(client.read_registers(4265607340, 0x03, 128, 1), b'\x00\xC9')
+            turnaround = client.retry_policy.turnaround()
+            self.assertEqual(turnaround["samples"], 5)
+            self.assertLess(turnaround["min"], 0.5)
+
+    def test_termios_transport(self):
+        """
+        Test that a termios:// device gets a termios transport working as a drop-in for pyserial.
+        """
+        from fastmodbuslibrary.termios_transport import TermiosTransport
+
+        with ModbusClient('termios://' + self.pty.device, 115200) as client:
+            self.assertIsInstance(client.serial_port, TermiosTransport)
+            self.assertEqual(client.read_registers(4265607340, 0x03, 128, 1), b'\x00\xC9')
+            self.assertTrue(client.write_registers(4265607340, 0x10, 128, [7]))
+            self.assertEqual(client.read_registers(4265607340, 0x03, 128, 1), b'\x00\x07')
+            self.assertIsNone(client.read_registers(4265607340, 0x03, 300, 1))
+
+            client.serial_port.set_baudrate(9600)
+            self.assertEqual(client.serial_port.port.baudrate, 9600)
+            self.assertEqual(client.read_registers(4265607340, 0x03, 128, 1), b'\x00\x07')
+
+if __name__ == '__main__':
+    unittest.main()